@@ -0,0 +1,196 @@
+"""
+Activity log writer - Batched background inserts for the audit trail
+"""
+import json
+import queue
+import atexit
+import threading
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from .config import settings
+from .database import SessionLocal
+from . import models
+
+
+def activity_row(
+    user_id: int,
+    action: str,
+    entity_type: str,
+    entity_id: Optional[int] = None,
+    description: str = "",
+    details: Optional[dict] = None
+) -> dict:
+    """
+    Build an activity_logs row, stamped with the time of the action
+    """
+    return {
+        "user_id": user_id,
+        "action_type": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "description": description,
+        "changes_json": json.dumps(details) if details else None,
+        "timestamp": datetime.now(timezone.utc)
+    }
+
+
+class ActivityLogWriter:
+    """
+    Background writer draining queued activity rows with multi-row inserts.
+
+    Rows are flushed every flush_interval seconds, or as soon as batch_size
+    rows are waiting. The queue is bounded: when it is full, or the writer
+    is not running (e.g. in tests), enqueue() returns False and the caller
+    writes the row synchronously instead. Pending rows are flushed when the
+    writer is stopped: by the app's shutdown handler, or at interpreter exit
+    (registered by start() as a fallback).
+    """
+
+    def __init__(self, session_factory, max_queue: int, flush_interval: float, batch_size: int):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self.written = 0
+        self.failed = 0
+        self.overflows = 0
+        self.flushes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stopping.is_set()
+
+    def start(self):
+        """
+        Start the writer thread
+        """
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="activity-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+        print(f"📝 Activity log writer started (flush every {self.flush_interval}s)")
+
+    def stop(self):
+        """
+        Stop the writer thread and flush everything still queued
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        self.flush()
+
+    def enqueue(self, rows: List[dict]) -> bool:
+        """
+        Queue rows for the writer; returns False if they must be written synchronously
+        """
+        if not self.running:
+            return False
+        try:
+            for index, row in enumerate(rows):
+                self._queue.put_nowait(row)
+        except queue.Full:
+            # Rows queued so far will be written - hand back only the rest
+            del rows[:index]
+            self.overflows += 1
+            return False
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """
+        Write all queued rows now
+        """
+        with self._flush_lock:
+            while True:
+                rows = []
+                while len(rows) < self.batch_size:
+                    try:
+                        rows.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not rows:
+                    return
+                self._write(rows)
+
+    def _write(self, rows: List[dict]):
+        db = self.session_factory()
+        try:
+            db.execute(insert(models.ActivityLog).values(rows))
+            db.commit()
+            self.written += len(rows)
+            self.flushes += 1
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️ Activity log batch insert failed, retrying rows one by one: {str(e)}")
+            # Keep the good rows of a batch that contains a bad one
+            for row in rows:
+                try:
+                    db.execute(insert(models.ActivityLog).values(row))
+                    db.commit()
+                    self.written += 1
+                except Exception as row_error:
+                    db.rollback()
+                    self.failed += 1
+                    print(f"❌ Dropped activity log row ({row['action_type']}): {str(row_error)}")
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        """
+        Writer counters for monitoring
+        """
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "failed": self.failed,
+            "overflows": self.overflows,
+            "flushes": self.flushes
+        }
+
+
+def write_activity_rows(db: Session, rows: List[dict]):
+    """
+    Queue activity rows, writing them with the caller's session if the writer can't take them
+    """
+    if not rows or activity_writer.enqueue(rows):
+        return
+    db.execute(insert(models.ActivityLog).values(rows))
+    db.commit()
+
+
+async def write_activity_rows_async(db: AsyncSession, rows: List[dict]):
+    """
+    write_activity_rows for handlers using an AsyncSession
+    """
+    if not rows or activity_writer.enqueue(rows):
+        return
+    await db.execute(insert(models.ActivityLog).values(rows))
+    await db.commit()
+
+
+# Shared writer instance (started by the app outside of tests)
+activity_writer = ActivityLogWriter(
+    SessionLocal,
+    max_queue=settings.ACTIVITY_LOG_QUEUE_SIZE,
+    flush_interval=settings.ACTIVITY_LOG_FLUSH_SECONDS,
+    batch_size=settings.ACTIVITY_LOG_BATCH_SIZE
+)
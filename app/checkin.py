@@ -0,0 +1,206 @@
+"""
+Check-in primitives - Atomic attendee check-in transitions
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+from . import models
+from .config import settings
+from .event_stats import bump_event_stats
+from .roster import ROSTER_COLUMNS, EventRoster
+
+
+class CheckInResult:
+    """
+    Outcome of an atomic check-in attempt
+
+    checked_in_now is True only for the request that performed the transition.
+    attendee holds the attendee's roster columns (None if it does not exist).
+    """
+    __slots__ = ("checked_in_now", "attendee")
+
+    def __init__(self, checked_in_now: bool, attendee):
+        self.checked_in_now = checked_in_now
+        self.attendee = attendee
+
+    @property
+    def found(self) -> bool:
+        return self.attendee is not None
+
+
+def checkin_statement(
+    attendee_id: int,
+    user_id: int,
+    checkin_time: datetime,
+    event_id: Optional[int] = None,
+    roster_version: Optional[int] = None
+):
+    """
+    Build the conditional check-in UPDATE
+
+    UPDATE attendees SET checked_in = true, ... WHERE id = :id AND checked_in = false RETURNING ...
+    """
+    stmt = update(models.Attendee).where(
+        models.Attendee.id == attendee_id,
+        models.Attendee.checked_in == False
+    )
+    if event_id is not None:
+        stmt = stmt.where(models.Attendee.event_id == event_id)
+
+    values = {"checked_in": True, "checkin_time": checkin_time, "checked_by": user_id}
+    if roster_version is not None:
+        values["roster_version"] = roster_version
+    return stmt.values(values).returning(*ROSTER_COLUMNS)
+
+
+def attendee_statement(attendee_id: int, event_id: Optional[int] = None):
+    """
+    Build the SELECT used to report the stored state after a lost transition
+    """
+    stmt = select(*ROSTER_COLUMNS).where(models.Attendee.id == attendee_id)
+    if event_id is not None:
+        stmt = stmt.where(models.Attendee.event_id == event_id)
+    return stmt
+
+
+def atomic_checkin(
+    db: Session,
+    attendee_id: int,
+    user_id: int,
+    checkin_time: datetime,
+    event_id: Optional[int] = None
+) -> CheckInResult:
+    """
+    Check in an attendee with a single conditional UPDATE ... RETURNING
+
+    No row lock is held across Python code: the event's stats row is bumped
+    first (see event_stats.py) and the attendee row is written with its new
+    version, both locked only until the caller commits. Does not commit.
+    """
+    if event_id is None:
+        event_id = db.execute(select(models.Attendee.event_id).where(models.Attendee.id == attendee_id)).scalar()
+        if event_id is None:
+            return CheckInResult(False, None)
+
+    version = bump_event_stats(db, event_id, checked_in=1)
+    row = db.execute(
+        checkin_statement(attendee_id, user_id, checkin_time, event_id, roster_version=version),
+        execution_options={"synchronize_session": False}
+    ).first()
+    if row is not None:
+        return CheckInResult(True, row)
+
+    # Either already checked in or not found - take the count back and read the current state
+    bump_event_stats(db, event_id, checked_in=-1)
+    row = db.execute(attendee_statement(attendee_id, event_id)).first()
+    return CheckInResult(False, row)
+
+
+def batch_checkin(db: Session, checkins: Dict[int, datetime], user_id: int, event_id: int) -> List:
+    """
+    Check in many attendees of one event with a single conditional UPDATE
+
+    checkins maps attendee id -> check-in time. Returns the rows that were
+    transitioned by this statement; ids missing from the result were either
+    already checked in or do not belong to the event. Like atomic_checkin,
+    the event's stats row is bumped before the attendee rows. Does not commit.
+    """
+    if not checkins:
+        return []
+
+    version = bump_event_stats(db, event_id, checked_in=len(checkins))
+    values = {"checked_in": True, "checkin_time": case(checkins, value=models.Attendee.id), "checked_by": user_id}
+    if version is not None:
+        values["roster_version"] = version
+    stmt = update(models.Attendee).where(
+        models.Attendee.id.in_(list(checkins.keys())),
+        models.Attendee.event_id == event_id,
+        models.Attendee.checked_in == False
+    ).values(values).returning(*ROSTER_COLUMNS)
+
+    rows = db.execute(stmt, execution_options={"synchronize_session": False}).all()
+    if len(rows) < len(checkins):
+        # Lost races: take back the counts of the rows left unchanged
+        bump_event_stats(db, event_id, checked_in=len(rows) - len(checkins))
+    return rows
+
+
+class ScanDebouncer:
+    """
+    Short-lived memory of scan results keyed by QR token digest.
+
+    A badge is often scanned two or three times within a second by the same
+    or an adjacent scanner. Repeats inside the event's debounce window are
+    answered with the stored result, skipping token verification and the
+    database entirely. Results are only reused for users allowed to see the
+    event of the first scan.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        # digest -> (expires_at, event_id, club_id, response)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.absorbed = 0
+        self.absorbed_by_event: Dict[int, int] = {}
+
+    def recent(self, digest: str, current_user: models.User) -> Optional[dict]:
+        """
+        Stored response for a repeat scan, or None if the scan must be processed
+        """
+        with self._lock:
+            item = self._entries.get(digest)
+            if item is None:
+                return None
+
+            expires_at, event_id, club_id, response = item
+            if expires_at <= time.monotonic():
+                del self._entries[digest]
+                return None
+            if current_user.role != "admin" and club_id != current_user.club_id:
+                return None
+
+            self.absorbed += 1
+            self.absorbed_by_event[event_id] = self.absorbed_by_event.get(event_id, 0) + 1
+            return response
+
+    def record(self, digest: str, roster: EventRoster, response: dict):
+        """
+        Remember the response repeat scans of a token should get
+        """
+        if roster.debounce_seconds <= 0:
+            return
+
+        with self._lock:
+            self._entries[digest] = (
+                time.monotonic() + roster.debounce_seconds, roster.event_id, roster.club_id, response
+            )
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.recorded += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Debounce counters for monitoring
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "recorded": self.recorded,
+                "absorbed": self.absorbed,
+                "absorbed_by_event": dict(self.absorbed_by_event)
+            }
+
+
+# Shared debouncer instance
+scan_debouncer = ScanDebouncer(max_entries=settings.SCAN_DEBOUNCE_MAX_ENTRIES)
@@ -2,20 +2,111 @@
 Database configuration - SQLAlchemy setup
 """
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from .config import settings
+from .pool_metrics import PoolMetrics, instrumented_pool_class, pool_status
+
+
+def pool_share(total: int, is_async: bool) -> int:
+    """
+    One engine's part of a per-worker connection budget: the async engine
+    gets DB_ASYNC_POOL_SHARE of it and the sync engine the rest, so both
+    pools together never open more than the configured total
+    """
+    share = max(0.0, min(settings.DB_ASYNC_POOL_SHARE, 1.0))
+    async_part = round(total * share)
+    return async_part if is_async else total - async_part
+
+
+def engine_options(url: str, pool_class, metrics: PoolMetrics, is_async: bool = False) -> dict:
+    """
+    Pool sizing and statement timeout from settings for an engine on url
+    """
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        # In-memory SQLite uses a single shared connection, not a sized pool
+        return {}
+
+    options = {
+        "poolclass": instrumented_pool_class(pool_class, metrics),
+        # Every engine keeps at least one pooled connection
+        "pool_size": max(1, pool_share(settings.DB_POOL_SIZE, is_async)),
+        "max_overflow": pool_share(settings.DB_MAX_OVERFLOW, is_async),
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+    timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+    if timeout_ms and url.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {"server_settings": {"statement_timeout": str(timeout_ms)}}
+    elif timeout_ms and url.startswith(("postgresql", "postgres")):
+        options["connect_args"] = {"options": f"-c statement_timeout={timeout_ms}"}
+    return options
+
+
+# Checkout metrics for each engine's pool
+sync_pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
 
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,  # Verify connections before using them
-    echo=False  # Set to True for SQL query logging during development
+    echo=False,  # Set to True for SQL query logging during development
+    **engine_options(settings.DATABASE_URL, QueuePool, sync_pool_metrics)
 )
 
+def migration_engine():
+    """
+    Engine for schema migrations: no pool and no statement timeout, since
+    index builds on large tables outlast DB_STATEMENT_TIMEOUT_MS
+    """
+    return create_engine(settings.DATABASE_URL, poolclass=NullPool)
+
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def async_database_url(url: str) -> str:
+    """
+    Map a sync DATABASE_URL to the matching asyncio driver
+    """
+    for sync_prefix, async_prefix in (
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("postgres://", "postgresql+asyncpg://"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+    ):
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+
+# Async engine for handlers on the request hot path (same database)
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    echo=False,
+    **engine_options(async_database_url(settings.DATABASE_URL), AsyncAdaptedQueuePool, async_pool_metrics, is_async=True)
+)
+
+# Objects stay usable after commit - async sessions can't lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+
+def pool_stats() -> dict:
+    """
+    Live status of both connection pools (each holds its share of the budget)
+    """
+    return {
+        "sync": pool_status(engine, sync_pool_metrics),
+        "async": pool_status(async_engine.sync_engine, async_pool_metrics)
+    }
+
 # Create base class for models
 Base = declarative_base()
 
@@ -29,3 +120,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    AsyncSession dependency - database calls don't block the event loop
+    Sync helpers (roster cache, check-in primitives) run via db.run_sync()
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
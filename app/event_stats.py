@@ -0,0 +1,312 @@
+"""
+Event stats - Per-event attendee counters maintained with every attendee write
+
+event_stats holds total / checked_in / qr_generated / email_sent /
+email_failed for each event. Counters are bumped with relative UPDATEs
+(SET n = n + :delta) in the same transaction as the attendee change:
+  * ORM writes (session.add / attribute changes / session.delete) are
+    picked up by a before_flush listener from the pending objects' history
+  * Core UPDATEs that bypass the ORM (atomic/batch check-in) call
+    bump_event_stats() themselves
+
+The same UPDATE bumps event_stats.version, the event's change version used
+to cache its responses (see response_cache.py). Any attendee, payment or
+event change bumps it, as do changes to the clubs and users embedded in
+the event detail and attendee list.
+
+Changed attendee rows are written with the new version (roster_version,
+the roster delta cursor) and removed ones leave a tombstone with it, so
+the stats row is always updated before the attendee rows. Its lock then serializes the versions of an event (a delta
+never skips a change committed later with a lower version) and every
+writer takes the locks in the same order: event_stats, then attendees.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+from sqlalchemy import event, func, insert, select, update
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import get_history
+from . import models
+
+COUNTERS = ("total", "checked_in", "qr_generated", "email_sent", "email_failed")
+
+
+def attendee_counts(checked_in, qr_generated, email_sent, email_error) -> tuple:
+    """
+    What one attendee contributes to each counter, in COUNTERS order
+    """
+    return (1, int(bool(checked_in)), int(bool(qr_generated)), int(bool(email_sent)), int(bool(email_error)))
+
+
+def _old_value(attendee, attr: str):
+    # Counted attributes have active_history, so a change always records the old value
+    history = get_history(attendee, attr)
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(attendee, attr)
+
+
+def _attendee_state(attendee, old: bool) -> tuple:
+    values = {}
+    for attr in ("event_id", "checked_in", "qr_generated", "email_sent", "email_error"):
+        values[attr] = _old_value(attendee, attr) if old else getattr(attendee, attr)
+    return values["event_id"], attendee_counts(
+        values["checked_in"], values["qr_generated"], values["email_sent"], values["email_error"]
+    )
+
+
+def _apply(conn, deltas: Dict[int, list]) -> Dict[int, int]:
+    """
+    Apply counter deltas; every event in deltas changed, so its version
+    moves even if no counter does. Returns the new version of each event.
+    """
+    versions = {}
+    # Lock the stats rows in event id order, like every other writer
+    for event_id in sorted(event_id for event_id in deltas if event_id is not None):
+        delta = deltas[event_id]
+        values = {
+            name: getattr(models.EventStats, name) + amount
+            for name, amount in zip(COUNTERS, delta) if amount
+        }
+        values["version"] = models.EventStats.version + 1
+        version = conn.execute(
+            update(models.EventStats)
+            .where(models.EventStats.event_id == event_id)
+            .values(values)
+            .returning(models.EventStats.version)
+        ).scalar()
+        if version is not None:
+            versions[event_id] = version
+    return versions
+
+
+def _event_id(obj):
+    # Pending objects may only be linked through the relationship so far
+    if obj.event_id is not None:
+        return obj.event_id
+    return obj.event.id if obj.event is not None else None
+
+
+def _add(deltas, event_id, counts, sign: int):
+    deltas[event_id] = [d + sign * c for d, c in zip(deltas[event_id], counts)]
+
+
+@event.listens_for(Session, "before_flush")
+def _track_changes(session: Session, flush_context, instances):
+    """
+    Turn the pending writes of this flush into counter deltas and version
+    bumps, stamp changed attendees with the new version before they are
+    written and record tombstones for attendees leaving an event. Attendees of events created in this same flush have no
+    event id yet; they are counted into the new stats rows after the flush.
+    """
+    deleted_events = {obj.id for obj in session.deleted if isinstance(obj, models.Event)}
+
+    deltas = defaultdict(lambda: [0] * len(COUNTERS))
+    changed_attendees = defaultdict(list)
+    removed_attendees = defaultdict(list)
+    new_event_attendees = []
+    for obj in session.new:
+        if isinstance(obj, models.Attendee):
+            event_id, counts = _attendee_state(obj, old=False)
+            event_id = event_id if event_id is not None else _event_id(obj)
+            if event_id is None:
+                new_event_attendees.append(obj)
+                continue
+            _add(deltas, event_id, counts, 1)
+            changed_attendees[event_id].append(obj)
+    for obj in session.deleted:
+        if isinstance(obj, models.Attendee):
+            event_id, counts = _attendee_state(obj, old=True)
+            _add(deltas, event_id, counts, -1)
+            removed_attendees[event_id].append(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, models.Attendee) and session.is_modified(obj, include_collections=False):
+            old_event_id, old_counts = _attendee_state(obj, old=True)
+            new_event_id, new_counts = _attendee_state(obj, old=False)
+            _add(deltas, old_event_id, old_counts, -1)
+            if old_event_id != new_event_id:
+                removed_attendees[old_event_id].append(obj.id)
+            if new_event_id is None:
+                new_event_attendees.append(obj)
+                continue
+            _add(deltas, new_event_id, new_counts, 1)
+            changed_attendees[new_event_id].append(obj)
+    if new_event_attendees:
+        session.info["event_stats_new_event_attendees"] = new_event_attendees
+
+    # Changes that only touch cached responses: event fields and payments
+    touched = [
+        obj.id for obj in session.dirty
+        if isinstance(obj, models.Event) and session.is_modified(obj, include_collections=False)
+    ]
+    touched += [_event_id(obj) for obj in (*session.new, *session.deleted) if isinstance(obj, models.Payment)]
+    touched += [
+        obj.event_id for obj in session.dirty
+        if isinstance(obj, models.Payment) and session.is_modified(obj, include_collections=False)
+    ]
+    for event_id in touched:
+        deltas.setdefault(event_id, [0] * len(COUNTERS))
+
+    # Clubs and users are embedded in event details, usernames in attendee
+    # lists: renames bump every event, other user changes (e.g. last_login)
+    # the events the user created
+    touch_all = any(
+        isinstance(obj, models.Club) and session.is_modified(obj, include_collections=False)
+        for obj in session.dirty
+    ) or any(isinstance(obj, models.User) for obj in session.deleted)
+    creators = []
+    for obj in session.dirty:
+        if isinstance(obj, models.User) and session.is_modified(obj, include_collections=False):
+            if get_history(obj, "username").has_changes():
+                touch_all = True
+            creators.append(obj.id)
+
+    # Rows of deleted events go away with the event
+    for event_id in deleted_events:
+        deltas.pop(event_id, None)
+
+    if not (deltas or touch_all or creators):
+        return
+
+    conn = session.connection()
+    versions = _apply(conn, deltas)
+    for event_id, attendees in changed_attendees.items():
+        if event_id in versions:
+            for attendee in attendees:
+                attendee.roster_version = versions[event_id]
+    tombstones = [
+        {"event_id": event_id, "attendee_id": attendee_id, "roster_version": versions[event_id]}
+        for event_id, attendee_ids in removed_attendees.items() if event_id in versions
+        for attendee_id in attendee_ids
+    ]
+    if tombstones:
+        conn.execute(insert(models.AttendeeTombstone), tombstones)
+    if touch_all:
+        conn.execute(update(models.EventStats).values(version=models.EventStats.version + 1))
+    elif creators:
+        conn.execute(
+            update(models.EventStats)
+            .where(models.EventStats.event_id.in_(
+                select(models.Event.id).where(models.Event.created_by.in_(creators))
+            ))
+            .values(version=models.EventStats.version + 1)
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _track_events(session: Session, flush_context):
+    """
+    Create stats rows for new events (ids are only known after the flush),
+    counting the attendees flushed with them, and drop the stats rows and
+    tombstones of deleted events
+    """
+    new_events = [obj.id for obj in session.new if isinstance(obj, models.Event)]
+    deleted_events = [obj.id for obj in session.deleted if isinstance(obj, models.Event)]
+    new_event_attendees = session.info.pop("event_stats_new_event_attendees", [])
+    if not (new_events or deleted_events):
+        return
+
+    conn = session.connection()
+    if new_events:
+        counts = defaultdict(lambda: [0] * len(COUNTERS))
+        for obj in new_event_attendees:
+            _add(counts, *_attendee_state(obj, old=False), 1)
+        conn.execute(insert(models.EventStats), [
+            {"event_id": event_id, **dict(zip(COUNTERS, counts[event_id]))} for event_id in new_events
+        ])
+    if deleted_events:
+        # ON DELETE CASCADE covers PostgreSQL; SQLite doesn't enforce foreign keys by default
+        for table in (models.EventStats.__table__, models.AttendeeTombstone.__table__):
+            conn.execute(table.delete().where(table.c.event_id.in_(deleted_events)))
+
+
+def bump_event_stats(db: Session, event_id: int, **amounts) -> Optional[int]:
+    """
+    Bump counters for writes that bypass the ORM, e.g. checked_in=len(rows).
+    Call it before writing the attendee rows and store the returned version
+    in their roster_version (None if the event has no stats row).
+    Always bumps the event's version, also when called without counters.
+    """
+    delta = [amounts.pop(name, 0) for name in COUNTERS]
+    if amounts:
+        raise ValueError(f"Unknown event stats counters: {', '.join(amounts)}")
+    return _apply(db.connection(), {event_id: delta}).get(event_id)
+
+
+def stats_dict(stats: Optional[models.EventStats]) -> dict:
+    """
+    Counters of a stats row as a dict (all zero if the event has no row)
+    """
+    return {name: getattr(stats, name, 0) if stats is not None else 0 for name in COUNTERS}
+
+
+def events_with_stats():
+    """
+    SELECT events with their stats row, club and creator in one query
+    """
+    return select(models.Event, models.EventStats).outerjoin(
+        models.EventStats, models.EventStats.event_id == models.Event.id
+    ).options(
+        joinedload(models.Event.club),
+        joinedload(models.Event.creator)
+    )
+
+
+def attach_stats(rows: Iterable) -> list:
+    """
+    Set total_attendees / checked_in_count on (event, stats) rows; return the events
+    """
+    events = []
+    for db_event, stats in rows:
+        counts = stats_dict(stats)
+        db_event.total_attendees = counts["total"]
+        db_event.checked_in_count = counts["checked_in"]
+        events.append(db_event)
+    return events
+
+
+def recount_statement(event_ids: Optional[Iterable[int]] = None):
+    """
+    Counters recomputed from the attendees table (for backfill and repair)
+    """
+    attendee = models.Attendee
+    stmt = select(
+        attendee.event_id,
+        func.count(attendee.id).label("total"),
+        func.count(attendee.id).filter(attendee.checked_in == True).label("checked_in"),
+        func.count(attendee.id).filter(attendee.qr_generated == True).label("qr_generated"),
+        func.count(attendee.id).filter(attendee.email_sent == True).label("email_sent"),
+        func.count(attendee.id).filter(attendee.email_error.isnot(None), attendee.email_error != "").label("email_failed")
+    ).group_by(attendee.event_id)
+    if event_ids is not None:
+        stmt = stmt.where(attendee.event_id.in_(list(event_ids)))
+    return stmt
+
+
+def rebuild_event_stats(db: Session, event_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Overwrite the counters of the given events (default: all) with a fresh
+    recount. Versions move forward, so cached responses are not reused.
+    Does not commit. Returns the number of events rebuilt.
+    """
+    event_query = select(models.Event.id)
+    if event_ids is not None:
+        event_query = event_query.where(models.Event.id.in_(list(event_ids)))
+    ids = db.execute(event_query).scalars().all()
+    if not ids:
+        return 0
+
+    counts = {row.event_id: row for row in db.execute(recount_statement(ids))}
+    versions = dict(db.execute(
+        select(models.EventStats.event_id, models.EventStats.version).where(models.EventStats.event_id.in_(ids))
+    ).all())
+    conn = db.connection()
+    conn.execute(models.EventStats.__table__.delete().where(models.EventStats.event_id.in_(ids)))
+    conn.execute(insert(models.EventStats), [
+        {
+            "event_id": event_id,
+            "version": versions.get(event_id, 0) + 1,
+            **{name: getattr(counts.get(event_id), name, 0) for name in COUNTERS}
+        }
+        for event_id in ids
+    ])
+    return len(ids)
@@ -0,0 +1,219 @@
+"""
+Attendee exports - Files streamed straight from a database cursor
+
+Rows are sorted by the database and fetched in batches of
+EXPORT_BATCH_SIZE (a server-side cursor on PostgreSQL), so memory stays
+flat however large the event is:
+  * CSV: each batch is written to the response before the next is fetched
+  * XLSX: rows go to openpyxl write-only sheets (buffered in temp files),
+    the finished workbook is saved to a temp file and streamed from disk
+Responses are ExportResponse, which closes the generator (cursor, session,
+worker thread) as soon as the client disconnects.
+"""
+import asyncio
+import contextlib
+import csv
+import io
+import re
+import tempfile
+import threading
+from typing import AsyncIterator, BinaryIO, List, Optional
+import anyio
+from fastapi.responses import StreamingResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from sqlalchemy import select
+from .database import AsyncSessionLocal, SessionLocal
+from . import models
+
+EXPORT_BATCH_SIZE = 1000
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+XLSX_CHUNK_SIZE = 64 * 1024
+
+# XLSX sheet layouts: everything on one sheet, one per branch, or one per
+# branch/year/section
+SHEET_MODES = ("single", "branch", "section")
+
+EXPORT_COLUMNS = [
+    "Name", "Email", "Roll Number", "Branch", "Year", "Section", "Phone", "Gender",
+    "Checked In", "Check-in Time", "Checked By", "QR Generated", "Email Sent", "Email Error"
+]
+
+
+def export_query(event_id: int):
+    """
+    Export columns of an event's attendees, sorted by branch, year, section, name
+    """
+    attendee = models.Attendee
+    return select(
+        attendee.name, attendee.email, attendee.roll_number, attendee.branch, attendee.year,
+        attendee.section, attendee.phone, attendee.gender, attendee.checked_in, attendee.checkin_time,
+        models.User.username, attendee.qr_generated, attendee.email_sent, attendee.email_error
+    ).outerjoin(
+        models.User, models.User.id == attendee.checked_by
+    ).where(
+        attendee.event_id == event_id
+    ).order_by(
+        attendee.branch, attendee.year, attendee.section, attendee.name, attendee.id
+    )
+
+
+def export_row(row) -> list:
+    """
+    One export_query row as the cells of EXPORT_COLUMNS
+    """
+    (name, email, roll_number, branch, year, section, phone, gender, checked_in, checkin_time,
+     checker, qr_generated, email_sent, email_error) = row
+    return [
+        name, email, roll_number, branch, year, section, phone or "", gender,
+        "Yes" if checked_in else "No",
+        checkin_time.strftime("%Y-%m-%d %I:%M %p") if checkin_time else "",
+        checker or "",
+        "Yes" if qr_generated else "No",
+        "Yes" if email_sent else "No",
+        email_error or ""
+    ]
+
+
+async def export_batches(event_id: int, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[List[list]]:
+    """
+    Export rows in batches of batch_size, on a session of their own (the
+    generator runs after the request handler has returned). Closing the
+    generator early (client gone) closes the cursor and the session.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(export_query(event_id).execution_options(yield_per=batch_size))
+        try:
+            async for partition in result.partitions():
+                yield [export_row(row) for row in partition]
+        finally:
+            await result.close()
+
+
+async def stream_csv(event_id: int, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """
+    CSV export of an event's attendees, one chunk per batch
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue().encode("utf-8")
+
+    async with contextlib.aclosing(export_batches(event_id, batch_size)) as batches:
+        async for rows in batches:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(rows)
+            yield buffer.getvalue().encode("utf-8")
+
+
+def sheet_title(name: str, used: set) -> str:
+    """
+    Unique Excel-safe sheet title (max 31 chars, no []:*?/\\)
+    """
+    base = re.sub(r"[\[\]:*?/\\]", "-", name).strip("'") or "Sheet"
+    title = base[:31]
+    counter = 2
+    while title.lower() in used:
+        suffix = f" ({counter})"
+        title = base[:31 - len(suffix)] + suffix
+        counter += 1
+    used.add(title.lower())
+    return title
+
+
+def xlsx_row(worksheet, cells: list) -> list:
+    """
+    Cells for a write-only sheet; text starting with "=" stays text
+    (openpyxl would store attendee-supplied values like that as formulas)
+    """
+    row = []
+    for value in cells:
+        if isinstance(value, str) and value.startswith("="):
+            value = WriteOnlyCell(worksheet, value)
+            value.data_type = "s"
+        row.append(value)
+    return row
+
+
+def write_xlsx(event_id: int, target: BinaryIO, sheets: str = "single", batch_size: int = EXPORT_BATCH_SIZE,
+               cancelled: Optional[threading.Event] = None) -> bool:
+    """
+    Write the XLSX export of an event's attendees to target. Blocking (sync
+    session and openpyxl) - run it in a worker thread. Stops reading (and
+    returns False without saving) once cancelled is set.
+    """
+    workbook = Workbook(write_only=True)
+    worksheets = {}
+    used_titles = set()
+
+    def worksheet(key: str):
+        if key not in worksheets:
+            worksheets[key] = workbook.create_sheet(sheet_title(key, used_titles))
+            worksheets[key].append(EXPORT_COLUMNS)
+        return worksheets[key]
+
+    with SessionLocal() as db:
+        result = db.execute(export_query(event_id).execution_options(yield_per=batch_size))
+        for row in result:
+            if cancelled is not None and cancelled.is_set():
+                result.close()
+                for sheet in worksheets.values():
+                    sheet.close()
+                return False
+            if sheets == "branch":
+                key = row.branch
+            elif sheets == "section":
+                key = f"{row.branch} {row.year}-{row.section}"
+            else:
+                key = "Attendees"
+            sheet = worksheet(key)
+            sheet.append(xlsx_row(sheet, export_row(row)))
+
+    if not worksheets:
+        worksheet("Attendees")
+    workbook.save(target)
+    return True
+
+
+async def stream_xlsx(event_id: int, sheets: str = "single", batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """
+    XLSX export of an event's attendees, built in a worker thread and sent
+    in XLSX_CHUNK_SIZE chunks. If the response is abandoned (client gone)
+    the worker stops at the next row.
+    """
+    loop = asyncio.get_running_loop()
+    cancelled = threading.Event()
+    with tempfile.TemporaryFile() as target:
+        written = loop.run_in_executor(None, write_xlsx, event_id, target, sheets, batch_size, cancelled)
+        try:
+            await asyncio.shield(written)
+        except asyncio.CancelledError:
+            # Let the worker stop before the temp file is closed under it
+            cancelled.set()
+            with anyio.CancelScope(shield=True):
+                await asyncio.wait([written])
+            raise
+        target.seek(0)
+        while True:
+            chunk = await loop.run_in_executor(None, target.read, XLSX_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+class ExportResponse(StreamingResponse):
+    """
+    StreamingResponse that closes its body iterator however the response
+    ends. Starlette leaves an abandoned generator (client disconnected) to
+    the garbage collector, which would keep its cursor, session or worker
+    thread busy until then.
+    """
+
+    async def stream_response(self, send):
+        try:
+            await super().stream_response(send)
+        finally:
+            with anyio.CancelScope(shield=True):
+                await self.body_iterator.aclose()
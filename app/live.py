@@ -0,0 +1,246 @@
+"""
+Live check-in stream - Pub/sub of check-in deltas per event
+
+CheckInStream fans messages out to the dashboards connected to this worker.
+With several workers, a dashboard only sees the check-ins handled by its
+own worker unless REDIS_URL is set: RedisCheckInRelay then passes every
+check-in through Redis to all workers. Without Redis, run a single worker
+for live dashboards.
+"""
+import asyncio
+import json
+import threading
+import time
+from typing import Callable, Dict, Optional, Set
+from .config import settings
+
+
+class CheckInStream:
+    """
+    Fan-out of check-in messages to the dashboards watching an event.
+
+    Every subscriber gets its own bounded asyncio.Queue. Publishing never
+    blocks the check-in path: when a slow client's queue is full its oldest
+    message is dropped (the next delta carries absolute counters, so the
+    dashboard catches up). Messages published from a worker thread are
+    handed over to the event loop with call_soon_threadsafe.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, event_id: int) -> asyncio.Queue:
+        """
+        Register a subscriber for an event (must be called on the event loop)
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._subscribers.setdefault(event_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, event_id: int, queue: asyncio.Queue):
+        """
+        Remove a subscriber once its connection is closed
+        """
+        with self._lock:
+            queues = self._subscribers.get(event_id)
+            if queues is None:
+                return
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[event_id]
+
+    def has_subscribers(self, event_id: int) -> bool:
+        return bool(self._subscribers.get(event_id))
+
+    def publish(self, event_id: int, message: dict):
+        """
+        Send a message to every subscriber of an event
+        """
+        with self._lock:
+            queues = list(self._subscribers.get(event_id, ()))
+            loop = self._loop
+        if not queues or loop is None:
+            return
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is loop:
+            self._deliver(queues, message)
+        else:
+            loop.call_soon_threadsafe(self._deliver, queues, message)
+
+    def _deliver(self, queues, message: dict):
+        for queue in queues:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(message)
+        self.published += 1
+
+    def stats(self) -> dict:
+        """
+        Stream counters for monitoring
+        """
+        with self._lock:
+            return {
+                "events_watched": len(self._subscribers),
+                "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+                "published": self.published,
+                "dropped": self.dropped
+            }
+
+
+class RedisCheckInRelay:
+    """
+    Carries check-in messages between workers through Redis pub/sub.
+
+    send() queues a message without blocking; a sender task publishes it on
+    the event's channel and a listener task hands the messages of every
+    worker (this one included) to deliver(). While Redis is unreachable
+    messages are delivered to this worker's dashboards only, and the warning
+    is printed at most once per WARNING_INTERVAL_SECONDS.
+    """
+
+    WARNING_INTERVAL_SECONDS = 60
+
+    def __init__(self, client, deliver: Callable[[int, dict], None], prefix: str = "qrflow:live:",
+                 queue_size: int = 1000, retry_seconds: float = 5.0):
+        self.client = client
+        self.deliver = deliver
+        self.prefix = prefix
+        self.queue_size = queue_size
+        self.retry_seconds = retry_seconds
+        self.connected = False
+        self._outbox: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._warned_at = None
+        self._suppressed = 0
+        self.relayed = 0
+        self.received = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def _failed(self, action: str, error: Exception):
+        now = time.monotonic()
+        self.errors += 1
+        if self._warned_at is not None and now - self._warned_at < self.WARNING_INTERVAL_SECONDS:
+            self._suppressed += 1
+            return
+        suppressed = f" ({self._suppressed} similar errors suppressed)" if self._suppressed else ""
+        print(f"⚠️ Could not {action} through Redis: {str(error)}{suppressed}")
+        self._warned_at = now
+        self._suppressed = 0
+
+    def send(self, event_id: int, message: dict):
+        """
+        Relay a message to the dashboards of every worker (call on the event loop)
+        """
+        if self._outbox is None or not self.connected:
+            self.deliver(event_id, message)
+            return
+        if self._outbox.full():
+            self._outbox.get_nowait()
+            self.dropped += 1
+        self._outbox.put_nowait((event_id, message))
+
+    async def _send_messages(self):
+        while True:
+            event_id, message = await self._outbox.get()
+            try:
+                await self.client.publish(f"{self.prefix}{event_id}", json.dumps(message))
+                self.relayed += 1
+            except Exception as e:
+                self._failed("publish a check-in", e)
+                self.deliver(event_id, message)
+
+    async def _receive_messages(self):
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.psubscribe(f"{self.prefix}*")
+                self.connected = True
+                async for item in pubsub.listen():
+                    if item["type"] != "pmessage":
+                        continue
+                    channel = item["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode("utf-8")
+                    self.received += 1
+                    self.deliver(int(channel[len(self.prefix):]), json.loads(item["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._failed("receive check-ins", e)
+            finally:
+                self.connected = False
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(self.retry_seconds)
+
+    def start(self):
+        """
+        Start the sender and listener tasks (call on the serving event loop)
+        """
+        if self._tasks:
+            return
+        self._outbox = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [
+            asyncio.create_task(self._send_messages()),
+            asyncio.create_task(self._receive_messages())
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._outbox = None
+        self.connected = False
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis",
+            "connected": self.connected,
+            "relayed": self.relayed,
+            "received": self.received,
+            "dropped": self.dropped,
+            "errors": self.errors
+        }
+
+
+def create_checkin_relay(deliver: Callable[[int, dict], None]) -> Optional[RedisCheckInRelay]:
+    """
+    Redis relay when REDIS_URL is configured (and redis is installed), None otherwise
+    """
+    if not settings.REDIS_URL:
+        return None
+
+    try:
+        import redis.asyncio as redis
+    except ImportError:
+        print("⚠️ REDIS_URL is set but the redis package is not installed - live check-ins stay per worker")
+        return None
+
+    # No socket timeout: the listener waits on the connection between check-ins
+    client = redis.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT)
+    return RedisCheckInRelay(
+        client, deliver,
+        queue_size=settings.LIVE_STREAM_QUEUE_SIZE,
+        retry_seconds=settings.REDIS_RETRY_SECONDS
+    )
+
+
+# Shared stream instance
+checkin_stream = CheckInStream(queue_size=settings.LIVE_STREAM_QUEUE_SIZE)
@@ -0,0 +1,195 @@
+"""
+Event loop monitor - Loop lag sampling and attribution of blocking calls
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+from .config import settings
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class LoopMonitor:
+    """
+    Measures how late the event loop runs scheduled callbacks.
+
+    A sampler task sleeps for interval seconds at a time and records how
+    much later than requested it woke up: that delay is time the loop spent
+    running something else without yielding (a sync DB call, bcrypt, SMTP).
+
+    In debug mode a watchdog thread also checks the sampler's heartbeat.
+    When the loop has been stuck for longer than stall_threshold it grabs
+    the loop thread's stack and attributes the stall to the route endpoint
+    and the innermost app call site on it.
+    """
+
+    def __init__(self, interval: float, stall_threshold: float, debug: bool, window: int = 1000):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.debug = debug
+        self._lags = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._task = None
+        self._loop_thread_id = None
+        self._heartbeat = time.monotonic()
+        self._watchdog = None
+        self._stopping = threading.Event()
+        self._route_names: Dict[object, str] = {}
+        self._open_stall: Optional[dict] = None
+        self.samples = 0
+        self.stalls = 0
+        self.max_lag = 0.0
+        self.incidents = deque(maxlen=50)
+        self.offenders: Dict[tuple, dict] = {}
+
+    def start(self, app=None):
+        """
+        Start sampling on the running event loop (and the watchdog in debug mode)
+        """
+        if self._task is not None:
+            return
+        if app is not None:
+            # Code objects of route endpoints, to find the route on a stack
+            self._route_names = {
+                route.endpoint.__code__: f"{','.join(sorted(getattr(route, 'methods', None) or ['WS']))} {route.path}"
+                for route in app.routes
+                if hasattr(getattr(route, "endpoint", None), "__code__")
+            }
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+        if self.debug:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+        print(f"⏱️ Event loop monitor started (debug={'on' if self.debug else 'off'})")
+
+    def stop(self):
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self._heartbeat = time.monotonic()
+            with self._lock:
+                self._lags.append(lag)
+                self.samples += 1
+                self.max_lag = max(self.max_lag, lag)
+                if lag >= self.stall_threshold:
+                    self.stalls += 1
+
+    # ----- debug mode -----
+
+    def _watch(self):
+        check_every = max(self.stall_threshold / 4, 0.01)
+        while not self._stopping.wait(check_every):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            stall = self._open_stall
+
+            if stall is not None and stall["heartbeat"] != heartbeat:
+                # The loop is back: the stall lasted until the sampler woke up
+                stall["duration_ms"] = max(stall["duration_ms"], (heartbeat - stall["heartbeat"] - self.interval) * 1000)
+                self._close_stall(stall)
+                stall = None
+
+            if blocked_for < self.stall_threshold:
+                continue
+
+            if stall is None:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                route, call_site, blocked_in = self._attribute(frame)
+                self._open_stall = {
+                    "heartbeat": heartbeat,
+                    "route": route,
+                    "call_site": call_site,
+                    "blocked_in": blocked_in,
+                    "started_at": time.time() - blocked_for,
+                    "duration_ms": blocked_for * 1000
+                }
+            else:
+                stall["duration_ms"] = blocked_for * 1000
+
+    def _close_stall(self, stall: dict):
+        self._open_stall = None
+        incident = {key: value for key, value in stall.items() if key != "heartbeat"}
+        incident["duration_ms"] = round(incident["duration_ms"], 1)
+        with self._lock:
+            self.incidents.append(incident)
+            key = (incident["route"], incident["call_site"])
+            offender = self.offenders.setdefault(key, {
+                "route": incident["route"], "call_site": incident["call_site"],
+                "blocked_in": incident["blocked_in"], "count": 0, "total_ms": 0.0, "max_ms": 0.0
+            })
+            offender["count"] += 1
+            offender["total_ms"] += incident["duration_ms"]
+            offender["max_ms"] = max(offender["max_ms"], incident["duration_ms"])
+
+    def _attribute(self, frame):
+        """
+        (route, innermost app call site, innermost frame) for a loop thread stack
+        """
+        route = call_site = blocked_in = None
+        while frame is not None:
+            code = frame.f_code
+            location = f"{os.path.relpath(code.co_filename)}:{frame.f_lineno} in {code.co_name}"
+            if blocked_in is None:
+                blocked_in = location
+            if call_site is None and code.co_filename.startswith(APP_DIR) and not code.co_filename.endswith("loop_monitor.py"):
+                call_site = location
+            if route is None and code in self._route_names:
+                route = self._route_names[code]
+            frame = frame.f_back
+        return route or "unknown", call_site or blocked_in, blocked_in
+
+    # ----- reporting -----
+
+    def stats(self) -> dict:
+        """
+        Lag percentiles over the recent window plus stall counters
+        """
+        with self._lock:
+            lags = sorted(self._lags)
+            percentile = lambda pct: round(lags[min(len(lags) - 1, int(pct / 100 * len(lags)))] * 1000, 2) if lags else 0.0
+            return {
+                "running": self._task is not None,
+                "debug": self.debug,
+                "samples": self.samples,
+                "lag_p50_ms": percentile(50),
+                "lag_p99_ms": percentile(99),
+                "lag_max_ms": round(self.max_lag * 1000, 2),
+                "stalls": self.stalls,
+                "stall_threshold_ms": self.stall_threshold * 1000
+            }
+
+    def report(self) -> dict:
+        """
+        Stats plus (in debug mode) recent stalls and the worst offenders
+        """
+        report = self.stats()
+        with self._lock:
+            report["recent_stalls"] = list(self.incidents)
+            report["offenders"] = sorted(
+                ({**offender, "total_ms": round(offender["total_ms"], 1)} for offender in self.offenders.values()),
+                key=lambda offender: offender["total_ms"],
+                reverse=True
+            )
+        return report
+
+
+# Shared monitor instance (started with the app)
+loop_monitor = LoopMonitor(
+    interval=settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+    stall_threshold=settings.LOOP_MONITOR_STALL_MS / 1000,
+    debug=settings.LOOP_MONITOR_DEBUG
+)
@@ -1,38 +1,53 @@
 """
 Main FastAPI Application - All API endpoints
 """
-from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File
+from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import pandas as pd
 import json
 import io
+import asyncio
 import os
 import razorpay
 import threading
 import time
 
 from . import models, schemas, security, utils
-from .database import engine, get_db
+from .migrations import check_schema
+from .database import engine, get_db, get_async_db, AsyncSessionLocal, pool_stats
+from .roster import roster_cache
+from .checkin import atomic_checkin, batch_checkin, scan_debouncer
+from .live import checkin_stream, create_checkin_relay
+from .event_stats import events_with_stats, attach_stats, stats_dict
+from .pagination import decode_cursor, encode_cursor, seek, split_page
+from .response_cache import etag_matches, make_etag, response_cache
+from .exports import SHEET_MODES, XLSX_MEDIA_TYPE, ExportResponse, stream_csv, stream_xlsx
+from .loop_monitor import loop_monitor
+from .activity_log import activity_writer, activity_row, write_activity_rows, write_activity_rows_async
 from .security import (
-    get_password_hash,
     authenticate_user,
     create_access_token,
     get_current_user,
     require_admin,
-    require_organizer,
-    BLACKLIST_TOKENS
+    require_organizer
 )
 from .config import settings
 
-# Create database tables (only if not in testing mode)
+# Schema changes are applied by `python -m app.migrate upgrade`; startup only
+# checks the recorded version (only if not in testing mode)
 if os.getenv("ENVIRONMENT", "development") != "testing":
-    models.Base.metadata.create_all(bind=engine)
+    schema_state = check_schema(engine)
+    if not schema_state["up_to_date"]:
+        print(f"⚠️ Database schema is at version {schema_state['version']}, this code expects "
+              f"{schema_state['expected']} - run `python -m app.migrate upgrade`")
 
 # Initialize Razorpay client (lazy initialization)
 def get_razorpay_client():
@@ -67,6 +82,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 
@@ -156,21 +172,63 @@ def log_activity(
 ):
     """
     Log user activity for audit trail
+    The row is written by the background activity log writer
     """
-    # Get user name
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    user_name = user.username if user else "Unknown"
-    
-    log_entry = models.ActivityLog(
-        user_id=user_id,
-        action_type=action,
-        entity_type=entity_type,
-        entity_id=entity_id,
-        description=description,
-        changes_json=json.dumps(details) if details else None
-    )
-    db.add(log_entry)
-    db.commit()
+    write_activity_rows(db, [activity_row(user_id, action, entity_type, entity_id, description, details)])
+
+
+def log_activities(
+    db: Session,
+    user_id: int,
+    action: str,
+    entity_type: str,
+    entries: List[dict]
+):
+    """
+    Log many activities of the same kind
+    Each entry has entity_id, description and optionally details
+    """
+    write_activity_rows(db, [
+        activity_row(
+            user_id, action, entity_type,
+            entry.get("entity_id"), entry.get("description", ""), entry.get("details")
+        )
+        for entry in entries
+    ])
+
+
+async def log_activity_async(
+    db: AsyncSession,
+    user_id: int,
+    action: str,
+    entity_type: str,
+    entity_id: Optional[int] = None,
+    description: str = "",
+    details: Optional[dict] = None
+):
+    """
+    log_activity for handlers using an AsyncSession
+    """
+    await write_activity_rows_async(db, [activity_row(user_id, action, entity_type, entity_id, description, details)])
+
+
+async def log_activities_async(
+    db: AsyncSession,
+    user_id: int,
+    action: str,
+    entity_type: str,
+    entries: List[dict]
+):
+    """
+    log_activities for handlers using an AsyncSession
+    """
+    await write_activity_rows_async(db, [
+        activity_row(
+            user_id, action, entity_type,
+            entry.get("entity_id"), entry.get("description", ""), entry.get("details")
+        )
+        for entry in entries
+    ])
 
 
 # ============= Background Scheduler =============
@@ -350,6 +408,7 @@ def sync_payments_and_create_attendees():
                                 db.commit()
                                 db.refresh(attendee)
                                 attendees_created += 1
+                                roster_cache.invalidate(event_id)
                                 
                                 # Generate QR token only (no email sent automatically)
                                 try:
@@ -434,6 +493,29 @@ def start_background_scheduler():
 # Start the background scheduler when the app starts (only in production/development, not during testing)
 if os.getenv("ENVIRONMENT", "development") != "testing":
     start_background_scheduler()
+    activity_writer.start()
+
+
+async def start_loop_monitor():
+    """
+    Sample event loop lag on the serving loop
+    """
+    if settings.LOOP_MONITOR_ENABLED and os.getenv("ENVIRONMENT", "development") != "testing":
+        loop_monitor.start(app)
+
+
+app.router.add_event_handler("startup", start_loop_monitor)
+
+
+async def stop_activity_writer():
+    """
+    Flush queued activity rows on shutdown (uvicorn does not reliably run
+    atexit handlers, which stay registered as a fallback)
+    """
+    await asyncio.get_running_loop().run_in_executor(None, activity_writer.stop)
+
+
+app.router.add_event_handler("shutdown", stop_activity_writer)
 
 
 
@@ -442,12 +524,12 @@ if os.getenv("ENVIRONMENT", "development") != "testing":
 @app.post("/api/auth/login", response_model=schemas.Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Login endpoint - Returns JWT token
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     
     if not user:
         raise HTTPException(
@@ -460,7 +542,7 @@ async def login(
     import pytz
     ist = pytz.timezone('Asia/Kolkata')
     user.last_login = datetime.now(ist)
-    db.commit()
+    await db.commit()
     
     # Create access token
     access_token_expires = timedelta(minutes=security.settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -470,7 +552,7 @@ async def login(
     )
     
     # Log activity
-    log_activity(db, user.id, "login", "user", user.id, f"User {user.username} logged in")
+    await log_activity_async(db, user.id, "login", "user", user.id, f"User {user.username} logged in")
     
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -479,15 +561,15 @@ async def login(
 async def logout(
     token: str = Depends(security.oauth2_scheme),
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Logout endpoint - Blacklist token
+    Logout endpoint - Revoke token until it expires
     """
-    BLACKLIST_TOKENS.add(token)
+    await security.revoke_token(token)
     
     # Log activity
-    log_activity(db, current_user.id, "logout", "user", current_user.id, f"User {current_user.username} logged out")
+    await log_activity_async(db, current_user.id, "logout", "user", current_user.id, f"User {current_user.username} logged out")
     
     return {"message": "Successfully logged out"}
 
@@ -495,12 +577,14 @@ async def logout(
 @app.get("/api/auth/me", response_model=schemas.UserWithClub)
 async def get_me(
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get current user information
     """
-    return current_user
+    return (await db.execute(
+        select(models.User).options(selectinload(models.User.club)).where(models.User.id == current_user.id)
+    )).scalars().first()
 
 
 # Continue to next message for more endpoints...
@@ -657,7 +741,7 @@ async def create_user(
             raise HTTPException(status_code=400, detail="Club not found")
     
     # Create user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await security.password_hasher.hash(user.password)
     db_user = models.User(
         username=user.username,
         email=user.email,
@@ -727,7 +811,7 @@ async def update_user(
     for key, value in update_data.items():
         if key == "password" and value:
             # Hash new password
-            db_user.password_hash = get_password_hash(value)
+            db_user.password_hash = await security.password_hasher.hash(value)
             changes["password"] = {"old": "****", "new": "****"}
         else:
             old_value = getattr(db_user, key)
@@ -738,6 +822,8 @@ async def update_user(
     db.commit()
     db.refresh(db_user)
     
+    security.auth_cache.invalidate_user(db_user.username)
+    
     # Log activity
     log_activity(
         db, current_user.id, "update_user", "user", db_user.id,
@@ -767,6 +853,8 @@ async def delete_user(
     db_user.disabled = True
     db.commit()
     
+    security.auth_cache.invalidate_user(db_user.username)
+    
     # Log activity
     log_activity(db, current_user.id, "delete_user", "user", db_user.id, f"Disabled user: {db_user.username}")
     
@@ -789,6 +877,8 @@ async def enable_user(
     db_user.disabled = False
     db.commit()
     
+    security.auth_cache.invalidate_user(db_user.username)
+    
     # Log activity
     log_activity(db, current_user.id, "enable_user", "user", db_user.id, f"Re-enabled user: {db_user.username}")
     
@@ -865,28 +955,91 @@ async def get_club_members(
     return members
 
 
+# Event list sort keys: column and the parser for its cursor value
+# ("created" sorts by id: ids are assigned in creation order and unique)
+EVENT_SORT_COLUMNS = {
+    "date": (models.Event.date, datetime.fromisoformat),
+    "name": (models.Event.name, str),
+    "created": (models.Event.id, int),
+}
+EVENT_PAGE_DEFAULT = 100
+EVENT_PAGE_MAX = 500
+
+
+def event_page(
+    db: Session,
+    response: Response,
+    club_id: Optional[int],
+    when: Optional[str],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    sort: Optional[str],
+    limit: Optional[int],
+    cursor: Optional[str]
+) -> list:
+    """
+    Events with their statistics, in a single query
+
+    Without limit and cursor every event is returned, in creation order
+    unless sort is given (the list before pagination). Otherwise one page
+    (keyset pagination on (sort column, id), newest date first by default):
+    the X-Next-Cursor response header carries the cursor for the next page
+    and is absent on the last page.
+    """
+    paginated = limit is not None or cursor is not None
+    if sort is None:
+        sort = "-date" if paginated else "created"
+    field = sort.lstrip("-")
+    if field not in EVENT_SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(EVENT_SORT_COLUMNS)} (prefix - for descending)")
+    if when not in (None, "upcoming", "past"):
+        raise HTTPException(status_code=400, detail="when must be 'upcoming' or 'past'")
+    column, parse = EVENT_SORT_COLUMNS[field]
+    if paginated:
+        limit = max(1, min(limit or EVENT_PAGE_DEFAULT, EVENT_PAGE_MAX))
+    
+    query = events_with_stats()
+    if club_id is not None:
+        query = query.where(models.Event.club_id == club_id)
+    if when == "upcoming":
+        query = query.where(models.Event.date >= datetime.now(timezone.utc))
+    elif when == "past":
+        query = query.where(models.Event.date < datetime.now(timezone.utc))
+    if date_from:
+        query = query.where(models.Event.date >= date_from)
+    if date_to:
+        query = query.where(models.Event.date <= date_to)
+    
+    # Seek on (sort column, id) - id breaks ties between equal sort values
+    columns = (column, models.Event.id) if column is not models.Event.id else (column,)
+    parsers = (parse, int)[:len(columns)]
+    after = decode_cursor(cursor, parsers) if cursor else None
+    rows = db.execute(seek(query, columns, sort.startswith("-"), after, limit)).all()
+    rows, next_cursor = split_page(rows, limit, lambda row: [getattr(row.Event, c.key) for c in columns])
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return attach_stats(rows)
+
+
 @app.get("/api/club/events", response_model=List[schemas.EventWithDetails])
 async def get_club_events(
+    response: Response,
+    when: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    sort: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     current_user: models.User = Depends(require_organizer),
     db: Session = Depends(get_db)
 ):
     """
-    Get all events of current user's club
+    Get events of current user's club (filters and paging as in list_events)
     """
     if not current_user.club_id:
         raise HTTPException(status_code=404, detail="User not assigned to any club")
     
-    events = db.query(models.Event).filter(models.Event.club_id == current_user.club_id).all()
-    
-    # Add statistics to each event
-    for event in events:
-        event.total_attendees = db.query(models.Attendee).filter(models.Attendee.event_id == event.id).count()
-        event.checked_in_count = db.query(models.Attendee).filter(
-            models.Attendee.event_id == event.id,
-            models.Attendee.checked_in == True
-        ).count()
-    
-    return events
+    return event_page(db, response, current_user.club_id, when, date_from, date_to, sort, limit, cursor)
 
 
 # ============= Events Management =============
@@ -926,56 +1079,97 @@ async def create_event(
 
 @app.get("/api/events", response_model=List[schemas.EventWithDetails])
 async def list_events(
+    response: Response,
+    when: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    sort: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     current_user: models.User = Depends(require_organizer),
     db: Session = Depends(get_db)
 ):
     """
     List events (filtered by club for organizers, all for admin)
+    
+    - when: "upcoming" or "past"; date_from / date_to bound the event date
+    - sort: date, name or created, prefixed with - for descending
+    - limit / cursor: page through the list (page size default 100, max 500,
+      default sort -date). Without either, every event is returned in
+      creation order. Paged responses carry an X-Next-Cursor header while
+      more events follow; pass it back as cursor to get the next page.
     """
-    if current_user.role == "admin":
-        events = db.query(models.Event).all()
-    else:
+    club_id = None
+    if current_user.role != "admin":
         if not current_user.club_id:
             return []
-        events = db.query(models.Event).filter(models.Event.club_id == current_user.club_id).all()
-    
-    # Add statistics
-    for event in events:
-        event.total_attendees = db.query(models.Attendee).filter(models.Attendee.event_id == event.id).count()
-        event.checked_in_count = db.query(models.Attendee).filter(
-            models.Attendee.event_id == event.id,
-            models.Attendee.checked_in == True
-        ).count()
+        club_id = current_user.club_id
     
-    return events
+    return event_page(db, response, club_id, when, date_from, date_to, sort, limit, cursor)
 
 
-@app.get("/api/events/{event_id}", response_model=schemas.EventWithDetails)
-async def get_event(
-    event_id: int,
-    current_user: models.User = Depends(require_organizer),
-    db: Session = Depends(get_db)
-):
+async def event_version(db: AsyncSession, event_id: int, current_user) -> int:
     """
-    Get event details
+    Change version of an event (see event_stats.py), with the access check
     """
-    event = db.query(models.Event).filter(models.Event.id == event_id).first()
+    row = (await db.execute(
+        select(models.Event.club_id, models.EventStats.version).outerjoin(
+            models.EventStats, models.EventStats.event_id == models.Event.id
+        ).where(models.Event.id == event_id)
+    )).first()
     
-    if not event:
+    if not row:
         raise HTTPException(status_code=404, detail="Event not found")
     
-    # Check access
-    if current_user.role != "admin" and event.club_id != current_user.club_id:
+    if current_user.role != "admin" and row.club_id != current_user.club_id:
         raise HTTPException(status_code=403, detail="Access denied")
+    return row.version or 0
+
+
+async def versioned_response(request: Request, db: AsyncSession, event_id: int, current_user, build) -> Response:
+    """
+    Serve an event response from response_cache while the event's version is
+    unchanged, or a bare 304 when the client's If-None-Match is still current.
+    build(headers) returns the payload and may add response headers.
+    """
+    version = await event_version(db, event_id, current_user)
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    etag = make_etag(key, version)
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
     
-    # Add statistics
-    event.total_attendees = db.query(models.Attendee).filter(models.Attendee.event_id == event.id).count()
-    event.checked_in_count = db.query(models.Attendee).filter(
-        models.Attendee.event_id == event.id,
-        models.Attendee.checked_in == True
-    ).count()
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        response_cache.record_not_modified()
+        return Response(status_code=304, headers=cache_headers)
     
-    return event
+    cached = response_cache.get(key, version)
+    if cached is None:
+        headers = {}
+        body = JSONResponse(jsonable_encoder(await build(headers))).body
+        response_cache.put(key, version, body, headers)
+    else:
+        body, headers = cached
+    return Response(content=body, media_type="application/json", headers={**headers, **cache_headers})
+
+
+@app.get("/api/events/{event_id}", response_model=schemas.EventWithDetails)
+async def get_event(
+    event_id: int,
+    request: Request,
+    current_user: models.User = Depends(require_organizer),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get event details (cached; supports ETag / If-None-Match)
+    """
+    async def build(headers: dict):
+        row = (await db.execute(events_with_stats().where(models.Event.id == event_id))).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Event not found")
+        
+        # Add statistics
+        return schemas.EventWithDetails.model_validate(attach_stats([row])[0])
+    
+    return await versioned_response(request, db, event_id, current_user, build)
 
 
 @app.put("/api/events/{event_id}", response_model=schemas.Event)
@@ -1010,6 +1204,9 @@ async def update_event(
     db.commit()
     db.refresh(db_event)
     
+    if "scan_debounce_seconds" in changes:
+        roster_cache.invalidate(event_id)
+    
     # Log activity
     log_activity(
         db, current_user.id, "update_event", "event", db_event.id,
@@ -1044,6 +1241,8 @@ async def delete_event(
     db.delete(db_event)
     db.commit()
     
+    roster_cache.invalidate(event_id)
+    
     return {"message": f"Event {db_event.name} has been deleted"}
 
 
@@ -1051,34 +1250,86 @@ async def delete_event(
 
 # ============= Attendee Management =============
 
-@app.get("/api/events/{event_id}/attendees")
-async def get_event_attendees(
-    event_id: int,
-    current_user: models.User = Depends(require_organizer),
-    db: Session = Depends(get_db)
-):
+ATTENDEE_PAGE_DEFAULT = 500
+ATTENDEE_PAGE_MAX = 2000
+
+
+def match_payments(attendees: list, payments: list) -> dict:
     """
-    Get all attendees for an event with payment details
+    Map attendee id -> payment matched by email or phone (first payment by id)
     """
-    # Check event access
-    event = db.query(models.Event).filter(models.Event.id == event_id).first()
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    
-    if current_user.role != "admin" and event.club_id != current_user.club_id:
-        raise HTTPException(status_code=403, detail="Access denied")
+    by_email, by_phone = {}, {}
+    for payment in sorted(payments, key=lambda p: p.id):
+        if payment.customer_email:
+            by_email.setdefault(payment.customer_email, payment)
+        if payment.customer_phone:
+            by_phone.setdefault(payment.customer_phone, payment)
     
-    attendees = db.query(models.Attendee).filter(models.Attendee.event_id == event_id).all()
+    matched = {}
+    for attendee in attendees:
+        candidates = [by_email.get(attendee.email), by_phone.get(attendee.phone) if attendee.phone else None]
+        candidates = [payment for payment in candidates if payment is not None]
+        if candidates:
+            matched[attendee.id] = min(candidates, key=lambda p: p.id)
+    return matched
+
+
+async def attendee_page(
+    db: AsyncSession,
+    headers: dict,
+    event_id: int,
+    branch: Optional[str],
+    year: Optional[int],
+    section: Optional[str],
+    checked_in: Optional[bool],
+    limit: Optional[int],
+    cursor: Optional[str]
+) -> list:
+    """
+    One page of an event's attendees enriched with their payments, in id
+    order. Without limit and cursor every attendee is returned (the list
+    before pagination); otherwise the X-Next-Cursor header carries the
+    cursor for the next page and is absent on the last page.
+    """
+    if limit is not None or cursor is not None:
+        limit = max(1, min(limit or ATTENDEE_PAGE_DEFAULT, ATTENDEE_PAGE_MAX))
+    query = select(models.Attendee).options(joinedload(models.Attendee.checker)).where(
+        models.Attendee.event_id == event_id
+    )
+    if branch is not None:
+        query = query.where(models.Attendee.branch == branch)
+    if year is not None:
+        query = query.where(models.Attendee.year == year)
+    if section is not None:
+        query = query.where(models.Attendee.section == section)
+    if checked_in is not None:
+        query = query.where(models.Attendee.checked_in == checked_in)
+    
+    after = decode_cursor(cursor, (int,)) if cursor else None
+    attendees = (await db.execute(
+        seek(query, (models.Attendee.id,), False, after, limit)
+    )).scalars().all()
+    attendees, next_cursor = split_page(list(attendees), limit, lambda attendee: [attendee.id])
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    
+    # Payments for the whole page in one query, matched by email or phone in memory
+    emails = {attendee.email for attendee in attendees}
+    phones = {attendee.phone for attendee in attendees if attendee.phone}
+    payments = []
+    if attendees:
+        payments = (await db.execute(
+            select(models.Payment).where(
+                models.Payment.event_id == event_id,
+                models.Payment.customer_email.in_(emails) | models.Payment.customer_phone.in_(phones)
+            )
+        )).scalars().all()
+    payment_for = match_payments(attendees, payments)
     
     # Enrich attendees with payment information
     enriched_attendees = []
     for attendee in attendees:
-        # Get payment information for this attendee
-        payment = db.query(models.Payment).filter(
-            models.Payment.event_id == event_id,
-            (models.Payment.customer_email == attendee.email) | 
-            (models.Payment.customer_phone == attendee.phone)
-        ).first()
+        payment = payment_for.get(attendee.id)
         
         # Create enriched attendee data
         attendee_data = {
@@ -1127,6 +1378,35 @@ async def get_event_attendees(
     return enriched_attendees
 
 
+@app.get("/api/events/{event_id}/attendees")
+async def get_event_attendees(
+    event_id: int,
+    request: Request,
+    branch: Optional[str] = None,
+    year: Optional[int] = None,
+    section: Optional[str] = None,
+    checked_in: Optional[bool] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    current_user: models.User = Depends(require_organizer),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get attendees for an event with payment details (cached; supports
+    ETag / If-None-Match)
+    
+    - branch / year / section / checked_in filter the list
+    - limit / cursor: page through the list (page size default 500, max
+      2000). Without either, every attendee is returned. Paged responses
+      carry an X-Next-Cursor header while more attendees follow; pass it
+      back as cursor to get the next page.
+    """
+    async def build(headers: dict):
+        return await attendee_page(db, headers, event_id, branch, year, section, checked_in, limit, cursor)
+    
+    return await versioned_response(request, db, event_id, current_user, build)
+
+
 @app.get("/api/events/{event_id}/attendees/template")
 async def download_template(
     event_id: int,
@@ -1255,6 +1535,9 @@ async def upload_attendees_csv(
         
         db.commit()
         
+        if added_count > 0:
+            roster_cache.invalidate(event_id)
+        
         # Generate QR codes for all uploaded attendees
         if added_count > 0:
             print(f"🔄 Generating QR codes for {added_count} uploaded attendees...")
@@ -1360,6 +1643,8 @@ async def create_attendee(
     db.commit()
     db.refresh(attendee)
     
+    roster_cache.invalidate(event_id)
+    
     # Generate QR token for the attendee (if not already exists)
     try:
         if not attendee.qr_token:
@@ -1456,6 +1741,9 @@ async def update_attendee(
     db.commit()
     db.refresh(attendee)
     
+    if changes:
+        roster_cache.invalidate(attendee.event_id)
+    
     # Log activity
     log_activity(
         db, current_user.id, "update_attendee", "attendee", attendee.id,
@@ -1491,9 +1779,12 @@ async def delete_attendee(
         f"Deleted attendee: {attendee.name} ({attendee.email})"
     )
     
+    event_id = attendee.event_id
     db.delete(attendee)
     db.commit()
     
+    roster_cache.invalidate(event_id)
+    
     return {"message": "Attendee deleted successfully"}
 
 
@@ -1987,16 +2278,36 @@ async def validate_qr_token(
             "event": None
         }
 
+async def checkin_attendee(db: AsyncSession, attendee_id: int) -> Optional[schemas.AttendeeWithChecker]:
+    """
+    Full attendee (with checker) for a scan response, loaded by primary key
+    once the check-in state has been decided from the roster
+    """
+    result = await db.execute(
+        select(models.Attendee).options(joinedload(models.Attendee.checker)).where(models.Attendee.id == attendee_id)
+    )
+    attendee = result.scalar_one_or_none()
+    return schemas.AttendeeWithChecker.model_validate(attendee) if attendee else None
+
+
 @app.post("/api/checkin/scan", response_model=schemas.CheckInResponse)
 async def scan_qr_checkin(
     checkin_request: schemas.CheckInRequest,
     current_user: models.User = Depends(require_organizer),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Scan QR code and check-in attendee with race condition handling
+    Event and attendee are resolved from the cached roster; the only database
+    write is a conditional update of the attendee's check-in state
     """
     try:
+        # Repeat scans of the same badge are answered from the first result
+        scan_digest = utils.qr_token_digest(checkin_request.qr_token)
+        recent_response = scan_debouncer.recent(scan_digest, current_user)
+        if recent_response is not None:
+            return recent_response
+        
         # Verify QR token
         payload = utils.verify_qr_token(checkin_request.qr_token)
         
@@ -2011,9 +2322,9 @@ async def scan_qr_checkin(
                 "attendee": None
             }
         
-        # Get event with lock to prevent race conditions
-        event = db.query(models.Event).filter(models.Event.id == event_id).first()
-        if not event:
+        # Resolve event and attendee from the in-memory roster
+        roster = await db.run_sync(roster_cache.get, event_id)
+        if not roster:
             return {
                 "success": False,
                 "message": "Event not found - Please contact organizer",
@@ -2021,72 +2332,85 @@ async def scan_qr_checkin(
             }
         
         # Check access
-        if current_user.role != "admin" and event.club_id != current_user.club_id:
+        if current_user.role != "admin" and roster.club_id != current_user.club_id:
             return {
                 "success": False,
                 "message": "Access denied - You are not authorized for this event",
                 "attendee": None
             }
         
-        # Get attendee with row-level lock to prevent race conditions
-        from sqlalchemy import text
-        attendee = db.execute(
-            text("SELECT * FROM attendees WHERE id = :attendee_id FOR UPDATE"),
-            {"attendee_id": attendee_id}
-        ).fetchone()
-        
-        if not attendee:
+        entry = await db.run_sync(roster_cache.get_entry, roster, attendee_id)
+        if not entry:
             return {
                 "success": False,
                 "message": "Attendee not found - Please contact organizer",
                 "attendee": None
             }
         
-        # Convert row to model for easier handling
-        attendee_model = db.query(models.Attendee).filter(models.Attendee.id == attendee_id).first()
+        import pytz
+        ist = pytz.timezone('Asia/Kolkata')
         
-        # Check if already checked in (double-check after lock)
-        if attendee_model.checked_in:
-            import pytz
-            ist = pytz.timezone('Asia/Kolkata')
-            checkin_time_str = attendee_model.checkin_time.astimezone(ist).strftime('%I:%M %p on %d %b %Y')
-            return {
+        # Check if already checked in
+        if entry.checked_in:
+            checkin_time_str = entry.checkin_time.astimezone(ist).strftime('%I:%M %p on %d %b %Y')
+            response = {
                 "success": False,
-                "message": f"✅ {attendee_model.name} (Roll: {attendee_model.roll_number}) is already checked in at {checkin_time_str}",
-                "attendee": attendee_model
+                "message": f"✅ {entry.name} (Roll: {entry.roll_number}) is already checked in at {checkin_time_str}",
+                "attendee": await checkin_attendee(db, entry.id)
             }
+            scan_debouncer.record(scan_digest, roster, response)
+            return response
         
-        # Check-in with timestamp
-        import pytz
-        ist = pytz.timezone('Asia/Kolkata')
+        # Check-in with timestamp - atomic conditional update, only succeeds once
         current_time = datetime.now(ist)
         
-        attendee_model.checked_in = True
-        attendee_model.checkin_time = current_time
-        attendee_model.checked_by = current_user.id
-        
         try:
-            db.commit()
-            db.refresh(attendee_model)
+            result = await db.run_sync(atomic_checkin, entry.id, current_user.id, current_time, roster.event_id)
+            await db.commit()
+            
+            if not result.found:
+                await db.run_sync(roster_cache.refresh_entry, roster, entry.id)
+                return {
+                    "success": False,
+                    "message": "Attendee not found - Please contact organizer",
+                    "attendee": None
+                }
+            
+            entry = roster_cache.store_row(roster, result.attendee)
+            attendee = await checkin_attendee(db, entry.id)
+            
+            checkin_time_str = entry.checkin_time.astimezone(ist).strftime('%I:%M %p on %d %b %Y')
+            already_checked_in_response = {
+                "success": False,
+                "message": f"✅ {entry.name} (Roll: {entry.roll_number}) is already checked in at {checkin_time_str}",
+                "attendee": attendee
+            }
+            scan_debouncer.record(scan_digest, roster, already_checked_in_response)
+            
+            if not result.checked_in_now:
+                # Checked in concurrently (e.g. by another worker) - report the stored state
+                return already_checked_in_response
+            
+            publish_checkin(roster, entry, "scan")
             
             # Log activity
-            log_activity(
-                db, current_user.id, "checkin_scan", "attendee", attendee_model.id,
-                f"Checked in: {attendee_model.name} ({attendee_model.roll_number}) via QR scan"
+            await log_activity_async(
+                db, current_user.id, "checkin_scan", "attendee", entry.id,
+                f"Checked in: {entry.name} ({entry.roll_number}) via QR scan"
             )
             
             # Format success message with person's details
             checkin_time_str = current_time.strftime('%I:%M %p on %d %b %Y')
-            success_message = f"✅ Check-in successful!\n\n👤 Name: {attendee_model.name}\n🎓 Roll Number: {attendee_model.roll_number}\n🏫 Branch: {attendee_model.branch}\n📅 Checked in at: {checkin_time_str}"
+            success_message = f"✅ Check-in successful!\n\n👤 Name: {entry.name}\n🎓 Roll Number: {entry.roll_number}\n🏫 Branch: {entry.branch}\n📅 Checked in at: {checkin_time_str}"
             
             return {
                 "success": True,
                 "message": success_message,
-                "attendee": attendee_model
+                "attendee": attendee
             }
             
         except Exception as db_error:
-            db.rollback()
+            await db.rollback()
             return {
                 "success": False,
                 "message": f"Database error during check-in: {str(db_error)}",
@@ -2123,86 +2447,307 @@ async def scan_qr_checkin(
         }
 
 
-@app.post("/api/attendees/{attendee_id}/checkin-manual")
-async def manual_checkin(
-    attendee_id: int,
+@app.post("/api/checkin/batch", response_model=schemas.BatchCheckInResponse)
+async def batch_scan_checkin(
+    batch_request: schemas.BatchCheckInRequest,
     current_user: models.User = Depends(require_organizer),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Manual check-in for an attendee with race condition handling
+    Replay scans buffered by scanner devices while offline
+    Tokens are verified once per distinct token, all check-ins are applied in
+    one transaction and activity logs are written with one multi-row insert
     """
-    # Get attendee with row-level lock to prevent race conditions
-    from sqlalchemy import text
-    attendee_row = db.execute(
-        text("SELECT * FROM attendees WHERE id = :attendee_id FOR UPDATE"),
-        {"attendee_id": attendee_id}
-    ).fetchone()
+    import pytz
+    ist = pytz.timezone('Asia/Kolkata')
+    current_time = datetime.now(ist)
+    
+    scans = batch_request.scans
+    results = [None] * len(scans)
+    
+    # When each scan happened (naive timestamps are device-local IST, never in the future)
+    scanned_times = []
+    for scan in scans:
+        scanned_at = scan.scanned_at or current_time
+        if scanned_at.tzinfo is None:
+            scanned_at = ist.localize(scanned_at)
+        scanned_times.append(min(scanned_at, current_time))
+    
+    def set_result(index, success, status, message, attendee=None):
+        results[index] = {
+            "index": index,
+            "success": success,
+            "status": status,
+            "message": message,
+            "device_id": scans[index].device_id,
+            "attendee": attendee
+        }
     
-    if not attendee_row:
-        raise HTTPException(status_code=404, detail="Attendee not found")
+    # Verify each distinct token once
+    payloads = {}
+    for token in {scan.qr_token for scan in scans}:
+        try:
+            payloads[token] = utils.verify_qr_token(token)
+        except ValueError as e:
+            payloads[token] = e
+    
+    # Group valid scans by event
+    scans_by_event = {}
+    for index, scan in enumerate(scans):
+        payload = payloads[scan.qr_token]
+        if isinstance(payload, ValueError):
+            if "expired" in str(payload).lower():
+                set_result(index, False, "expired", "❌ QR code has expired - Please request a new QR code")
+            else:
+                set_result(index, False, "invalid", "❌ Invalid QR code - Please scan a valid QR code")
+            continue
+        
+        event_id = payload.get("event_id")
+        attendee_id = payload.get("attendee_id")
+        if not event_id or not attendee_id:
+            set_result(index, False, "invalid", "Invalid QR code - Missing event or attendee information")
+            continue
+        
+        scans_by_event.setdefault(event_id, []).append((index, attendee_id))
     
-    # Get attendee model for easier handling
-    attendee = db.query(models.Attendee).filter(models.Attendee.id == attendee_id).first()
+    log_entries = []
+    checked_in_entries = []
     
-    # Check event access
-    event = db.query(models.Event).filter(models.Event.id == attendee.event_id).first()
+    try:
+        # Resolve every scan against the cached rosters first
+        pending = []
+        for event_id, event_scans in scans_by_event.items():
+            roster = await db.run_sync(roster_cache.get, event_id)
+            if not roster:
+                for index, _ in event_scans:
+                    set_result(index, False, "not_found", "Event not found - Please contact organizer")
+                continue
+            
+            if current_user.role != "admin" and roster.club_id != current_user.club_id:
+                for index, _ in event_scans:
+                    set_result(index, False, "access_denied", "Access denied - You are not authorized for this event")
+                continue
+            
+            # The earliest scan of each attendee performs the check-in
+            event_scans.sort(key=lambda item: scanned_times[item[0]])
+            
+            checkins = {}
+            first_scan = {}
+            for index, attendee_id in event_scans:
+                entry = await db.run_sync(roster_cache.get_entry, roster, attendee_id)
+                if not entry:
+                    set_result(index, False, "not_found", "Attendee not found - Please contact organizer")
+                    continue
+                if attendee_id in first_scan:
+                    continue
+                first_scan[attendee_id] = index
+                if not entry.checked_in:
+                    checkins[attendee_id] = scanned_times[index]
+            pending.append((roster, event_scans, checkins, first_scan))
+        
+        # Then write the check-ins: each event's stats row stays locked from
+        # here to the commit, so keep that short and lock in event id order
+        pending.sort(key=lambda item: item[0].event_id)
+        for roster, event_scans, checkins, first_scan in pending:
+            checkin_rows = {
+                row.id: row for row in await db.run_sync(batch_checkin, checkins, current_user.id, roster.event_id)
+            }
+            
+            # Attendees that lost a race with another scanner - re-read their state
+            for attendee_id in checkins:
+                if attendee_id in checkin_rows:
+                    roster_cache.store_row(roster, checkin_rows[attendee_id])
+                else:
+                    await db.run_sync(roster_cache.refresh_entry, roster, attendee_id)
+            
+            for index, attendee_id in event_scans:
+                if results[index] is not None:
+                    continue
+                
+                entry = roster.entries.get(attendee_id)
+                if not entry:
+                    set_result(index, False, "not_found", "Attendee not found - Please contact organizer")
+                    continue
+                
+                checkin_time_str = entry.checkin_time.astimezone(ist).strftime('%I:%M %p on %d %b %Y')
+                
+                if first_scan[attendee_id] != index:
+                    set_result(index, False, "duplicate", f"✅ {entry.name} (Roll: {entry.roll_number}) was already scanned in this batch", entry)
+                elif attendee_id in checkin_rows:
+                    set_result(index, True, "checked_in", f"✅ {entry.name} (Roll: {entry.roll_number}) checked in at {checkin_time_str}", entry)
+                    checked_in_entries.append((roster, entry))
+                    log_entries.append({
+                        "entity_id": entry.id,
+                        "description": f"Checked in: {entry.name} ({entry.roll_number}) via batch upload",
+                        "details": {
+                            "device_id": scans[index].device_id,
+                            "scanned_at": scans[index].scanned_at.isoformat() if scans[index].scanned_at else None
+                        }
+                    })
+                else:
+                    set_result(index, False, "already_checked_in", f"✅ {entry.name} (Roll: {entry.roll_number}) is already checked in at {checkin_time_str}", entry)
+        
+        # Build (and validate) the response before committing: once the
+        # check-ins are saved the scanner must get their results
+        checked_in = sum(1 for result in results if result["status"] == "checked_in")
+        already_checked_in = sum(1 for result in results if result["status"] in ("already_checked_in", "duplicate"))
+        response = schemas.BatchCheckInResponse(
+            total=len(results),
+            checked_in=checked_in,
+            already_checked_in=already_checked_in,
+            failed=len(results) - checked_in - already_checked_in,
+            results=results
+        )
+        
+        await db.commit()
+    
+    except Exception as db_error:
+        await db.rollback()
+        # Nothing from this batch was applied - make sure the cache agrees
+        for event_id in scans_by_event:
+            roster_cache.invalidate(event_id)
+        raise HTTPException(status_code=500, detail=f"Error during batch check-in, nothing was saved: {str(db_error)}")
+    
+    await log_activities_async(db, current_user.id, "checkin_batch", "attendee", log_entries)
+    
+    for roster, entry in checked_in_entries:
+        publish_checkin(roster, entry, "batch")
+    
+    return response
+
+
+@app.post("/api/events/{event_id}/roster/warm", response_model=schemas.RosterWarmResponse)
+async def warm_event_roster(
+    event_id: int,
+    current_user: models.User = Depends(require_organizer),
+    db: Session = Depends(get_db)
+):
+    """
+    Load the check-in roster of an event into memory before the gates open
+    """
+    event = db.query(models.Event).filter(models.Event.id == event_id).first()
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     
     if current_user.role != "admin" and event.club_id != current_user.club_id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    # Check if already checked in (double-check after lock)
-    if attendee.checked_in:
-        import pytz
-        ist = pytz.timezone('Asia/Kolkata')
-        checkin_time_str = attendee.checkin_time.astimezone(ist).strftime('%I:%M %p on %d %b %Y')
-        raise HTTPException(
-            status_code=400,
-            detail=f"✅ {attendee.name} (Roll: {attendee.roll_number}) is already checked in at {checkin_time_str}"
-        )
+    roster = roster_cache.load(db, event_id)
     
-    try:
-        # Check-in with timestamp
-        import pytz
-        ist = pytz.timezone('Asia/Kolkata')
-        current_time = datetime.now(ist)
-        
-        attendee.checked_in = True
-        attendee.checkin_time = current_time
-        attendee.checked_by = current_user.id
-        db.commit()
-        
-        # Log activity
-        log_activity(
-            db, current_user.id, "checkin_manual", "attendee", attendee.id,
-            f"Manually checked in: {attendee.name} ({attendee.roll_number})"
-        )
-        
-        # Format success message with person's details
-        checkin_time_str = current_time.strftime('%I:%M %p on %d %b %Y')
-        success_message = f"✅ Manual check-in successful!\n\n👤 Name: {attendee.name}\n🎓 Roll Number: {attendee.roll_number}\n🏫 Branch: {attendee.branch}\n📅 Checked in at: {checkin_time_str}"
-        
-        return {"message": success_message}
-        
-    except Exception as db_error:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Database error during check-in: {str(db_error)}")
+    return {
+        "event_id": event_id,
+        "attendees": len(roster.entries),
+        "checked_in": sum(1 for entry in roster.entries.values() if entry.checked_in)
+    }
 
 
-# Continue to next message for Dashboard and Export endpoints...
+# Columns of each row in offline roster snapshots and deltas
+ROSTER_SNAPSHOT_FIELDS = ["digest", "id", "name", "roll_number", "checked_in"]
 
-# ============= Dashboard with Segregation =============
 
-@app.get("/api/events/{event_id}/dashboard")
-async def get_event_dashboard(
+def roster_snapshot_rows(db: Session, event_id: int, since: Optional[int] = None):
+    """
+    Load roster rows for offline scanners, optionally only rows changed after
+    an event version. Returns (rows, cursor) - the cursor is an opaque token
+    for the event version the rows are current at.
+    """
+    # Read the version first: rows committed after it are re-sent next time, never skipped
+    version = db.query(models.EventStats.version).filter(models.EventStats.event_id == event_id).scalar() or 0
+    
+    query = db.query(
+        models.Attendee.qr_token,
+        models.Attendee.id,
+        models.Attendee.name,
+        models.Attendee.roll_number,
+        models.Attendee.checked_in
+    ).filter(models.Attendee.event_id == event_id)
+    
+    if since is not None:
+        query = query.filter(models.Attendee.roster_version > since)
+        # Never move a device's cursor backwards
+        version = max(version, since)
+    
+    rows = query.order_by(models.Attendee.id).all()
+    
+    compact_rows = [
+        [
+            utils.qr_token_digest(row.qr_token) if row.qr_token else None,
+            row.id,
+            row.name,
+            row.roll_number,
+            bool(row.checked_in)
+        ]
+        for row in rows
+    ]
+    
+    return compact_rows, encode_cursor([event_id, version])
+
+
+def roster_removed_ids(db: Session, event_id: int, since: int) -> List[int]:
+    """
+    Ids of attendees removed from an event after an event version (tombstones)
+    """
+    return [
+        attendee_id for (attendee_id,) in db.query(models.AttendeeTombstone.attendee_id).filter(
+            models.AttendeeTombstone.event_id == event_id,
+            models.AttendeeTombstone.roster_version > since
+        ).order_by(models.AttendeeTombstone.attendee_id).distinct()
+    ]
+
+
+def signed_roster_payload(payload: dict) -> dict:
+    """
+    Add the HMAC signature - scanners trust rosters only when it verifies,
+    so nothing is served while ROSTER_SNAPSHOT_SECRET is not configured
+    """
+    signature = utils.sign_roster_payload(payload)
+    if not signature:
+        raise HTTPException(status_code=503, detail="Offline rosters are not configured (ROSTER_SNAPSHOT_SECRET is not set)")
+    payload["signature"] = signature
+    return payload
+
+
+@app.get("/api/events/{event_id}/roster/snapshot")
+async def get_roster_snapshot(
+    event_id: int,
+    current_user: models.User = Depends(require_organizer),
+    db: Session = Depends(get_db)
+):
+    """
+    Export a compact roster (token digest -> attendee) for offline scanners,
+    signed with ROSTER_SNAPSHOT_SECRET (503 while it is not set)
+    Use the returned version as the cursor for /roster/delta
+    """
+    # Check event access
+    event = db.query(models.Event).filter(models.Event.id == event_id).first()
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    
+    if current_user.role != "admin" and event.club_id != current_user.club_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    rows, version = roster_snapshot_rows(db, event_id)
+    
+    return signed_roster_payload({
+        "event_id": event_id,
+        "version": version,
+        "count": len(rows),
+        "fields": ROSTER_SNAPSHOT_FIELDS,
+        "rows": rows
+    })
+
+
+@app.get("/api/events/{event_id}/roster/delta")
+async def get_roster_delta(
     event_id: int,
+    since: str,
     current_user: models.User = Depends(require_organizer),
     db: Session = Depends(get_db)
 ):
     """
-    Get event dashboard with segregated attendee data (Branch -> Year -> Section)
+    Return roster rows changed since a version cursor from a snapshot or earlier delta
+    Attendees removed since then are listed by id in deleted; count is the
+    event's roster size after applying the delta
     """
     # Check event access
     event = db.query(models.Event).filter(models.Event.id == event_id).first()
@@ -2212,88 +2757,339 @@ async def get_event_dashboard(
     if current_user.role != "admin" and event.club_id != current_user.club_id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    # Get all attendees
-    attendees = db.query(models.Attendee).filter(models.Attendee.event_id == event_id).all()
+    cursor_event_id, since_version = decode_cursor(since, (int, int))
+    if cursor_event_id != event_id:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    rows, version = roster_snapshot_rows(db, event_id, since=since_version)
+    # An attendee moved back into the event is sent as a row, not as removed
+    row_ids = {row[1] for row in rows}
+    deleted = [attendee_id for attendee_id in roster_removed_ids(db, event_id, since_version) if attendee_id not in row_ids]
+    count = db.query(func.count(models.Attendee.id)).filter(models.Attendee.event_id == event_id).scalar()
+    
+    return signed_roster_payload({
+        "event_id": event_id,
+        "since": since,
+        "version": version,
+        "count": count,
+        "fields": ROSTER_SNAPSHOT_FIELDS,
+        "rows": rows,
+        "deleted": deleted
+    })
+
+
+def deliver_checkin(event_id: int, message: dict):
+    """
+    Check-in relayed from any worker (this one included): record it in this
+    worker's roster, then push it to the dashboards connected here
+    """
+    if message.get("checkin_time"):
+        roster_cache.mark_checked_in(
+            event_id, message["attendee_id"], datetime.fromisoformat(message["checkin_time"]), message.get("checked_by")
+        )
+    checkin_stream.publish(event_id, message)
+
+
+# Relays check-ins between workers through Redis (None: this worker's dashboards only)
+checkin_relay = create_checkin_relay(deliver_checkin)
+
+
+async def start_checkin_relay():
+    if checkin_relay is not None:
+        checkin_relay.start()
+
+
+async def stop_checkin_relay():
+    if checkin_relay is not None:
+        await checkin_relay.stop()
+
+
+app.router.add_event_handler("startup", start_checkin_relay)
+app.router.add_event_handler("shutdown", stop_checkin_relay)
+
+
+def live_checkins_watched(event_id: int) -> bool:
+    """
+    Whether a check-in may have dashboards to reach (on any worker when relayed)
+    """
+    return checkin_relay is not None or checkin_stream.has_subscribers(event_id)
+
+
+def publish_checkin(roster, entry, source: str):
+    """
+    Push a check-in delta to the live dashboards of the attendee's event
+    """
+    if entry is None or not live_checkins_watched(roster.event_id):
+        return
+    message = roster_cache.checkin_delta(roster, entry)
+    message["source"] = source
+    if checkin_relay is not None:
+        checkin_relay.send(roster.event_id, message)
+    else:
+        checkin_stream.publish(roster.event_id, message)
+
+
+def live_event_roster(db: Session, event_id: int, current_user: models.User):
+    """
+    Resolve the roster of an event for a live stream, checking access
+    """
+    roster = roster_cache.get(db, event_id)
+    if not roster:
+        raise HTTPException(status_code=404, detail="Event not found")
+    
+    if current_user.role != "admin" and roster.club_id != current_user.club_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    return roster
+
+
+def live_snapshot_message(roster) -> dict:
+    """
+    First message of a live stream: the current counters of every group
+    """
+    return {
+        "type": "snapshot",
+        "event_id": roster.event_id,
+        "counters": roster_cache.counters_snapshot(roster)
+    }
+
+
+@app.get("/api/events/{event_id}/live")
+async def stream_live_checkins(
+    event_id: int,
+    request: Request,
+    current_user: models.User = Depends(require_organizer),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Server-sent event stream of check-ins for an event dashboard
+    Sends a "snapshot" event with all branch/year/section counters, then one
+    "checkin" event per check-in with the attendee, section path and new counters
+    """
+    roster = await db.run_sync(live_event_roster, event_id, current_user)
+    # Release the pooled connection - the stream itself never touches the database
+    await db.close()
+    
+    # Subscribe before taking the snapshot so no check-in falls in between
+    queue = checkin_stream.subscribe(event_id)
+    snapshot = live_snapshot_message(roster)
+    
+    async def event_source():
+        try:
+            yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(), timeout=settings.LIVE_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+        finally:
+            checkin_stream.unsubscribe(event_id, queue)
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.websocket("/api/events/{event_id}/live/ws")
+async def websocket_live_checkins(websocket: WebSocket, event_id: int, token: str = ""):
+    """
+    WebSocket variant of the live check-in stream
+    Browsers cannot set headers on WebSockets, so the access token is passed
+    as the ?token= query parameter
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            current_user = require_organizer(await get_current_user(token=token, db=db))
+            roster = await db.run_sync(live_event_roster, event_id, current_user)
+        except HTTPException as e:
+            await websocket.close(code=1008, reason=str(e.detail))
+            return
+    
+    await websocket.accept()
+    queue = checkin_stream.subscribe(event_id)
+    
+    async def forward_checkins():
+        while True:
+            await websocket.send_json(await queue.get())
+    
+    sender = None
+    try:
+        await websocket.send_json(live_snapshot_message(roster))
+        sender = asyncio.create_task(forward_checkins())
+        # Clients only listen - receiving just waits for the disconnect
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if sender is not None:
+            sender.cancel()
+        checkin_stream.unsubscribe(event_id, queue)
+
+
+@app.post("/api/attendees/{attendee_id}/checkin-manual")
+async def manual_checkin(
+    attendee_id: int,
+    current_user: models.User = Depends(require_organizer),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Manual check-in for an attendee with race condition handling
+    """
+    # Get attendee's event for the access check
+    attendee_event = (await db.execute(
+        select(models.Attendee.event_id, models.Event.club_id).join(
+            models.Event, models.Event.id == models.Attendee.event_id
+        ).where(models.Attendee.id == attendee_id)
+    )).first()
+    
+    if not attendee_event:
+        raise HTTPException(status_code=404, detail="Attendee not found")
+    
+    if current_user.role != "admin" and attendee_event.club_id != current_user.club_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    import pytz
+    ist = pytz.timezone('Asia/Kolkata')
+    current_time = datetime.now(ist)
+    
+    try:
+        # Check-in with timestamp - atomic conditional update, only succeeds once
+        result = await db.run_sync(
+            atomic_checkin, attendee_id, current_user.id, current_time, attendee_event.event_id
+        )
+        await db.commit()
+    except Exception as db_error:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error during check-in: {str(db_error)}")
+    
+    if not result.found:
+        raise HTTPException(status_code=404, detail="Attendee not found")
+    
+    attendee = result.attendee
+    
+    if not result.checked_in_now:
+        checkin_time_str = attendee.checkin_time.astimezone(ist).strftime('%I:%M %p on %d %b %Y')
+        raise HTTPException(
+            status_code=400,
+            detail=f"✅ {attendee.name} (Roll: {attendee.roll_number}) is already checked in at {checkin_time_str}"
+        )
+    
+    roster_cache.mark_checked_in(attendee.event_id, attendee.id, current_time, current_user.id)
+    
+    if live_checkins_watched(attendee.event_id):
+        roster = await db.run_sync(roster_cache.get, attendee.event_id)
+        publish_checkin(roster, roster.entries.get(attendee.id) if roster else None, "manual")
+    
+    # Log activity
+    await log_activity_async(
+        db, current_user.id, "checkin_manual", "attendee", attendee.id,
+        f"Manually checked in: {attendee.name} ({attendee.roll_number})"
+    )
+    
+    # Format success message with person's details
+    checkin_time_str = current_time.strftime('%I:%M %p on %d %b %Y')
+    success_message = f"✅ Manual check-in successful!\n\n👤 Name: {attendee.name}\n🎓 Roll Number: {attendee.roll_number}\n🏫 Branch: {attendee.branch}\n📅 Checked in at: {checkin_time_str}"
     
-    # Calculate overall stats
-    total_attendees = len(attendees)
-    checked_in = sum(1 for a in attendees if a.checked_in)
-    not_checked_in = total_attendees - checked_in
-    qr_generated = sum(1 for a in attendees if a.qr_generated)
-    qr_pending = total_attendees - qr_generated
-    email_sent = sum(1 for a in attendees if a.email_sent)
-    email_failed = sum(1 for a in attendees if a.email_error)
+    return {"message": success_message}
+
+
+# Continue to next message for Dashboard and Export endpoints...
+
+# ============= Dashboard with Segregation =============
+
+def dashboard_attendee(attendee: models.Attendee) -> dict:
+    """
+    Attendee as listed in a dashboard section (checker must be loaded)
+    """
+    return {
+        "id": attendee.id,
+        "name": attendee.name,
+        "email": attendee.email,
+        "roll_number": attendee.roll_number,
+        "phone": attendee.phone,
+        "gender": attendee.gender,
+        "checked_in": attendee.checked_in,
+        "checkin_time": attendee.checkin_time.isoformat() if attendee.checkin_time else None,
+        "checked_by": attendee.checked_by,
+        "checker_name": attendee.checker.username if attendee.checker else None,
+        "qr_generated": attendee.qr_generated,
+        "email_sent": attendee.email_sent,
+        "email_error": attendee.email_error
+    }
+
+
+async def event_dashboard(db: AsyncSession, event_id: int, include_attendees: bool) -> dict:
+    """
+    Dashboard payload of an event (access already checked)
+    """
+    event = await db.get(models.Event, event_id)
     
+    # Overall stats from the precomputed counters
+    counts = stats_dict(await db.get(models.EventStats, event_id))
     stats = {
-        "total_attendees": total_attendees,
-        "checked_in": checked_in,
-        "not_checked_in": not_checked_in,
-        "qr_generated": qr_generated,
-        "qr_pending": qr_pending,
-        "email_sent": email_sent,
-        "email_failed": email_failed
+        "total_attendees": counts["total"],
+        "checked_in": counts["checked_in"],
+        "not_checked_in": counts["total"] - counts["checked_in"],
+        "qr_generated": counts["qr_generated"],
+        "qr_pending": counts["total"] - counts["qr_generated"],
+        "email_sent": counts["email_sent"],
+        "email_failed": counts["email_failed"]
     }
     
-    # Segregate by Branch -> Year -> Section
+    # Segregate by Branch -> Year -> Section; branch and year totals are
+    # folded from the section counts here (portable, unlike GROUP BY ROLLUP)
     groups = {}
     
-    for attendee in attendees:
-        branch = attendee.branch
-        year = str(attendee.year)
-        section = attendee.section
-        
-        # Initialize branch if not exists
-        if branch not in groups:
-            groups[branch] = {
-                "total": 0,
-                "checked_in": 0,
-                "years": {}
-            }
-        
-        # Initialize year if not exists
-        if year not in groups[branch]["years"]:
-            groups[branch]["years"][year] = {
-                "total": 0,
-                "checked_in": 0,
-                "sections": {}
-            }
-        
-        # Initialize section if not exists
-        if section not in groups[branch]["years"][year]["sections"]:
-            groups[branch]["years"][year]["sections"][section] = {
-                "total": 0,
-                "checked_in": 0,
-                "attendees": []
-            }
-        
-        # Add attendee to section
-        attendee_data = {
-            "id": attendee.id,
-            "name": attendee.name,
-            "email": attendee.email,
-            "roll_number": attendee.roll_number,
-            "phone": attendee.phone,
-            "gender": attendee.gender,
-            "checked_in": attendee.checked_in,
-            "checkin_time": attendee.checkin_time.isoformat() if attendee.checkin_time else None,
-            "checked_by": attendee.checked_by,
-            "checker_name": attendee.checker.username if attendee.checker else None,
-            "qr_generated": attendee.qr_generated,
-            "email_sent": attendee.email_sent,
-            "email_error": attendee.email_error
-        }
-        
-        groups[branch]["years"][year]["sections"][section]["attendees"].append(attendee_data)
-        
-        # Update counts
-        groups[branch]["total"] += 1
-        groups[branch]["years"][year]["total"] += 1
-        groups[branch]["years"][year]["sections"][section]["total"] += 1
-        
-        if attendee.checked_in:
-            groups[branch]["checked_in"] += 1
-            groups[branch]["years"][year]["checked_in"] += 1
-            groups[branch]["years"][year]["sections"][section]["checked_in"] += 1
+    def section_group(branch: str, year: int, section: str, total: int, checked_in: int) -> dict:
+        branch_group = groups.setdefault(branch, {"total": 0, "checked_in": 0, "years": {}})
+        year_group = branch_group["years"].setdefault(str(year), {"total": 0, "checked_in": 0, "sections": {}})
+        group = year_group["sections"].setdefault(section, {"total": 0, "checked_in": 0})
+        for counted in (branch_group, year_group, group):
+            counted["total"] += total
+            counted["checked_in"] += checked_in
+        return group
+    
+    if include_attendees:
+        # Counts come from the same rows as the embedded attendees, so an
+        # attendee added meanwhile can't be missing from its group
+        attendees = (await db.execute(
+            select(models.Attendee).options(joinedload(models.Attendee.checker)).where(
+                models.Attendee.event_id == event_id
+            ).order_by(
+                models.Attendee.branch, models.Attendee.year, models.Attendee.section, models.Attendee.id
+            )
+        )).scalars().all()
+        for attendee in attendees:
+            group = section_group(attendee.branch, attendee.year, attendee.section, 1, int(bool(attendee.checked_in)))
+            group.setdefault("attendees", []).append(dashboard_attendee(attendee))
+    else:
+        # One row per branch/year/section
+        section_rows = (await db.execute(
+            select(
+                models.Attendee.branch,
+                models.Attendee.year,
+                models.Attendee.section,
+                func.count(models.Attendee.id),
+                func.count(models.Attendee.id).filter(models.Attendee.checked_in == True)
+            ).where(
+                models.Attendee.event_id == event_id
+            ).group_by(
+                models.Attendee.branch, models.Attendee.year, models.Attendee.section
+            ).order_by(
+                models.Attendee.branch, models.Attendee.year, models.Attendee.section
+            )
+        )).all()
+        for branch, year, section, total, checked_in in section_rows:
+            section_group(branch, year, section, total, checked_in)
     
     return {
         "event": {
@@ -2307,71 +3103,116 @@ async def get_event_dashboard(
     }
 
 
+@app.get("/api/events/{event_id}/dashboard")
+async def get_event_dashboard(
+    event_id: int,
+    request: Request,
+    include_attendees: bool = False,
+    current_user: models.User = Depends(require_organizer),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get event dashboard with segregated attendee counts (Branch -> Year -> Section)
+    
+    Sections only carry counts; fetch a section's attendees from
+    /api/events/{event_id}/dashboard/section, or pass include_attendees=true
+    to embed every attendee (large events: slow and heavy).
+    Cached; supports ETag / If-None-Match.
+    """
+    async def build(headers: dict):
+        return await event_dashboard(db, event_id, include_attendees)
+    
+    return await versioned_response(request, db, event_id, current_user, build)
+
+
+async def dashboard_section(db: AsyncSession, event_id: int, branch: str, year: int, section: str) -> dict:
+    """
+    Attendees of one branch/year/section of an event
+    """
+    attendees = (await db.execute(
+        select(models.Attendee).options(joinedload(models.Attendee.checker)).where(
+            models.Attendee.event_id == event_id,
+            models.Attendee.branch == branch,
+            models.Attendee.year == year,
+            models.Attendee.section == section
+        ).order_by(models.Attendee.name, models.Attendee.id)
+    )).scalars().all()
+    
+    return {
+        "branch": branch,
+        "year": year,
+        "section": section,
+        "total": len(attendees),
+        "checked_in": sum(1 for attendee in attendees if attendee.checked_in),
+        "attendees": [dashboard_attendee(attendee) for attendee in attendees]
+    }
+
+
+@app.get("/api/events/{event_id}/dashboard/section")
+async def get_dashboard_section(
+    event_id: int,
+    request: Request,
+    branch: str,
+    year: int,
+    section: str,
+    current_user: models.User = Depends(require_organizer),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Attendees of one dashboard section, loaded when the section is opened
+    (cached; supports ETag / If-None-Match)
+    """
+    async def build(headers: dict):
+        return await dashboard_section(db, event_id, branch, year, section)
+    
+    return await versioned_response(request, db, event_id, current_user, build)
+
+
 # ============= Export CSV =============
 
 @app.get("/api/events/{event_id}/export")
 async def export_attendees_csv(
     event_id: int,
+    format: str = "csv",
+    sheets: str = "single",
     current_user: models.User = Depends(require_organizer),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Export all attendees as CSV with check-in details
+    Export all attendees as CSV or Excel with check-in details
+    Rows are streamed from the database in batches, sorted by branch, year,
+    section and name
+    
+    - format: csv (default) or xlsx
+    - sheets (xlsx only): single (default), branch (one sheet per branch) or
+      section (one sheet per branch/year/section)
     """
+    if format not in ("csv", "xlsx"):
+        raise HTTPException(status_code=400, detail="format must be csv or xlsx")
+    if sheets not in SHEET_MODES:
+        raise HTTPException(status_code=400, detail=f"sheets must be one of: {', '.join(SHEET_MODES)}")
+    
     # Check event access
-    event = db.query(models.Event).filter(models.Event.id == event_id).first()
+    event = await db.get(models.Event, event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     
     if current_user.role != "admin" and event.club_id != current_user.club_id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    # Get all attendees with checker info
-    attendees = db.query(models.Attendee).filter(models.Attendee.event_id == event_id).all()
-    
-    # Prepare data for CSV
-    csv_data = []
-    for attendee in attendees:
-        csv_data.append({
-            'Name': attendee.name,
-            'Email': attendee.email,
-            'Roll Number': attendee.roll_number,
-            'Branch': attendee.branch,
-            'Year': attendee.year,
-            'Section': attendee.section,
-            'Phone': attendee.phone or '',
-            'Gender': attendee.gender,
-            'Checked In': 'Yes' if attendee.checked_in else 'No',
-            'Check-in Time': attendee.checkin_time.strftime('%Y-%m-%d %I:%M %p') if attendee.checkin_time else '',
-            'Checked By': attendee.checker.username if attendee.checker else '',
-            'QR Generated': 'Yes' if attendee.qr_generated else 'No',
-            'Email Sent': 'Yes' if attendee.email_sent else 'No',
-            'Email Error': attendee.email_error or ''
-        })
-    
-    # Create DataFrame
-    df = pd.DataFrame(csv_data)
-    
-    # Sort by branch, year, section, name
-    df = df.sort_values(['Branch', 'Year', 'Section', 'Name'])
-    
-    # Convert to CSV
-    csv_buffer = io.StringIO()
-    df.to_csv(csv_buffer, index=False)
-    csv_buffer.seek(0)
-    
     # Log activity
-    log_activity(
-        db, current_user.id, "export_csv", "event", event_id,
+    await log_activity_async(
+        db, current_user.id, f"export_{format}", "event", event_id,
         f"Exported attendees for event: {event.name}"
     )
     
+    filename = f"{event.name.replace(' ', '_')}_attendees.{format}"
+    headers = {"Content-Disposition": f"attachment; filename={filename}"}
+    if format == "xlsx":
+        return ExportResponse(stream_xlsx(event_id, sheets), media_type=XLSX_MEDIA_TYPE, headers=headers)
+    
     # Return CSV file
-    return StreamingResponse(
-        io.BytesIO(csv_buffer.getvalue().encode()),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename={event.name.replace(' ', '_')}_attendees.csv"}
-    )
+    return ExportResponse(stream_csv(event_id), media_type="text/csv", headers=headers)
 
 
 # ============= Payment Sync Endpoint =============
@@ -2512,6 +3353,7 @@ async def fix_attendee_details_from_payments(
                     setattr(attendee, field, value)
                 
                 db.commit()
+                roster_cache.invalidate(attendee.event_id)
                 updated_count += 1
                 print(f"    ✅ Updated attendee {attendee.id}: {updates}")
                 
@@ -2725,9 +3567,13 @@ async def health_check(db: Session = Depends(get_db)):
         # Test database connection using SQLAlchemy 2.0 syntax
         from sqlalchemy import text
         db.execute(text("SELECT 1"))
+        pools = pool_stats()
+        # Connected but every connection of a pool is checked out: requests are queueing
+        exhausted = any(pool.get("exhausted") for pool in pools.values())
         return {
-            "status": "healthy",
-            "database": "connected"
+            "status": "degraded" if exhausted else "healthy",
+            "database": "connected",
+            "pools": pools
         }
     except Exception as e:
         return {
@@ -2852,3 +3698,46 @@ async def system_status(
             "status": "error",
             "error": str(e)
         }
+
+
+@app.get("/api/system/metrics")
+async def system_metrics(
+    current_user: models.User = Depends(require_admin)
+):
+    """
+    In-process cache counters for this worker
+    """
+    return {
+        "qr_token_cache": utils.qr_token_cache.stats(),
+        "roster_cache": roster_cache.stats(),
+        "auth_cache": security.auth_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "token_revocation": security.revocation_store.stats(),
+        "password_hasher": security.password_hasher.stats(),
+        "scan_debounce": scan_debouncer.stats(),
+        "live_stream": checkin_stream.stats(),
+        "live_relay": checkin_relay.stats() if checkin_relay is not None else {"backend": "memory"},
+        "activity_log": activity_writer.stats(),
+        "event_loop": loop_monitor.stats()
+    }
+
+
+@app.get("/api/system/pool")
+async def connection_pool_status(
+    current_user: models.User = Depends(require_admin)
+):
+    """
+    Connection pool occupancy and checkout wait times for this worker
+    """
+    return pool_stats()
+
+
+@app.get("/api/system/event-loop")
+async def event_loop_report(
+    current_user: models.User = Depends(require_admin)
+):
+    """
+    Event loop lag for this worker, plus (with LOOP_MONITOR_DEBUG) the
+    routes and call sites that blocked the loop
+    """
+    return loop_monitor.report()
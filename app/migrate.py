@@ -0,0 +1,58 @@
+"""
+Schema migration CLI
+
+Usage:
+    python -m app.migrate upgrade [--to VERSION]   Apply pending migrations
+    python -m app.migrate current                  Show the database's version
+    python -m app.migrate history                  List migrations
+    python -m app.migrate stamp VERSION            Mark VERSION as applied
+    python -m app.migrate rebuild-stats [EVENT_ID ...]
+                                                   Recount event_stats (default: all events)
+"""
+import argparse
+import sys
+from sqlalchemy.orm import Session
+from .database import migration_engine
+from .event_stats import rebuild_event_stats
+from . import migrations
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.migrate", description="QRFlow schema migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = commands.add_parser("upgrade", help="Apply pending migrations")
+    upgrade_parser.add_argument("--to", type=int, default=None, help="Target version (default: latest)")
+    commands.add_parser("current", help="Show the database's schema version")
+    commands.add_parser("history", help="List migrations")
+    stamp_parser = commands.add_parser("stamp", help="Mark a version as applied without running it")
+    stamp_parser.add_argument("version", type=int)
+    rebuild_parser = commands.add_parser("rebuild-stats", help="Recount event_stats from the attendees table")
+    rebuild_parser.add_argument("event_ids", type=int, nargs="*", help="Events to rebuild (default: all)")
+    args = parser.parse_args(argv)
+    engine = migration_engine()
+
+    if args.command == "upgrade":
+        version = migrations.upgrade(engine, target=args.to)
+        print(f"✅ Database schema at version {version}")
+    elif args.command == "current":
+        state = migrations.check_schema(engine)
+        status = "up to date" if state["up_to_date"] else "needs upgrade"
+        print(f"📋 Database schema version: {state['version']} (code expects {state['expected']}, {status})")
+        return 0 if state["up_to_date"] else 1
+    elif args.command == "history":
+        print(f"  v{migrations.BASELINE_VERSION:04d}  Baseline (schema before versioned migrations)")
+        for migration in migrations.load_migrations():
+            print(f"  v{migration.version:04d}  {migration.description}")
+    elif args.command == "stamp":
+        migrations.stamp(engine, args.version)
+        print(f"📌 Stamped version {args.version}")
+    elif args.command == "rebuild-stats":
+        with Session(engine) as db:
+            rebuilt = rebuild_event_stats(db, args.event_ids or None)
+            db.commit()
+        print(f"✅ Rebuilt stats for {rebuilt} events")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
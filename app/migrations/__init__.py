@@ -0,0 +1,201 @@
+"""
+Schema migrations - Versioned upgrades recorded in the schema_version table
+
+Each migration is a module in this package named vNNNN_<name>.py with an
+upgrade(conn) function; NNNN is its version and the module docstring its
+description. Migrations run in version order, each in its own transaction
+(modules that set TRANSACTIONAL = False run in autocommit mode, e.g. for
+CREATE INDEX CONCURRENTLY). On PostgreSQL they run with statement_timeout
+disabled: index builds and backfills on large tables outlast the app's
+DB_STATEMENT_TIMEOUT_MS.
+
+Run them with the CLI before starting the app:
+    python -m app.migrate upgrade
+"""
+import importlib
+import pkgutil
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+# Version of the schema create_all() produced before migrations existed
+BASELINE_VERSION = 1
+
+# Serialises concurrent upgrade runs on PostgreSQL (arbitrary constant)
+ADVISORY_LOCK_ID = 720_611_001
+
+SCHEMA_VERSION_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description VARCHAR(255) NOT NULL,
+        applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+@dataclass
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+    transactional: bool = True
+
+
+def load_migrations() -> List[Migration]:
+    """
+    All migration modules in this package, in version order
+    """
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        name = module_info.name
+        if not (name.startswith("v") and name[1:5].isdigit()):
+            continue
+        module = importlib.import_module(f"{__name__}.{name}")
+        migrations.append(Migration(
+            version=int(name[1:5]),
+            description=(module.__doc__ or name).strip().splitlines()[0],
+            upgrade=module.upgrade,
+            transactional=getattr(module, "TRANSACTIONAL", True)
+        ))
+    migrations.sort(key=lambda migration: migration.version)
+    return migrations
+
+
+def head_version() -> int:
+    """
+    Version the code expects the database to be at
+    """
+    migrations = load_migrations()
+    return migrations[-1].version if migrations else BASELINE_VERSION
+
+
+def has_table(conn: Connection, table: str) -> bool:
+    return inspect(conn).has_table(table)
+
+
+def has_column(conn: Connection, table: str, column: str) -> bool:
+    return any(col["name"] == column for col in inspect(conn).get_columns(table))
+
+
+def create_index(conn: Connection, name: str, table: str, columns: str, where: Optional[str] = None):
+    """
+    CREATE INDEX IF NOT EXISTS; CONCURRENTLY on PostgreSQL (the migration
+    must set TRANSACTIONAL = False). An INVALID index left behind by an
+    interrupted concurrent build is dropped and rebuilt - IF NOT EXISTS
+    would otherwise keep skipping it.
+    """
+    if conn.dialect.name == "postgresql":
+        invalid = conn.execute(text("""
+            SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = :name AND NOT i.indisvalid
+        """), {"name": name}).first()
+        if invalid:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        statement = f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {columns}"
+    else:
+        statement = f"CREATE INDEX IF NOT EXISTS {name} ON {table} {columns}"
+    if where:
+        statement += f" WHERE {where}"
+    conn.execute(text(statement))
+
+
+def current_version(conn: Connection) -> Optional[int]:
+    """
+    Latest applied version, or None if the database was never migrated
+    """
+    if not has_table(conn, "schema_version"):
+        return None
+    return conn.execute(text("SELECT max(version) FROM schema_version")).scalar()
+
+
+def _record(conn: Connection, version: int, description: str):
+    conn.execute(
+        text("INSERT INTO schema_version (version, description) VALUES (:version, :description)"),
+        {"version": version, "description": description[:255]}
+    )
+
+
+def stamp(engine: Engine, version: int, description: str = "Stamped"):
+    """
+    Record version as applied without running anything
+    """
+    with engine.begin() as conn:
+        conn.execute(text(SCHEMA_VERSION_DDL))
+        if not conn.execute(text("SELECT 1 FROM schema_version WHERE version = :v"), {"v": version}).first():
+            _record(conn, version, description)
+
+
+def upgrade(engine: Engine, target: Optional[int] = None, log=print) -> int:
+    """
+    Bring the database up to target (default: the latest migration).
+
+    An empty database gets the current models via create_all() and is
+    stamped with the latest version. A database created before migrations
+    existed is stamped with the baseline version and then upgraded.
+    Returns the version the database ends up at.
+    """
+    from ..models import Base
+
+    migrations = load_migrations()
+    target = target if target is not None else head_version()
+    postgresql = engine.dialect.name == "postgresql"
+
+    with engine.connect() as lock_conn:
+        if postgresql:
+            lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+        try:
+            with engine.connect() as conn:
+                version = current_version(conn)
+                fresh = version is None and not has_table(conn, "attendees")
+
+            if fresh:
+                log("🆕 Empty database - creating tables from the models")
+                Base.metadata.create_all(bind=engine)
+                stamp(engine, target, "Created from models")
+                return target
+
+            if version is None:
+                log(f"📌 Existing database without schema_version - stamping baseline v{BASELINE_VERSION}")
+                stamp(engine, BASELINE_VERSION, "Baseline (schema before versioned migrations)")
+                version = BASELINE_VERSION
+
+            for migration in migrations:
+                if migration.version <= version or migration.version > target:
+                    continue
+                log(f"⬆️  Applying v{migration.version:04d}: {migration.description}")
+                if migration.transactional:
+                    with engine.begin() as conn:
+                        if postgresql:
+                            conn.execute(text("SET LOCAL statement_timeout = 0"))
+                        migration.upgrade(conn)
+                        _record(conn, migration.version, migration.description)
+                else:
+                    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                        if postgresql:
+                            conn.execute(text("SET statement_timeout = 0"))
+                        try:
+                            migration.upgrade(conn)
+                            _record(conn, migration.version, migration.description)
+                        finally:
+                            if postgresql:
+                                # Don't hand a pooled connection back without its timeout
+                                conn.execute(text("RESET statement_timeout"))
+                version = migration.version
+            return version
+        finally:
+            if postgresql:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": ADVISORY_LOCK_ID})
+
+
+def check_schema(engine: Engine) -> dict:
+    """
+    Cheap startup check: one query against schema_version, no reflection
+    """
+    expected = head_version()
+    try:
+        with engine.connect() as conn:
+            version = conn.execute(text("SELECT max(version) FROM schema_version")).scalar()
+    except Exception:
+        version = None
+    return {"version": version, "expected": expected, "up_to_date": version == expected}
@@ -0,0 +1,11 @@
+"""
+Per-event duplicate-scan debounce window (events.scan_debounce_seconds)
+"""
+from sqlalchemy import text
+from . import has_column
+
+
+def upgrade(conn):
+    # May already exist where migrate_production.py added it
+    if not has_column(conn, "events", "scan_debounce_seconds"):
+        conn.execute(text("ALTER TABLE events ADD COLUMN scan_debounce_seconds INTEGER"))
@@ -0,0 +1,27 @@
+"""
+Event-scoped composite and partial attendee indexes
+"""
+from sqlalchemy import text
+from . import create_index
+
+# Built outside a transaction so PostgreSQL can build them CONCURRENTLY
+TRANSACTIONAL = False
+
+INDEXES = {
+    "ix_attendees_event_roll_number": ("(event_id, roll_number)", None),
+    "ix_attendees_event_email": ("(event_id, email)", None),
+    "ix_attendees_event_checked_in": ("(event_id, checked_in)", None),
+    "ix_attendees_event_pending_qr": ("(event_id, qr_token)", "qr_token IS NULL"),
+    "ix_attendees_event_pending_email": ("(event_id)", "email_sent = {false}"),
+}
+
+
+def upgrade(conn):
+    postgresql = conn.dialect.name == "postgresql"
+    for name, (columns, where) in INDEXES.items():
+        # Same literal the ORM emits, so SQLite can match the predicate
+        where = where.format(false="false" if postgresql else "0") if where else None
+        create_index(conn, name, "attendees", columns, where)
+
+    if postgresql:
+        conn.execute(text("ANALYZE attendees"))
@@ -0,0 +1,38 @@
+"""
+Precomputed per-event attendee counters (event_stats)
+"""
+from sqlalchemy import text
+from . import has_table
+
+
+def upgrade(conn):
+    if not has_table(conn, "event_stats"):
+        conn.execute(text("""
+            CREATE TABLE event_stats (
+                event_id INTEGER PRIMARY KEY REFERENCES events (id) ON DELETE CASCADE,
+                total INTEGER NOT NULL DEFAULT 0,
+                checked_in INTEGER NOT NULL DEFAULT 0,
+                qr_generated INTEGER NOT NULL DEFAULT 0,
+                email_sent INTEGER NOT NULL DEFAULT 0,
+                email_failed INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+
+    if conn.dialect.name == "postgresql":
+        # Hold attendee writes until the backfill commits so no change is missed
+        conn.execute(text("LOCK TABLE attendees IN SHARE MODE"))
+
+    conn.execute(text("DELETE FROM event_stats"))
+    conn.execute(text("""
+        INSERT INTO event_stats (event_id, total, checked_in, qr_generated, email_sent, email_failed)
+        SELECT e.id,
+               count(a.id),
+               count(CASE WHEN a.checked_in THEN 1 END),
+               count(CASE WHEN a.qr_generated THEN 1 END),
+               count(CASE WHEN a.email_sent THEN 1 END),
+               count(CASE WHEN a.email_error IS NOT NULL AND a.email_error <> '' THEN 1 END)
+        FROM events e
+        LEFT JOIN attendees a ON a.event_id = e.id
+        GROUP BY e.id
+    """))
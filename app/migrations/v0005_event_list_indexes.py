@@ -0,0 +1,12 @@
+"""
+Indexes for keyset-paginated event lists
+"""
+from . import create_index
+
+# Built outside a transaction so PostgreSQL can build them CONCURRENTLY
+TRANSACTIONAL = False
+
+
+def upgrade(conn):
+    create_index(conn, "ix_events_date_id", "events", "(date, id)")
+    create_index(conn, "ix_events_club_date_id", "events", "(club_id, date, id)")
@@ -0,0 +1,12 @@
+"""
+Indexes for matching an event's payments to attendees by email or phone
+"""
+from . import create_index
+
+# Built outside a transaction so PostgreSQL can build them CONCURRENTLY
+TRANSACTIONAL = False
+
+
+def upgrade(conn):
+    create_index(conn, "ix_payments_event_email", "payments", "(event_id, customer_email)")
+    create_index(conn, "ix_payments_event_phone", "payments", "(event_id, customer_phone)")
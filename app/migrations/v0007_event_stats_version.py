@@ -0,0 +1,10 @@
+"""
+Per-event change version for cached responses (event_stats.version)
+"""
+from sqlalchemy import text
+from . import has_column
+
+
+def upgrade(conn):
+    if not has_column(conn, "event_stats", "version"):
+        conn.execute(text("ALTER TABLE event_stats ADD COLUMN version INTEGER NOT NULL DEFAULT 0"))
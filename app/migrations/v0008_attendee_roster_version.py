@@ -0,0 +1,15 @@
+"""
+Per-attendee change version for offline roster deltas (attendees.roster_version)
+"""
+from sqlalchemy import text
+from . import create_index, has_column
+
+# The index is built CONCURRENTLY on PostgreSQL
+TRANSACTIONAL = False
+
+
+def upgrade(conn):
+    if not has_column(conn, "attendees", "roster_version"):
+        # Existing rows are covered by any snapshot taken from now on
+        conn.execute(text("ALTER TABLE attendees ADD COLUMN roster_version INTEGER NOT NULL DEFAULT 0"))
+    create_index(conn, "ix_attendees_event_roster_version", "attendees", "(event_id, roster_version)")
@@ -0,0 +1,27 @@
+"""
+Removed attendees for offline roster deltas (attendee_tombstones)
+"""
+from sqlalchemy import text
+from . import has_table
+
+
+def upgrade(conn):
+    if has_table(conn, "attendee_tombstones"):
+        return
+
+    # SQLite assigns INTEGER PRIMARY KEY ids itself
+    id_type = "SERIAL" if conn.dialect.name == "postgresql" else "INTEGER"
+    conn.execute(text(f"""
+        CREATE TABLE attendee_tombstones (
+            id {id_type} PRIMARY KEY,
+            event_id INTEGER NOT NULL REFERENCES events (id) ON DELETE CASCADE,
+            attendee_id INTEGER NOT NULL,
+            roster_version INTEGER NOT NULL,
+            deleted_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+        )
+    """))
+    # New, empty table: a plain index build doesn't block anything
+    conn.execute(text(
+        "CREATE INDEX ix_attendee_tombstones_event_roster_version "
+        "ON attendee_tombstones (event_id, roster_version)"
+    ))
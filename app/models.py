@@ -1,8 +1,8 @@
 """
 Database Models - SQLAlchemy ORM models for all tables
 """
-from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, DateTime, Text, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, DateTime, Text, Index, func, text
+from sqlalchemy.orm import column_property, relationship
 from .database import Base
 
 class Club(Base):
@@ -62,6 +62,7 @@ class Event(Base):
     description = Column(Text, nullable=True)
     date = Column(DateTime(timezone=True), nullable=False)
     venue = Column(String(255), nullable=True)
+    scan_debounce_seconds = Column(Integer, nullable=True)  # NULL = SCAN_DEBOUNCE_SECONDS setting
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -71,6 +72,12 @@ class Event(Base):
     attendees = relationship("Attendee", back_populates="event", cascade="all, delete-orphan")
     payments = relationship("Payment", back_populates="event", cascade="all, delete-orphan")
 
+    # Event lists seek on (date, id), per club for organizers
+    __table_args__ = (
+        Index("ix_events_date_id", "date", "id"),
+        Index("ix_events_club_date_id", "club_id", "date", "id"),
+    )
+
 
 class Attendee(Base):
     """
@@ -91,21 +98,28 @@ class Attendee(Base):
     phone = Column(String(20), nullable=True)
     gender = Column(String(20), default="Not Specified")
     
+    # Columns counted in event_stats use active_history: changing one always
+    # records the old value, even on an expired instance (see event_stats.py)
+    
     # QR Code details
     qr_token = Column(String(500), unique=True, index=True, nullable=True)
-    qr_generated = Column(Boolean, default=False)
+    qr_generated = column_property(Column(Boolean, default=False), active_history=True)
     qr_generated_at = Column(DateTime(timezone=True), nullable=True)
     
     # Email status
-    email_sent = Column(Boolean, default=False)
+    email_sent = column_property(Column(Boolean, default=False), active_history=True)
     email_sent_at = Column(DateTime(timezone=True), nullable=True)
-    email_error = Column(Text, nullable=True)
+    email_error = column_property(Column(Text, nullable=True), active_history=True)
     
     # Check-in details
-    checked_in = Column(Boolean, default=False)
+    checked_in = column_property(Column(Boolean, default=False), active_history=True)
     checkin_time = Column(DateTime(timezone=True), nullable=True)
     checked_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     
+    # Event version (event_stats.version) of the row's last change, the
+    # cursor for offline roster deltas
+    roster_version = Column(Integer, nullable=False, default=0, server_default="0")
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -115,6 +129,68 @@ class Attendee(Base):
     checker = relationship("User", back_populates="attendees_checked")
     payments = relationship("Payment", back_populates="attendee", cascade="all, delete-orphan")
 
+    # Attendee queries are scoped to one event: every index leads with event_id
+    __table_args__ = (
+        # Upload/create dedupe and payment linking
+        Index("ix_attendees_event_roll_number", "event_id", "roll_number"),
+        Index("ix_attendees_event_email", "event_id", "email"),
+        # Check-in counts, and the not-checked-in queue
+        Index("ix_attendees_event_checked_in", "event_id", "checked_in"),
+        # Work queues: only the rows still waiting for a QR code / an email.
+        # qr_token is in the key so planners prefer this to the unique
+        # qr_token index, which can also answer "qr_token IS NULL"
+        Index(
+            "ix_attendees_event_pending_qr", "event_id", "qr_token",
+            postgresql_where=text("qr_token IS NULL"),
+            sqlite_where=text("qr_token IS NULL")
+        ),
+        Index(
+            "ix_attendees_event_pending_email", "event_id",
+            postgresql_where=text("email_sent = false"),
+            sqlite_where=text("email_sent = 0")
+        ),
+        # Offline roster deltas: rows changed after a version
+        Index("ix_attendees_event_roster_version", "event_id", "roster_version"),
+    )
+
+
+class EventStats(Base):
+    """
+    Event stats table - Attendee counters per event, updated in the same
+    transaction as the attendee writes (see event_stats.py)
+    """
+    __tablename__ = "event_stats"
+
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
+    total = Column(Integer, nullable=False, default=0, server_default="0")
+    checked_in = Column(Integer, nullable=False, default=0, server_default="0")
+    qr_generated = Column(Integer, nullable=False, default=0, server_default="0")
+    email_sent = Column(Integer, nullable=False, default=0, server_default="0")
+    email_failed = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped by every write that changes the event's cached responses
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class AttendeeTombstone(Base):
+    """
+    Attendee tombstones table - Attendees removed from an event, with the
+    event version of the removal, so roster deltas can drop them on devices
+    (written with the attendee writes, see event_stats.py)
+    """
+    __tablename__ = "attendee_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
+    attendee_id = Column(Integer, nullable=False)
+    roster_version = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Roster deltas: removals after a version
+        Index("ix_attendee_tombstones_event_roster_version", "event_id", "roster_version"),
+    )
+
 
 class Payment(Base):
     """
@@ -153,6 +229,12 @@ class Payment(Base):
     event = relationship("Event", back_populates="payments")
     attendee = relationship("Attendee", back_populates="payments")
 
+    # Payments are matched to an event's attendees by email or phone
+    __table_args__ = (
+        Index("ix_payments_event_email", "event_id", "customer_email"),
+        Index("ix_payments_event_phone", "event_id", "customer_phone"),
+    )
+
 
 class ActivityLog(Base):
     """
@@ -178,3 +260,8 @@ class ActivityLog(Base):
     # Relationships
     user = relationship("User", back_populates="activity_logs")
     club = relationship("Club", back_populates="activity_logs")
+
+
+# Registers the after_flush listener that keeps event_stats up to date, so
+# every Session counts attendee writes however the models were imported
+from . import event_stats  # noqa: E402,F401
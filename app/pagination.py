@@ -0,0 +1,57 @@
+"""
+Keyset pagination - Opaque cursors and "seek" conditions for list endpoints
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence
+from fastapi import HTTPException
+from sqlalchemy import literal, tuple_
+
+
+def encode_cursor(values: Sequence) -> str:
+    """
+    Opaque cursor for the sort key of the last row on a page
+    """
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, parsers: Sequence[Callable]) -> List:
+    """
+    Values of a cursor made by encode_cursor, each converted by its parser.
+    Raises a 400 for cursors that were not issued by this API.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("cursor length")
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def seek(stmt, columns: Sequence, descending: bool, after: Optional[Sequence], limit: Optional[int]):
+    """
+    Order stmt by columns (the last one unique, e.g. id) and return the page
+    after the given key. Fetches limit + 1 rows so callers can tell whether
+    another page follows; limit None returns every row.
+    """
+    if after is not None:
+        key = tuple_(*columns)
+        bound = tuple_(*[literal(value, column.type) for column, value in zip(columns, after)])
+        stmt = stmt.where(key < bound if descending else key > bound)
+    order = [column.desc() if descending else column.asc() for column in columns]
+    stmt = stmt.order_by(*order)
+    return stmt if limit is None else stmt.limit(limit + 1)
+
+
+def split_page(rows: list, limit: Optional[int], key: Callable) -> tuple:
+    """
+    (page rows, cursor for the next page or None) from a seek() result
+    """
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
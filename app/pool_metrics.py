@@ -0,0 +1,98 @@
+"""
+Connection pool metrics - Checkout wait histograms and live pool status
+"""
+import bisect
+import threading
+import time
+from sqlalchemy import exc
+
+# Upper bounds (ms) of the checkout wait histogram buckets; the last bucket is open
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolMetrics:
+    """
+    Counters for connection checkouts from one engine's pool
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        wait_ms = wait * 1000
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.buckets[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            labels = [f"<={bound}ms" for bound in WAIT_BUCKETS_MS] + [f">{WAIT_BUCKETS_MS[-1]}ms"]
+            return {
+                "checkouts": self.checkouts,
+                "waiting": self.waiting,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 2) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+                "wait_histogram": dict(zip(labels, self.buckets))
+            }
+
+
+def instrumented_pool_class(pool_class, metrics: PoolMetrics):
+    """
+    Subclass of pool_class that times every checkout into metrics.
+
+    The subclass survives engine.dispose(), which recreates the pool from
+    its class.
+    """
+
+    class InstrumentedPool(pool_class):
+        def _do_get(self):
+            started = time.perf_counter()
+            with metrics._lock:
+                metrics.waiting += 1
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                metrics.record(time.perf_counter() - started, timed_out=True)
+                raise
+            finally:
+                with metrics._lock:
+                    metrics.waiting -= 1
+            metrics.record(time.perf_counter() - started)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool
+
+
+def pool_status(engine, metrics: PoolMetrics) -> dict:
+    """
+    Live occupancy of an engine's pool plus its checkout metrics
+    """
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if hasattr(pool, "checkedout"):
+        size = pool.size()
+        max_overflow = getattr(pool, "_max_overflow", 0)
+        status.update({
+            "size": size,
+            "max_overflow": max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "exhausted": max_overflow > -1 and pool.checkedout() >= size + max_overflow
+        })
+    status.update(metrics.stats())
+    return status
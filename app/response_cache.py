@@ -0,0 +1,107 @@
+"""
+Response cache - Serialized event responses keyed on the event's change version
+
+event_stats.version is bumped in the same transaction as every write that
+changes what the event detail, dashboard or attendee endpoints return
+(see event_stats.py). A cached body is served while the version it was
+built at is still current, and the version doubles as the ETag so polling
+clients get a 304 without any body being built or sent.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from .config import settings
+
+
+def make_etag(key: Tuple, version: int) -> str:
+    """
+    Strong ETag for a response key at a version (same on every worker)
+    """
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header covers etag (weak comparison)
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    Bounded LRU of response key -> (version, body, headers).
+
+    Only the latest version of each key is kept; entries built at an older
+    version are replaced on the next miss. Bounded by entry count and by
+    total body size.
+    """
+
+    def __init__(self, maxsize: int, max_bytes: int):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: Tuple, version: int) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return item[1], item[2]
+            self.misses += 1
+            return None
+
+    def put(self, key: Tuple, version: int, body: bytes, headers: Dict[str, str]):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            self._entries[key] = (version, body, headers)
+            self._bytes += len(body)
+            while len(self._entries) > self.maxsize or self._bytes > self.max_bytes:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Cache counters for monitoring
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified
+            }
+
+
+# Shared response cache
+response_cache = ResponseCache(
+    maxsize=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=settings.RESPONSE_CACHE_MAX_MB * 1024 * 1024
+)
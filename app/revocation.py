@@ -0,0 +1,189 @@
+"""
+Token revocation - Stores of logged-out access tokens that expire with the tokens
+"""
+import hashlib
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+from .config import settings
+
+
+def revocation_key(token: str, payload: dict) -> str:
+    """
+    Key a token is revoked under: its jti claim, or a hash of the token for
+    tokens issued before access tokens carried a jti
+    """
+    jti = payload.get("jti")
+    if jti:
+        return f"jti:{jti}"
+    return "sha256:" + hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class MemoryRevocationStore:
+    """
+    In-process revocation store.
+
+    Lookups are a dict probe. A min-heap ordered by expiry lets revoke()
+    drop entries as soon as the token they block would have expired anyway,
+    so the store only holds tokens that are still valid.
+
+    The async methods match RedisRevocationStore; the sync ones are used
+    by it for its local copy.
+    """
+
+    def __init__(self):
+        self._expiry: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float):
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, key = heapq.heappop(self._heap)
+            # Skip heap entries superseded by a later revoke of the same key
+            if self._expiry.get(key) == expires_at:
+                del self._expiry[key]
+
+    def revoke_local(self, key: str, expires_at: float):
+        now = time.time()
+        if expires_at <= now:
+            return
+        with self._lock:
+            self._prune(now)
+            self._expiry[key] = expires_at
+            heapq.heappush(self._heap, (expires_at, key))
+
+    def is_revoked_local(self, key: str) -> bool:
+        expires_at = self._expiry.get(key)
+        return expires_at is not None and expires_at > time.time()
+
+    async def revoke(self, key: str, expires_at: float):
+        self.revoke_local(key, expires_at)
+
+    async def is_revoked(self, key: str) -> bool:
+        return self.is_revoked_local(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._prune(time.time())
+            return {"backend": "memory", "revoked_tokens": len(self._expiry)}
+
+
+class RedisRevocationStore:
+    """
+    Revocation store shared by all workers through Redis (asyncio client,
+    so lookups don't block the event loop).
+
+    Each revoked token is a key with a TTL matching the token's remaining
+    lifetime, so Redis expires it on its own. Revocations are also kept in a
+    local MemoryRevocationStore: this worker keeps rejecting tokens it
+    revoked even while Redis is unreachable.
+
+    "Not revoked" answers are cached for cache_seconds, so repeat requests
+    with the same token skip the round trip; a logout on another worker
+    takes up to that long to reach this one. After a Redis error lookups
+    fail open without trying Redis for retry_seconds, and the warning is
+    printed at most once per WARNING_INTERVAL_SECONDS.
+    """
+
+    WARNING_INTERVAL_SECONDS = 60
+    CACHE_MAX_ENTRIES = 10000
+
+    def __init__(self, client, prefix: str = "qrflow:revoked:", cache_seconds: float = 2.0, retry_seconds: float = 5.0):
+        self.client = client
+        self.prefix = prefix
+        self.cache_seconds = cache_seconds
+        self.retry_seconds = retry_seconds
+        self.local = MemoryRevocationStore()
+        self._not_revoked: "OrderedDict[str, float]" = OrderedDict()
+        self._retry_at = 0.0
+        self._warned_at = None
+        self._suppressed = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.lookups = 0
+
+    def _failed(self, action: str, error: Exception):
+        now = time.monotonic()
+        self.errors += 1
+        self._retry_at = now + self.retry_seconds
+        if self._warned_at is not None and now - self._warned_at < self.WARNING_INTERVAL_SECONDS:
+            self._suppressed += 1
+            return
+        suppressed = f" ({self._suppressed} similar errors suppressed)" if self._suppressed else ""
+        print(f"⚠️ Could not {action} in Redis: {str(error)}{suppressed}")
+        self._warned_at = now
+        self._suppressed = 0
+
+    async def revoke(self, key: str, expires_at: float):
+        self.local.revoke_local(key, expires_at)
+        self._not_revoked.pop(key, None)
+        ttl = int(expires_at - time.time()) + 1
+        if ttl <= 0:
+            return
+        try:
+            await self.client.set(self.prefix + key, "1", ex=ttl)
+        except Exception as e:
+            self._failed("store token revocation", e)
+
+    async def is_revoked(self, key: str) -> bool:
+        if self.local.is_revoked_local(key):
+            return True
+
+        now = time.monotonic()
+        cached_until = self._not_revoked.get(key)
+        if cached_until is not None and cached_until > now:
+            self.cache_hits += 1
+            return False
+        if now < self._retry_at:
+            # Redis failed recently: fail open without waiting on another timeout
+            return False
+
+        self.lookups += 1
+        try:
+            revoked = bool(await self.client.exists(self.prefix + key))
+        except Exception as e:
+            self._failed("check token revocation", e)
+            return False
+
+        if not revoked and self.cache_seconds > 0:
+            self._not_revoked[key] = now + self.cache_seconds
+            self._not_revoked.move_to_end(key)
+            while len(self._not_revoked) > self.CACHE_MAX_ENTRIES:
+                self._not_revoked.popitem(last=False)
+        return revoked
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis",
+            "revoked_tokens_local": self.local.stats()["revoked_tokens"],
+            "lookups": self.lookups,
+            "cache_hits": self.cache_hits,
+            "errors": self.errors
+        }
+
+
+def create_revocation_store():
+    """
+    Redis store when REDIS_URL is configured (and redis is installed), memory otherwise
+    """
+    if not settings.REDIS_URL:
+        return MemoryRevocationStore()
+
+    try:
+        import redis.asyncio as redis
+    except ImportError:
+        print("⚠️ REDIS_URL is set but the redis package is not installed - revocations stay per worker")
+        return MemoryRevocationStore()
+
+    client = redis.Redis.from_url(
+        settings.REDIS_URL,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT
+    )
+    return RedisRevocationStore(
+        client,
+        cache_seconds=settings.REDIS_REVOCATION_CACHE_SECONDS,
+        retry_seconds=settings.REDIS_RETRY_SECONDS
+    )
@@ -0,0 +1,295 @@
+"""
+Check-in roster cache - In-memory per-event attendee roster for QR scanning
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from .config import settings
+from . import models
+
+
+class RosterEntry:
+    """
+    Compact check-in view of a single attendee
+    """
+    __slots__ = (
+        "id", "event_id", "name", "roll_number", "branch", "year", "section",
+        "checked_in", "checkin_time", "checked_by"
+    )
+
+    def __init__(self, id, event_id, name, roll_number, branch, year, section,
+                 checked_in, checkin_time, checked_by):
+        self.id = id
+        self.event_id = event_id
+        self.name = name
+        self.roll_number = roll_number
+        self.branch = branch
+        self.year = year
+        self.section = section
+        self.checked_in = bool(checked_in)
+        self.checkin_time = checkin_time
+        self.checked_by = checked_by
+
+
+def group_keys(entry: RosterEntry):
+    """
+    Counter keys an attendee contributes to: event, branch, year and section
+    """
+    year = str(entry.year)
+    return ((), (entry.branch,), (entry.branch, year), (entry.branch, year, entry.section))
+
+
+class EventRoster:
+    """
+    All roster entries of one event plus the data needed for access checks
+
+    counters maps a group key from group_keys() to [total, checked_in].
+    """
+    __slots__ = ("event_id", "club_id", "debounce_seconds", "entries", "counters", "loaded_at")
+
+    def __init__(self, event_id: int, club_id: int, entries: Dict[int, RosterEntry],
+                 debounce_seconds: Optional[int] = None):
+        self.event_id = event_id
+        self.club_id = club_id
+        self.debounce_seconds = settings.SCAN_DEBOUNCE_SECONDS if debounce_seconds is None else debounce_seconds
+        self.entries = entries
+        self.counters: Dict[tuple, list] = {}
+        self.loaded_at = time.monotonic()
+        for entry in entries.values():
+            self.count(entry, 1)
+
+    def count(self, entry: RosterEntry, sign: int):
+        """
+        Add (sign=1) or remove (sign=-1) an entry from the group counters
+        """
+        for key in group_keys(entry):
+            counter = self.counters.setdefault(key, [0, 0])
+            counter[0] += sign
+            if entry.checked_in:
+                counter[1] += sign
+
+    def replace(self, entry: Optional[RosterEntry], attendee_id: int):
+        """
+        Swap the entry of an attendee (None removes it), keeping counters in sync
+        """
+        old = self.entries.pop(attendee_id, None)
+        if old is not None:
+            self.count(old, -1)
+        if entry is not None:
+            self.entries[attendee_id] = entry
+            self.count(entry, 1)
+
+    def checkin_delta(self, entry: RosterEntry) -> dict:
+        """
+        Live-stream message for a check-in: section path plus updated counters
+        """
+        event_key, branch_key, year_key, section_key = group_keys(entry)
+        return {
+            "type": "checkin",
+            "event_id": self.event_id,
+            "attendee_id": entry.id,
+            "name": entry.name,
+            "roll_number": entry.roll_number,
+            "checkin_time": entry.checkin_time.isoformat() if entry.checkin_time else None,
+            "checked_by": entry.checked_by,
+            "section_path": list(section_key),
+            "counters": {
+                level: {"total": self.counters[key][0], "checked_in": self.counters[key][1]}
+                for level, key in (
+                    ("event", event_key), ("branch", branch_key),
+                    ("year", year_key), ("section", section_key)
+                )
+            }
+        }
+
+    def counters_snapshot(self) -> dict:
+        """
+        All group counters, keyed by "branch/year/section" path ("" for the event)
+        """
+        return {
+            "/".join(key): {"total": total, "checked_in": checked_in}
+            for key, (total, checked_in) in self.counters.items()
+        }
+
+
+# Columns needed to build a roster entry (kept narrow on purpose)
+ROSTER_COLUMNS = (
+    models.Attendee.id,
+    models.Attendee.event_id,
+    models.Attendee.name,
+    models.Attendee.roll_number,
+    models.Attendee.branch,
+    models.Attendee.year,
+    models.Attendee.section,
+    models.Attendee.checked_in,
+    models.Attendee.checkin_time,
+    models.Attendee.checked_by,
+)
+
+
+class RosterCache:
+    """
+    Per-event roster cache used by the check-in scan path.
+
+    Rosters are loaded with a single narrow query the first time an event is
+    scanned (or when warmed explicitly) and kept until they expire or are
+    invalidated by a roster change. Check-in state is only ever moved forward
+    here after the database write succeeded, so a stale entry can at worst
+    claim "not checked in" - the conditional UPDATE catches that case.
+    """
+
+    def __init__(self, ttl_seconds: int, max_events: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_events = max_events
+        self._rosters: Dict[int, EventRoster] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.invalidations = 0
+
+    def _is_fresh(self, roster: EventRoster) -> bool:
+        return time.monotonic() - roster.loaded_at < self.ttl_seconds
+
+    def load(self, db: Session, event_id: int) -> Optional[EventRoster]:
+        """
+        Load (or reload) the roster for an event from the database
+        Returns None if the event does not exist
+        """
+        event_row = db.query(models.Event.id, models.Event.club_id, models.Event.scan_debounce_seconds).filter(
+            models.Event.id == event_id
+        ).first()
+        if not event_row:
+            return None
+
+        rows = db.query(*ROSTER_COLUMNS).filter(models.Attendee.event_id == event_id).all()
+        roster = EventRoster(
+            event_id=event_row.id,
+            club_id=event_row.club_id,
+            entries={row.id: RosterEntry(*row) for row in rows},
+            debounce_seconds=event_row.scan_debounce_seconds
+        )
+
+        with self._lock:
+            if event_id not in self._rosters and len(self._rosters) >= self.max_events:
+                # Drop the oldest roster to keep memory bounded
+                oldest = min(self._rosters.values(), key=lambda r: r.loaded_at)
+                self._rosters.pop(oldest.event_id, None)
+            self._rosters[event_id] = roster
+            self.loads += 1
+
+        return roster
+
+    def get(self, db: Session, event_id: int) -> Optional[EventRoster]:
+        """
+        Get the roster for an event, loading it if missing or expired
+        """
+        with self._lock:
+            roster = self._rosters.get(event_id)
+            if roster is not None and self._is_fresh(roster):
+                self.hits += 1
+                return roster
+            self.misses += 1
+
+        return self.load(db, event_id)
+
+    def get_entry(self, db: Session, roster: EventRoster, attendee_id: int) -> Optional[RosterEntry]:
+        """
+        Resolve an attendee from the roster, falling back to the database for
+        attendees added after the roster was loaded (e.g. on another worker)
+        """
+        entry = roster.entries.get(attendee_id)
+        if entry is not None:
+            return entry
+
+        return self.refresh_entry(db, roster, attendee_id)
+
+    def refresh_entry(self, db: Session, roster: EventRoster, attendee_id: int) -> Optional[RosterEntry]:
+        """
+        Re-read a single attendee into the roster
+        """
+        row = db.query(*ROSTER_COLUMNS).filter(
+            models.Attendee.id == attendee_id,
+            models.Attendee.event_id == roster.event_id
+        ).first()
+
+        if row is None:
+            with self._lock:
+                roster.replace(None, attendee_id)
+            return None
+        return self.store_row(roster, row)
+
+    def store_row(self, roster: EventRoster, row) -> RosterEntry:
+        """
+        Replace a roster entry with a freshly read row of ROSTER_COLUMNS
+        """
+        entry = RosterEntry(*row)
+        with self._lock:
+            roster.replace(entry, entry.id)
+        return entry
+
+    def mark_checked_in(self, event_id: int, attendee_id: int, checkin_time: datetime, checked_by: int):
+        """
+        Record a successful check-in in the cached roster (if loaded)
+        """
+        with self._lock:
+            roster = self._rosters.get(event_id)
+            entry = roster.entries.get(attendee_id) if roster else None
+            if entry is not None and not entry.checked_in:
+                roster.count(entry, -1)
+                entry.checked_in = True
+                entry.checkin_time = checkin_time
+                entry.checked_by = checked_by
+                roster.count(entry, 1)
+
+    def checkin_delta(self, roster: EventRoster, entry: RosterEntry) -> dict:
+        """
+        Live-stream message for a check-in, read under the cache lock
+        """
+        with self._lock:
+            return roster.checkin_delta(entry)
+
+    def counters_snapshot(self, roster: EventRoster) -> dict:
+        """
+        Current group counters of a roster, read under the cache lock
+        """
+        with self._lock:
+            return roster.counters_snapshot()
+
+    def invalidate(self, event_id: int):
+        """
+        Drop the cached roster of an event after its attendee list changed
+        """
+        with self._lock:
+            if self._rosters.pop(event_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        """
+        Drop all cached rosters
+        """
+        with self._lock:
+            self._rosters.clear()
+
+    def stats(self) -> dict:
+        """
+        Cache counters for monitoring
+        """
+        with self._lock:
+            return {
+                "events_cached": len(self._rosters),
+                "attendees_cached": sum(len(r.entries) for r in self._rosters.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "loads": self.loads,
+                "invalidations": self.invalidations
+            }
+
+
+# Shared roster cache instance
+roster_cache = RosterCache(
+    ttl_seconds=settings.ROSTER_CACHE_TTL_SECONDS,
+    max_events=settings.ROSTER_CACHE_MAX_EVENTS
+)
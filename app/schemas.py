@@ -80,6 +80,13 @@ class EventBase(BaseModel):
     description: Optional[str] = None
     date: datetime
     venue: Optional[str] = None
+    scan_debounce_seconds: Optional[int] = None  # None = server default, 0 = off
+
+    @validator('scan_debounce_seconds')
+    def validate_scan_debounce_seconds(cls, v):
+        if v is not None and (v < 0 or v > 60):
+            raise ValueError('Scan debounce must be between 0 and 60 seconds')
+        return v
 
 class EventCreate(EventBase):
     pass
@@ -89,6 +96,13 @@ class EventUpdate(BaseModel):
     description: Optional[str] = None
     date: Optional[datetime] = None
     venue: Optional[str] = None
+    scan_debounce_seconds: Optional[int] = None
+
+    @validator('scan_debounce_seconds')
+    def validate_scan_debounce_seconds(cls, v):
+        if v is not None and (v < 0 or v > 60):
+            raise ValueError('Scan debounce must be between 0 and 60 seconds')
+        return v
 
 class Event(EventBase):
     id: int
@@ -212,11 +226,60 @@ class BulkQRGenerateResponse(BaseModel):
 class CheckInRequest(BaseModel):
     qr_token: str
 
+class RosterAttendee(BaseModel):
+    id: int
+    event_id: int
+    name: str
+    roll_number: str
+    branch: str
+    year: int
+    section: str
+    checked_in: bool
+    checkin_time: Optional[datetime] = None
+    checked_by: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
 class CheckInResponse(BaseModel):
     success: bool
     message: str
     attendee: Optional[AttendeeWithChecker] = None
 
+class BatchScanItem(BaseModel):
+    qr_token: str
+    scanned_at: Optional[datetime] = None
+    device_id: Optional[str] = None
+
+class BatchCheckInRequest(BaseModel):
+    scans: List[BatchScanItem]
+
+    @validator('scans')
+    def validate_scans(cls, v):
+        if len(v) > 1000:
+            raise ValueError('A batch may contain at most 1000 scans')
+        return v
+
+class BatchScanResult(BaseModel):
+    index: int
+    success: bool
+    status: str  # 'checked_in', 'already_checked_in', 'duplicate', 'invalid', 'expired', 'not_found', 'access_denied'
+    message: str
+    device_id: Optional[str] = None
+    attendee: Optional[RosterAttendee] = None
+
+class BatchCheckInResponse(BaseModel):
+    total: int
+    checked_in: int
+    already_checked_in: int
+    failed: int
+    results: List[BatchScanResult]
+
+class RosterWarmResponse(BaseModel):
+    event_id: int
+    attendees: int
+    checked_in: int
+
 
 # ============= Payment Schemas =============
 class PaymentBase(BaseModel):
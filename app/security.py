@@ -1,22 +1,147 @@
 """
 Security utilities - JWT authentication and password hashing
 """
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 import bcrypt
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from .config import settings
-from .database import get_db
+from .database import get_async_db
+from .revocation import create_revocation_store, revocation_key
 from . import models, schemas
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
-# Token blacklist (in production, use Redis)
-BLACKLIST_TOKENS = set()
+# Logged-out tokens (shared through Redis when REDIS_URL is set)
+revocation_store = create_revocation_store()
+
+
+class Principal:
+    """
+    Lightweight authenticated user - the user columns request handlers need
+    Handlers that need the full row (e.g. /api/auth/me) load it by id.
+    """
+    __slots__ = ("id", "username", "role", "club_id", "disabled")
+
+    def __init__(self, id, username, role, club_id, disabled):
+        self.id = id
+        self.username = username
+        self.role = role
+        self.club_id = club_id
+        self.disabled = bool(disabled)
+
+
+class AuthCache:
+    """
+    Caches for request authentication.
+
+    principals: username -> Principal, each entry expiring after ttl_seconds
+    so changes made by other workers are picked up. Admin changes to a user
+    invalidate it immediately on this worker.
+
+    claims: bearer token -> (username, revocation key), kept until the
+    token's own expiry so repeat requests skip signature verification.
+
+    Both are bounded LRUs of maxsize entries.
+    """
+
+    def __init__(self, ttl_seconds: int, maxsize: int):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._principals: "OrderedDict[str, tuple]" = OrderedDict()
+        self._claims: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.principal_hits = 0
+        self.principal_misses = 0
+        self.claims_hits = 0
+        self.claims_misses = 0
+        self.invalidations = 0
+
+    def _store(self, entries: OrderedDict, key: str, value: tuple):
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    def get_claims(self, token: str) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            item = self._claims.get(token)
+            if item is not None:
+                expires_at, claims = item
+                if expires_at > time.time():
+                    self._claims.move_to_end(token)
+                    self.claims_hits += 1
+                    return claims
+                del self._claims[token]
+            self.claims_misses += 1
+            return None
+
+    def put_claims(self, token: str, username: str, key: str, expires_at: float):
+        with self._lock:
+            self._store(self._claims, token, (expires_at, (username, key)))
+
+    def get_principal(self, username: str) -> Optional[Principal]:
+        with self._lock:
+            item = self._principals.get(username)
+            if item is not None:
+                expires_at, principal = item
+                if expires_at > time.monotonic():
+                    self._principals.move_to_end(username)
+                    self.principal_hits += 1
+                    return principal
+                del self._principals[username]
+            self.principal_misses += 1
+            return None
+
+    def put_principal(self, principal: Principal):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._store(self._principals, principal.username, (time.monotonic() + self.ttl_seconds, principal))
+
+    def invalidate_user(self, *usernames: str):
+        """
+        Forget cached principals after a user row changed
+        """
+        with self._lock:
+            for username in usernames:
+                if self._principals.pop(username, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._principals.clear()
+            self._claims.clear()
+
+    def stats(self) -> dict:
+        """
+        Cache counters for monitoring
+        """
+        with self._lock:
+            return {
+                "principals": len(self._principals),
+                "tokens": len(self._claims),
+                "principal_hits": self.principal_hits,
+                "principal_misses": self.principal_misses,
+                "claims_hits": self.claims_hits,
+                "claims_misses": self.claims_misses,
+                "invalidations": self.invalidations
+            }
+
+
+# Shared authentication cache
+auth_cache = AuthCache(ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS, maxsize=settings.AUTH_CACHE_SIZE)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -37,11 +162,80 @@ def get_password_hash(password: str) -> str:
     Hash a password using bcrypt directly
     """
     # Generate salt and hash password
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    True if a bcrypt hash was made with a different cost than BCRYPT_ROUNDS
+    """
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small thread pool so async handlers don't block the event loop.
+
+    bcrypt releases the GIL, so hashing proceeds in parallel with request
+    handling. At most max_pending operations may be running or queued;
+    beyond that requests get a 503 instead of piling up behind each other.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server busy, please try again"
+                )
+            self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self.run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        """
+        Hasher counters for monitoring
+        """
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rounds": settings.BCRYPT_ROUNDS
+            }
+
+
+# Shared password hasher
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token
@@ -53,34 +247,54 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # jti identifies the token in the revocation store
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     
     return encoded_jwt
 
 
-def authenticate_user(db: Session, username: str, password: str):
+async def authenticate_user(db: AsyncSession, username: str, password: str):
     """
     Authenticate a user by username and password
+    Hashes made with an outdated bcrypt cost are upgraded (the caller commits)
     """
-    user = db.query(models.User).filter(models.User.username == username).first()
+    user = (await db.execute(
+        select(models.User).where(models.User.username == username)
+    )).scalars().first()
     
     if not user:
         return False
-    if not verify_password(password, user.password_hash):
+    if not await password_hasher.verify(password, user.password_hash):
         return False
     if user.disabled:
         return False
     
+    if password_needs_rehash(user.password_hash):
+        user.password_hash = await password_hasher.hash(password)
+    
     return user
 
 
+async def load_principal(db: AsyncSession, username: str) -> Optional[Principal]:
+    """
+    Read the principal columns of a user
+    """
+    row = (await db.execute(
+        select(
+            models.User.id, models.User.username, models.User.role, models.User.club_id, models.User.disabled
+        ).where(models.User.username == username)
+    )).first()
+    return Principal(*row) if row else None
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> models.User:
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
     """
     Get the current authenticated user from JWT token
+    Token claims and user principals are served from auth_cache when possible
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -88,26 +302,38 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    # Check if token is blacklisted
-    if token in BLACKLIST_TOKENS:
-        raise credentials_exception
-    
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
+    claims = auth_cache.get_claims(token)
+    if claims is None:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            username: str = payload.get("sub")
+            
+            if username is None:
+                raise credentials_exception
+            
+            token_data = schemas.TokenData(username=username)
         
-        if username is None:
+        except JWTError:
             raise credentials_exception
         
-        token_data = schemas.TokenData(username=username)
+        claims = (token_data.username, revocation_key(token, payload))
+        if payload.get("exp"):
+            auth_cache.put_claims(token, claims[0], claims[1], float(payload["exp"]))
     
-    except JWTError:
-        raise credentials_exception
+    username, key = claims
     
-    user = db.query(models.User).filter(models.User.username == token_data.username).first()
+    # Check if token was revoked by a logout
+    if await revocation_store.is_revoked(key):
+        raise credentials_exception
     
+    user = auth_cache.get_principal(username)
     if user is None:
-        raise credentials_exception
+        user = await load_principal(db, username)
+        
+        if user is None:
+            raise credentials_exception
+        
+        auth_cache.put_principal(user)
     
     if user.disabled:
         raise HTTPException(
@@ -118,7 +344,20 @@ async def get_current_user(
     return user
 
 
-async def get_current_active_user(current_user: models.User = Depends(get_current_user)) -> models.User:
+async def revoke_token(token: str):
+    """
+    Revoke an access token until it expires (used by logout)
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return
+    
+    expires_at = float(payload.get("exp") or time.time() + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+    await revocation_store.revoke(revocation_key(token, payload), expires_at)
+
+
+async def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     """
     Get current active user
     """
@@ -127,7 +366,7 @@ async def get_current_active_user(current_user: models.User = Depends(get_curren
     return current_user
 
 
-def require_admin(current_user: models.User = Depends(get_current_user)) -> models.User:
+def require_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     """
     Require admin role
     """
@@ -139,7 +378,7 @@ def require_admin(current_user: models.User = Depends(get_current_user)) -> mode
     return current_user
 
 
-def require_organizer(current_user: models.User = Depends(get_current_user)) -> models.User:
+def require_organizer(current_user: Principal = Depends(get_current_user)) -> Principal:
     """
     Require organizer role (club member)
     """
@@ -3,6 +3,11 @@ Utility functions - QR code generation and email sending
 """
 import qrcode
 import os
+import json
+import hmac
+import base64
+import struct
+import hashlib
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -12,15 +17,78 @@ from jose import jwt
 from .config import settings
 from typing import Optional
 import io
+import threading
+from collections import OrderedDict
+
+
+# Compact QR token layout: prefix + base32(event_id, attendee_id, exp, truncated MAC)
+# Uppercase base32 stays inside the QR alphanumeric charset, which keeps codes small
+COMPACT_QR_PREFIX = "QF1"
+COMPACT_QR_STRUCT = struct.Struct(">III")
+COMPACT_QR_MAC_BYTES = 8
+
+
+def _compact_qr_mac(body: bytes) -> bytes:
+    """
+    Truncated HMAC-SHA256 of a compact token body
+    """
+    key = hmac.new(settings.SECRET_KEY.encode('utf-8'), b"qr-token", hashlib.sha256).digest()
+    return hmac.new(key, COMPACT_QR_PREFIX.encode('ascii') + body, hashlib.sha256).digest()[:COMPACT_QR_MAC_BYTES]
+
+
+def generate_compact_qr_token(event_id: int, attendee_id: int, expire: datetime) -> str:
+    """
+    Generate a compact HMAC-signed QR token
+    Holds only the ids and expiry, so the QR code needs a much lower version than a JWT
+    """
+    if expire.tzinfo is None:
+        expire = expire.replace(tzinfo=timezone.utc)
+    
+    body = COMPACT_QR_STRUCT.pack(event_id, attendee_id, int(expire.timestamp()))
+    encoded = base64.b32encode(body + _compact_qr_mac(body)).decode('ascii').rstrip("=")
+    return COMPACT_QR_PREFIX + encoded
+
+
+def verify_compact_qr_token(token: str) -> dict:
+    """
+    Verify and decode a compact QR token
+    Returns payload if valid, raises ValueError if invalid or expired
+    """
+    encoded = token[len(COMPACT_QR_PREFIX):]
+    try:
+        raw = base64.b32decode(encoded + "=" * (-len(encoded) % 8))
+    except Exception:
+        raise ValueError("Invalid QR token: Malformed compact token")
+    
+    if len(raw) != COMPACT_QR_STRUCT.size + COMPACT_QR_MAC_BYTES:
+        raise ValueError("Invalid QR token: Malformed compact token")
+    
+    body, mac = raw[:COMPACT_QR_STRUCT.size], raw[COMPACT_QR_STRUCT.size:]
+    if not hmac.compare_digest(mac, _compact_qr_mac(body)):
+        raise ValueError("Invalid QR token: Signature verification failed")
+    
+    event_id, attendee_id, exp = COMPACT_QR_STRUCT.unpack(body)
+    if exp < int(datetime.now(timezone.utc).timestamp()):
+        raise ValueError("Invalid QR token: Signature has expired")
+    
+    return {
+        "event_id": event_id,
+        "attendee_id": attendee_id,
+        "exp": exp
+    }
 
 
 def generate_qr_token(event_id: int, attendee_id: int, email: str, roll_number: str, event_date: datetime) -> str:
     """
-    Generate a secure JWT token for QR code
+    Generate a secure token for QR code
+    Uses the compact format unless QR_TOKEN_FORMAT is set to "jwt"
     """
     # Token expires 1 day after event
     expire = event_date + timedelta(days=1)
     
+    if settings.QR_TOKEN_FORMAT == "compact":
+        return generate_compact_qr_token(event_id, attendee_id, expire)
+    
     payload = {
         "event_id": event_id,
         "attendee_id": attendee_id,
@@ -34,16 +102,112 @@ def generate_qr_token(event_id: int, attendee_id: int, email: str, roll_number:
     return token
 
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified QR token -> payload
+    Entries are never served past the token's exp; failed verifications are not cached
+    """
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+    
+    def get(self, token: str) -> Optional[dict]:
+        with self._lock:
+            cached = self._entries.get(token)
+            if cached is None:
+                self.misses += 1
+                return None
+            
+            payload, exp = cached
+            if exp <= datetime.now(timezone.utc).timestamp():
+                del self._entries[token]
+                self.expired += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return dict(payload)
+    
+    def put(self, token: str, payload: dict):
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)) or self.maxsize <= 0:
+            return
+        
+        with self._lock:
+            self._entries[token] = (dict(payload), exp)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+# Shared cache of verified QR tokens (status/validate/scan re-verify the same badge)
+qr_token_cache = VerifiedTokenCache(maxsize=settings.QR_TOKEN_CACHE_SIZE)
+
+
 def verify_qr_token(token: str) -> dict:
     """
-    Verify and decode QR token
+    Verify and decode QR token (compact format or legacy JWT)
     Returns payload if valid, raises exception if invalid
     """
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    payload = qr_token_cache.get(token)
+    if payload is not None:
         return payload
-    except Exception as e:
-        raise ValueError(f"Invalid QR token: {str(e)}")
+    
+    if token.startswith(COMPACT_QR_PREFIX):
+        payload = verify_compact_qr_token(token)
+    else:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except Exception as e:
+            raise ValueError(f"Invalid QR token: {str(e)}")
+    
+    qr_token_cache.put(token, payload)
+    return payload
+
+
+def qr_token_digest(token: str) -> str:
+    """
+    Short SHA-256 digest of a QR token
+    Offline scanners look up scanned codes by this digest instead of the raw token
+    """
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()[:32]
+
+
+def sign_roster_payload(payload: dict) -> Optional[str]:
+    """
+    HMAC-SHA256 signature of a roster snapshot/delta payload
+    Signed over the canonical JSON form (sorted keys, no whitespace) with
+    ROSTER_SNAPSHOT_SECRET, the key shared with scanner devices. Returns None
+    when it is not set: a key the devices don't have can't be verified.
+    """
+    if not settings.ROSTER_SNAPSHOT_SECRET:
+        return None
+    
+    key = settings.ROSTER_SNAPSHOT_SECRET.encode('utf-8')
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hmac.new(key, body.encode('utf-8'), hashlib.sha256).hexdigest()
 
 
 def generate_qr_code(token: str, attendee_name: str, event_name: str) -> bytes:
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Async Database Benchmark
+Measures check-in scan latency while slow queries run on the same worker:
+once with the slow query on a sync Session (blocks the event loop, the
+old behaviour of every handler) and once on an AsyncSession.
+
+Runs an in-process server on a throwaway SQLite database.
+
+Usage:
+    python3 benchmark_async_db.py [--attendees 3000] [--slow-requests 6] [--scanners 4]
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import tempfile
+import threading
+import statistics
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# Deliberately expensive: a self-join over the attendees table
+SLOW_QUERY = """
+    SELECT count(*) FROM attendees a JOIN attendees b ON a.branch = b.branch AND a.year = b.year
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sync vs async session benchmark")
+    parser.add_argument("--attendees", type=int, default=3000, help="Attendees to seed")
+    parser.add_argument("--slow-requests", type=int, default=6, help="Slow queries per mode")
+    parser.add_argument("--scanners", type=int, default=4, help="Concurrent scanners")
+    return parser.parse_args()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def add_benchmark_routes(app):
+    """
+    The same slow query behind a sync and an async session
+    """
+    from fastapi import Depends
+    from sqlalchemy import text
+    from sqlalchemy.orm import Session
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from app.database import get_db, get_async_db
+
+    async def slow_sync(db: Session = Depends(get_db)):
+        return {"count": db.execute(text(SLOW_QUERY)).scalar()}
+
+    async def slow_async(db: AsyncSession = Depends(get_async_db)):
+        return {"count": (await db.execute(text(SLOW_QUERY))).scalar()}
+
+    app.add_api_route("/benchmark/slow-sync", slow_sync, methods=["GET"])
+    app.add_api_route("/benchmark/slow-async", slow_async, methods=["GET"])
+
+
+def start_server() -> str:
+    import uvicorn
+    from app.main import app
+
+    add_benchmark_routes(app)
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(base_url, timeout=1)
+            return base_url
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    raise RuntimeError("Server did not start")
+
+
+def seed(attendee_count: int) -> list:
+    """
+    Create an admin, an event and attendees; return their QR tokens
+    """
+    from sqlalchemy import insert
+    from app import models, utils, security
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        club = models.Club(name="Benchmark Club")
+        db.add(club)
+        db.commit()
+        admin = models.User(
+            username="bench", email="bench@benchmark.local",
+            password_hash=security.get_password_hash("bench-password"), role="admin"
+        )
+        db.add(admin)
+        db.commit()
+        event = models.Event(
+            club_id=club.id, created_by=admin.id, name="Benchmark Event",
+            date=datetime.now(timezone.utc) + timedelta(days=1)
+        )
+        db.add(event)
+        db.commit()
+
+        ids = db.execute(insert(models.Attendee).returning(models.Attendee.id), [
+            {
+                "event_id": event.id, "name": f"Attendee {i}", "email": f"a{i}@benchmark.local",
+                "roll_number": f"B{i:06d}", "branch": "CSE ECE EEE MECH".split()[i % 4],
+                "year": 1 + i % 4, "section": "AB"[i % 2], "checked_in": False
+            }
+            for i in range(attendee_count)
+        ]).scalars().all()
+        db.commit()
+
+        expire = event.date + timedelta(days=1)
+        return [utils.generate_compact_qr_token(event.id, attendee_id, expire) for attendee_id in ids]
+    finally:
+        db.close()
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_mode(base_url: str, headers: dict, slow_path: str, tokens: list, args) -> dict:
+    """
+    Scanners check attendees in while slow queries run one after another
+    """
+    stop = threading.Event()
+    token_iter = iter(tokens)
+    token_lock = threading.Lock()
+    scan_ms = []
+
+    def scanner():
+        session = requests.Session()
+        session.headers.update(headers)
+        while not stop.is_set():
+            with token_lock:
+                token = next(token_iter, None)
+            if token is None:
+                return
+            started = time.perf_counter()
+            response = session.post(f"{base_url}/api/checkin/scan", json={"qr_token": token}, timeout=60)
+            assert response.status_code == 200 and response.json()["success"], response.text
+            scan_ms.append((time.perf_counter() - started) * 1000)
+
+    slow_ms = []
+    with ThreadPoolExecutor(max_workers=args.scanners) as pool:
+        futures = [pool.submit(scanner) for _ in range(args.scanners)]
+        time.sleep(0.3)
+        for _ in range(args.slow_requests):
+            started = time.perf_counter()
+            requests.get(f"{base_url}{slow_path}", headers=headers, timeout=300).raise_for_status()
+            slow_ms.append((time.perf_counter() - started) * 1000)
+        stop.set()
+        for future in futures:
+            future.result()
+
+    return {
+        "slow_ms": statistics.mean(slow_ms),
+        "scans": len(scan_ms),
+        "scan_p50": percentile(scan_ms, 50),
+        "scan_p99": percentile(scan_ms, 99),
+        "scan_max": max(scan_ms)
+    }
+
+
+def print_result(name: str, result: dict):
+    print(f"\n📦 {name}")
+    print(f"   Slow query:      {result['slow_ms']:.0f} ms avg")
+    print(f"   Scans completed: {result['scans']}")
+    print(f"   Scan latency:    p50 {result['scan_p50']:.1f} ms | p99 {result['scan_p99']:.1f} ms | "
+          f"max {result['scan_max']:.1f} ms")
+
+
+def main():
+    args = parse_args()
+
+    # Must be configured before the app modules are imported
+    db_path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["ENVIRONMENT"] = "testing"
+    os.environ["SCAN_DEBOUNCE_SECONDS"] = "0"
+
+    from app import models
+    from app.database import engine
+
+    models.Base.metadata.create_all(bind=engine)
+    # WAL so the slow read doesn't lock out the scanners' writes (as on PostgreSQL)
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+    tokens = seed(args.attendees)
+    base_url = start_server()
+
+    response = requests.post(
+        f"{base_url}/api/auth/login", data={"username": "bench", "password": "bench-password"}, timeout=30
+    )
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    print("🗄️  Async Database Benchmark")
+    print("=" * 40)
+    print(f"Attendees: {args.attendees} | Scanners: {args.scanners} | Slow queries per mode: {args.slow_requests}")
+
+    half = len(tokens) // 2
+    print_result("Slow query on sync Session (blocks the event loop)",
+                 run_mode(base_url, headers, "/benchmark/slow-sync", tokens[:half], args))
+    print_result("Slow query on AsyncSession",
+                 run_mode(base_url, headers, "/benchmark/slow-async", tokens[half:], args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
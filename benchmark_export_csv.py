@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+CSV Export Memory Benchmark
+Measures peak memory and time of the attendee CSV export for one large
+event: once the old way (ORM objects -> dicts -> pandas DataFrame -> sort ->
+StringIO -> bytes) and once streamed from a cursor (app/exports.py).
+
+Each mode runs in a fresh subprocess so peak RSS is not shared. Uses a
+throwaway SQLite database.
+
+Usage:
+    python3 benchmark_export_csv.py [--attendees 100000] [--batch-size 1000]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import resource
+import tempfile
+import subprocess
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Buffered vs streamed CSV export benchmark")
+    parser.add_argument("--attendees", type=int, default=100000, help="Attendees to seed")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows fetched per batch when streaming")
+    parser.add_argument("--measure", choices=["buffered", "streamed"], help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def configure(db_path: str):
+    # Must be configured before the app modules are imported
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["ENVIRONMENT"] = "testing"
+
+
+def seed(attendee_count: int) -> int:
+    """
+    Create an event with attendee_count attendees, a third of them checked in
+    """
+    from sqlalchemy import insert
+    from app import models
+    from app.database import SessionLocal, engine
+
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        club = models.Club(name="Benchmark Club")
+        db.add(club)
+        db.commit()
+        admin = models.User(username="bench", email="bench@benchmark.local", password_hash="x", role="admin")
+        db.add(admin)
+        db.commit()
+        event = models.Event(
+            club_id=club.id, created_by=admin.id, name="Benchmark Event",
+            date=datetime.now(timezone.utc) + timedelta(days=1)
+        )
+        db.add(event)
+        db.commit()
+
+        checkin_time = datetime.now(timezone.utc)
+        for start in range(0, attendee_count, 10000):
+            db.execute(insert(models.Attendee), [
+                {
+                    "event_id": event.id, "name": f"Attendee {i}", "email": f"a{i}@benchmark.local",
+                    "roll_number": f"B{i:06d}", "branch": "CSE ECE EEE MECH".split()[i % 4],
+                    "year": 1 + i % 4, "section": "ABC"[i % 3], "phone": f"9{i:09d}",
+                    "checked_in": i % 3 == 0, "checkin_time": checkin_time if i % 3 == 0 else None,
+                    "checked_by": admin.id if i % 3 == 0 else None
+                }
+                for i in range(start, min(start + 10000, attendee_count))
+            ])
+        db.commit()
+        return event.id
+    finally:
+        db.close()
+
+
+def buffered_export(event_id: int) -> bytes:
+    """
+    The export as it was before streaming
+    """
+    import io
+    import pandas as pd
+    from app import models
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        attendees = db.query(models.Attendee).filter(models.Attendee.event_id == event_id).all()
+        csv_data = []
+        for attendee in attendees:
+            csv_data.append({
+                'Name': attendee.name,
+                'Email': attendee.email,
+                'Roll Number': attendee.roll_number,
+                'Branch': attendee.branch,
+                'Year': attendee.year,
+                'Section': attendee.section,
+                'Phone': attendee.phone or '',
+                'Gender': attendee.gender,
+                'Checked In': 'Yes' if attendee.checked_in else 'No',
+                'Check-in Time': attendee.checkin_time.strftime('%Y-%m-%d %I:%M %p') if attendee.checkin_time else '',
+                'Checked By': attendee.checker.username if attendee.checker else '',
+                'QR Generated': 'Yes' if attendee.qr_generated else 'No',
+                'Email Sent': 'Yes' if attendee.email_sent else 'No',
+                'Email Error': attendee.email_error or ''
+            })
+        df = pd.DataFrame(csv_data)
+        df = df.sort_values(['Branch', 'Year', 'Section', 'Name'])
+        csv_buffer = io.StringIO()
+        df.to_csv(csv_buffer, index=False)
+        return csv_buffer.getvalue().encode()
+    finally:
+        db.close()
+
+
+def current_rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(mode: str, db_path: str, batch_size: int) -> dict:
+    """
+    Run one export in this process and report its memory and timing
+    """
+    configure(db_path)
+    import pandas  # noqa: F401 - imported up front so both modes start from the same baseline
+    from sqlalchemy import select
+    from app import models
+    from app.database import SessionLocal
+    from app.exports import stream_csv
+
+    with SessionLocal() as db:
+        event_id = db.execute(select(models.Event.id)).scalar()
+
+    digest = hashlib.sha1()
+    size = 0
+    baseline_rss = current_rss_mb()
+    tracemalloc.start()
+    started = time.perf_counter()
+    first_byte = None
+
+    if mode == "buffered":
+        body = buffered_export(event_id)
+        first_byte = time.perf_counter() - started
+        digest.update(body)
+        size = len(body)
+        del body
+    else:
+        async def consume():
+            nonlocal size, first_byte
+            chunks = stream_csv(event_id, batch_size)
+            header = await chunks.__anext__()  # sent before any query runs
+            digest.update(header)
+            size += len(header)
+            async for chunk in chunks:
+                if first_byte is None:
+                    first_byte = time.perf_counter() - started
+                digest.update(chunk)
+                size += len(chunk)
+        asyncio.run(consume())
+
+    elapsed = time.perf_counter() - started
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": elapsed,
+        "first_rows_seconds": first_byte or elapsed,
+        "traced_peak_mb": traced_peak / 1024 / 1024,
+        "rss_growth_mb": max(0.0, peak_rss_mb() - baseline_rss),
+        "bytes": size,
+        "sha1": digest.hexdigest()
+    }
+
+
+def run_mode(mode: str, db_path: str, batch_size: int) -> dict:
+    output = subprocess.run(
+        [sys.executable, __file__, "--measure", mode, "--db", db_path, "--batch-size", str(batch_size)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def print_result(name: str, result: dict):
+    print(f"\n📦 {name}")
+    print(f"   Total time:      {result['seconds']:.2f} s")
+    print(f"   First rows sent: {result['first_rows_seconds']:.2f} s")
+    print(f"   Peak RSS growth: {result['rss_growth_mb']:.1f} MB")
+    print(f"   Peak traced:     {result['traced_peak_mb']:.1f} MB (Python allocations)")
+    print(f"   CSV size:        {result['bytes'] / 1024 / 1024:.1f} MB")
+
+
+def main():
+    args = parse_args()
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.db, args.batch_size)))
+        return
+
+    db_path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    configure(db_path)
+    print(f"🌱 Seeding {args.attendees} attendees...")
+    seed(args.attendees)
+
+    buffered = run_mode("buffered", db_path, args.batch_size)
+    streamed = run_mode("streamed", db_path, args.batch_size)
+
+    print("\n" + "=" * 60)
+    print(f"CSV EXPORT BENCHMARK ({args.attendees} attendees)")
+    print("=" * 60)
+    print_result("Buffered (ORM + pandas, old)", buffered)
+    print_result(f"Streamed (cursor, batches of {args.batch_size})", streamed)
+    print(f"\n   Identical output: {'✅' if buffered['sha1'] == streamed['sha1'] else '❌'}")
+    if streamed["traced_peak_mb"]:
+        print(f"   Peak traced memory: {buffered['traced_peak_mb'] / streamed['traced_peak_mb']:.0f}x lower streamed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+XLSX Export Memory Benchmark
+Measures peak memory and time of the attendee Excel export for one large
+event: once built in memory (all rows loaded, regular openpyxl workbook,
+saved to BytesIO) and once streamed (write-only workbook fed from a cursor,
+app/exports.py).
+
+Each mode runs in a fresh subprocess so peak RSS is not shared. Reuses the
+seeding and memory helpers of benchmark_export_csv.py.
+
+Usage:
+    python3 benchmark_export_xlsx.py [--attendees 100000] [--sheets single|branch|section]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+
+from benchmark_export_csv import configure, current_rss_mb, peak_rss_mb, seed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="In-memory vs streamed XLSX export benchmark")
+    parser.add_argument("--attendees", type=int, default=100000, help="Attendees to seed")
+    parser.add_argument("--sheets", choices=["single", "branch", "section"], default="single", help="Sheet layout")
+    parser.add_argument("--measure", choices=["in-memory", "streamed"], help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def in_memory_export(event_id: int, sheets: str) -> bytes:
+    """
+    The straightforward way: every row in memory, a regular workbook, one save
+    """
+    from openpyxl import Workbook
+    from app.database import SessionLocal
+    from app.exports import EXPORT_COLUMNS, export_query, export_row
+
+    with SessionLocal() as db:
+        rows = db.execute(export_query(event_id)).all()
+
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    worksheets = {}
+    for row in rows:
+        key = {"branch": row.branch, "section": f"{row.branch} {row.year}-{row.section}"}.get(sheets, "Attendees")
+        if key not in worksheets:
+            worksheets[key] = workbook.create_sheet(key[:31])
+            worksheets[key].append(EXPORT_COLUMNS)
+        worksheets[key].append(export_row(row))
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def measure(mode: str, db_path: str, sheets: str) -> dict:
+    """
+    Run one export in this process and report its memory and timing
+    """
+    configure(db_path)
+    import openpyxl  # noqa: F401 - imported up front so both modes start from the same baseline
+    from sqlalchemy import select
+    from app import models
+    from app.database import SessionLocal
+    from app.exports import stream_xlsx
+
+    with SessionLocal() as db:
+        event_id = db.execute(select(models.Event.id)).scalar()
+
+    baseline_rss = current_rss_mb()
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    if mode == "in-memory":
+        size = len(in_memory_export(event_id, sheets))
+    else:
+        async def consume() -> int:
+            return sum([len(chunk) async for chunk in stream_xlsx(event_id, sheets)])
+        size = asyncio.run(consume())
+
+    elapsed = time.perf_counter() - started
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": elapsed,
+        "traced_peak_mb": traced_peak / 1024 / 1024,
+        "rss_growth_mb": max(0.0, peak_rss_mb() - baseline_rss),
+        "bytes": size
+    }
+
+
+def run_mode(mode: str, db_path: str, sheets: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, __file__, "--measure", mode, "--db", db_path, "--sheets", sheets],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def print_result(name: str, result: dict):
+    print(f"\n📦 {name}")
+    print(f"   Total time:      {result['seconds']:.2f} s")
+    print(f"   Peak RSS growth: {result['rss_growth_mb']:.1f} MB")
+    print(f"   Peak traced:     {result['traced_peak_mb']:.1f} MB (Python allocations)")
+    print(f"   XLSX size:       {result['bytes'] / 1024 / 1024:.1f} MB")
+
+
+def main():
+    args = parse_args()
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.db, args.sheets)))
+        return
+
+    db_path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    configure(db_path)
+    print(f"🌱 Seeding {args.attendees} attendees...")
+    seed(args.attendees)
+
+    in_memory = run_mode("in-memory", db_path, args.sheets)
+    streamed = run_mode("streamed", db_path, args.sheets)
+
+    print("\n" + "=" * 60)
+    print(f"XLSX EXPORT BENCHMARK ({args.attendees} attendees, sheets={args.sheets})")
+    print("=" * 60)
+    print_result("In memory (regular workbook)", in_memory)
+    print_result("Streamed (write-only workbook, temp file)", streamed)
+    if streamed["traced_peak_mb"]:
+        print(f"\n   Peak traced memory: {in_memory['traced_peak_mb'] / streamed['traced_peak_mb']:.0f}x lower streamed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Password Hashing Benchmark
+Measures login throughput and the latency of unrelated requests served
+while logins are running, with bcrypt run inline on the event loop (the
+old behaviour) and offloaded to the password hashing thread pool.
+
+Runs an in-process server on a throwaway SQLite database.
+
+Usage:
+    python3 benchmark_password_hashing.py [--logins 40] [--login-clients 8] [--rounds 12]
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import tempfile
+import threading
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Password hashing benchmark")
+    parser.add_argument("--logins", type=int, default=40, help="Logins per mode")
+    parser.add_argument("--login-clients", type=int, default=8, help="Concurrent login clients")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost (BCRYPT_ROUNDS)")
+    return parser.parse_args()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server() -> str:
+    import uvicorn
+    from app.main import app
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(base_url, timeout=1)
+            return base_url
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    raise RuntimeError("Server did not start")
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_mode(base_url: str, args) -> dict:
+    """
+    Fire logins from several clients while one client keeps pinging GET /
+    """
+    stop = threading.Event()
+    ping_ms = []
+
+    def pinger():
+        session = requests.Session()
+        while not stop.is_set():
+            started = time.perf_counter()
+            session.get(base_url, timeout=30)
+            ping_ms.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.005)
+
+    def login(_):
+        started = time.perf_counter()
+        response = requests.post(
+            f"{base_url}/api/auth/login",
+            data={"username": "bench", "password": "bench-password"},
+            timeout=60
+        )
+        assert response.status_code == 200, response.text
+        return (time.perf_counter() - started) * 1000
+
+    ping_thread = threading.Thread(target=pinger, daemon=True)
+    ping_thread.start()
+    time.sleep(0.2)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.login_clients) as pool:
+        login_ms = list(pool.map(login, range(args.logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    ping_thread.join()
+
+    return {
+        "logins_per_second": args.logins / elapsed,
+        "login_p50": percentile(login_ms, 50),
+        "login_p99": percentile(login_ms, 99),
+        "ping_p50": percentile(ping_ms, 50),
+        "ping_p99": percentile(ping_ms, 99),
+        "ping_max": max(ping_ms),
+        "pings": len(ping_ms)
+    }
+
+
+def print_result(name: str, result: dict):
+    print(f"\n📦 {name}")
+    print(f"   Login throughput:     {result['logins_per_second']:.1f} logins/s")
+    print(f"   Login latency:        p50 {result['login_p50']:.0f} ms | p99 {result['login_p99']:.0f} ms")
+    print(f"   Unrelated GET / :     p50 {result['ping_p50']:.1f} ms | p99 {result['ping_p99']:.1f} ms | "
+          f"max {result['ping_max']:.1f} ms ({result['pings']} requests)")
+
+
+def main():
+    args = parse_args()
+
+    # Must be configured before the app modules are imported
+    db_path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["ENVIRONMENT"] = "testing"
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+
+    from app import models, security
+    from app.database import engine, SessionLocal
+
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(models.User(
+        username="bench", email="bench@benchmark.local",
+        password_hash=security.get_password_hash("bench-password"), role="admin"
+    ))
+    db.commit()
+    db.close()
+
+    base_url = start_server()
+
+    print("🔐 Password Hashing Benchmark")
+    print("=" * 40)
+    print(f"bcrypt rounds:   {args.rounds}")
+    print(f"Logins per mode: {args.logins} from {args.login_clients} clients")
+
+    # Old behaviour: bcrypt runs on the event loop thread
+    offloaded_run = security.password_hasher.run
+
+    async def inline_run(func, *call_args):
+        return func(*call_args)
+
+    security.password_hasher.run = inline_run
+    print_result("Inline bcrypt (blocks the event loop)", run_mode(base_url, args))
+
+    security.password_hasher.run = offloaded_run
+    print_result(
+        f"Offloaded bcrypt ({security.settings.PASSWORD_HASH_WORKERS} hashing threads)",
+        run_mode(base_url, args)
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
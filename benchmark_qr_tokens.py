@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+QR Token Format Benchmark
+Compares the legacy JWT QR token with the compact HMAC token:
+token length, QR version, PNG size, server-side verify time and
+(if OpenCV or pyzbar is installed) image decode time.
+
+Usage:
+    python3 benchmark_qr_tokens.py [--samples 200]
+"""
+
+import os
+import io
+import time
+import argparse
+import statistics
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("ENVIRONMENT", "testing")
+
+import qrcode
+from app import utils
+from app.config import settings
+
+
+def load_decoder():
+    """Return a function decoding PNG bytes to text, or None if no decoder is installed"""
+    try:
+        import cv2
+        import numpy as np
+
+        detector = cv2.QRCodeDetector()
+
+        def decode(png_bytes):
+            image = cv2.imdecode(np.frombuffer(png_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+            data, _, _ = detector.detectAndDecode(image)
+            return data
+
+        return "opencv", decode
+    except ImportError:
+        pass
+
+    try:
+        from pyzbar.pyzbar import decode as zbar_decode
+        from PIL import Image
+
+        def decode(png_bytes):
+            results = zbar_decode(Image.open(io.BytesIO(png_bytes)))
+            return results[0].data.decode() if results else ""
+
+        return "pyzbar", decode
+    except ImportError:
+        return None, None
+
+
+def qr_version(token: str) -> int:
+    """QR version chosen for a token with the same settings as utils.generate_qr_code"""
+    qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_H, box_size=10, border=4)
+    qr.add_data(token)
+    qr.make(fit=True)
+    return qr.version
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def benchmark_format(name: str, tokens: list, decode):
+    """Measure one token format"""
+    versions, png_sizes, verify_ms, decode_ms = [], [], [], []
+    decode_failures = 0
+
+    for token in tokens:
+        versions.append(qr_version(token))
+        png = utils.generate_qr_code(token, "Benchmark Attendee", "Benchmark Event")
+        png_sizes.append(len(png))
+
+        payload, elapsed = timed(utils.verify_qr_token, token)
+        assert payload["attendee_id"]
+        verify_ms.append(elapsed)
+
+        if decode:
+            data, elapsed = timed(decode, png)
+            decode_ms.append(elapsed)
+            if data != token:
+                decode_failures += 1
+
+    print(f"\n📦 {name}")
+    print(f"   Token length:      {statistics.mean(len(t) for t in tokens):.0f} chars")
+    print(f"   QR version:        {min(versions)}-{max(versions)} ({17 + 4 * max(versions)}x{17 + 4 * max(versions)} modules)")
+    print(f"   PNG size:          {statistics.mean(png_sizes) / 1024:.1f} KB avg")
+    print(f"   Verify time:       {statistics.median(verify_ms):.3f} ms median")
+    if decode_ms:
+        print(f"   Image decode time: {statistics.median(decode_ms):.2f} ms median")
+        print(f"   Decode failures:   {decode_failures}/{len(tokens)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="QR token format benchmark")
+    parser.add_argument("--samples", type=int, default=200, help="Tokens per format")
+    args = parser.parse_args()
+
+    event_date = datetime.now(timezone.utc) + timedelta(days=7)
+    expire = event_date + timedelta(days=1)
+
+    original_format = settings.QR_TOKEN_FORMAT
+    try:
+        settings.QR_TOKEN_FORMAT = "jwt"
+        jwt_tokens = [
+            utils.generate_qr_token(
+                event_id=12, attendee_id=10000 + i,
+                email=f"student{i}@college.edu", roll_number=f"21BCE{i:04d}",
+                event_date=event_date
+            )
+            for i in range(args.samples)
+        ]
+    finally:
+        settings.QR_TOKEN_FORMAT = original_format
+
+    compact_tokens = [
+        utils.generate_compact_qr_token(event_id=12, attendee_id=10000 + i, expire=expire)
+        for i in range(args.samples)
+    ]
+
+    decoder_name, decode = load_decoder()
+
+    print("🧪 QR Token Format Benchmark")
+    print("=" * 40)
+    print(f"Samples per format: {args.samples}")
+    print(f"Image decoder:      {decoder_name or 'not installed (pip install opencv-python-headless)'}")
+
+    benchmark_format("Legacy JWT token", jwt_tokens, decode)
+    benchmark_format("Compact HMAC token", compact_tokens, decode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Shared test fixtures - Throwaway SQLite databases
+
+The helpers are plain functions as well as fixtures, so each test script
+can still be run on its own (python3 test_x.py) without pytest. Import
+from conftest before anything from app: it points the app's own engines
+(used by the API tests) at a throwaway SQLite file, never a real database.
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("ENVIRONMENT", "testing")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "qrflow_test.db")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models
+
+
+def memory_engine():
+    """
+    In-memory SQLite engine with the full schema (one shared connection)
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def memory_session_factory():
+    return sessionmaker(bind=memory_engine())
+
+
+def seeded_session():
+    """
+    Session on a fresh database holding an admin user, a club and an event
+    tomorrow; returns (db, user, club, event)
+    """
+    db = memory_session_factory()()
+    user = models.User(username="tester", email="tester@example.com", password_hash="x", role="admin")
+    club = models.Club(name="Test Club")
+    db.add_all([user, club])
+    db.commit()
+    event = models.Event(club_id=club.id, created_by=user.id, name="Test Event",
+                         date=datetime.now(timezone.utc) + timedelta(days=1))
+    db.add(event)
+    db.commit()
+    return db, user, club, event
+
+
+def api_session():
+    """
+    TestClient on the app with a fresh schema on its database and empty
+    in-process caches; returns (client, db, admin, club, event) with three
+    attendees in the event
+    """
+    from fastapi.testclient import TestClient
+    from app import database, security
+    from app.checkin import scan_debouncer
+    from app.main import app
+    from app.response_cache import response_cache
+    from app.roster import roster_cache
+
+    models.Base.metadata.drop_all(bind=database.engine)
+    models.Base.metadata.create_all(bind=database.engine)
+    for cache in (roster_cache, response_cache, scan_debouncer, security.auth_cache):
+        cache.clear()
+
+    db = database.SessionLocal()
+    admin = models.User(username="admin", email="admin@example.com", password_hash="x", role="admin")
+    club = models.Club(name="API Club")
+    db.add_all([admin, club])
+    db.commit()
+    event = models.Event(club_id=club.id, created_by=admin.id, name="API Event",
+                         date=datetime.now(timezone.utc) + timedelta(days=1))
+    db.add(event)
+    db.commit()
+    db.add_all([
+        models.Attendee(event_id=event.id, name=f"Attendee {i}", email=f"a{i}@example.com",
+                        roll_number=f"R{i}", branch="CSE", year=1, section="A")
+        for i in range(3)
+    ])
+    db.commit()
+    return TestClient(app), db, admin, club, event
+
+
+def auth_headers(user) -> dict:
+    from app.security import create_access_token
+    return {"Authorization": f"Bearer {create_access_token({'sub': user.username})}"}
+
+
+@pytest.fixture
+def api():
+    client, db, admin, club, event = api_session()
+    yield client, db, admin, club, event
+    db.close()
+
+
+@pytest.fixture
+def session_factory():
+    return memory_session_factory()
+
+
+@pytest.fixture
+def seeded():
+    db, user, club, event = seeded_session()
+    yield db, user, club, event
+    db.close()
@@ -1,9 +1,9 @@
 """
-Initialize database tables
+Initialize database tables (applies all schema migrations)
 """
-from app.database import engine
-from app import models
+from app.database import migration_engine
+from app import migrations
 
 print("Creating database tables...")
-models.Base.metadata.create_all(bind=engine)
-print("✅ Database tables created successfully!")
+version = migrations.upgrade(migration_engine())
+print(f"✅ Database tables created successfully! (schema version {version})")
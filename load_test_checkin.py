@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Gate Load Test - Concurrent QR scanners against /api/checkin/scan
+Seeds an event with N attendees, then drives M concurrent scanners through
+a realistic scan mix (first scans, duplicate scans, invalid and expired
+tokens) and reports throughput, latency percentiles and lock waits.
+
+Two ways to run it:
+
+    # In-process server on a SQLite stand-in (no setup needed)
+    python3 load_test_checkin.py --sqlite /tmp/loadtest.db --attendees 5000 --scanners 20
+
+    # Against a running server; seeding goes through DATABASE_URL, which must
+    # be the same database (and SECRET_KEY) the server uses, e.g. local Postgres
+    python3 load_test_checkin.py --url http://localhost:8000 --attendees 20000 --scanners 50
+
+Lock waits are sampled from pg_locks on PostgreSQL. On SQLite, "database is
+locked" errors returned by the scan endpoint are counted instead.
+"""
+
+import os
+import sys
+import time
+import random
+import socket
+import argparse
+import threading
+import statistics
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+LOADTEST_CLUB = "Load Test Club"
+LOADTEST_USER = "loadtest_scanner"
+LOADTEST_PASSWORD = "loadtest-scanner-password"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Concurrent QR scanner load test")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Base URL of a running server")
+    target.add_argument("--sqlite", metavar="PATH", help="Start an in-process server on this SQLite file")
+    parser.add_argument("--attendees", type=int, default=2000, help="Attendees to seed (N)")
+    parser.add_argument("--scanners", type=int, default=20, help="Concurrent scanners (M)")
+    parser.add_argument("--duplicate-rate", type=float, default=0.15, help="Share of scans that re-scan an attendee")
+    parser.add_argument("--invalid-rate", type=float, default=0.03, help="Share of scans with a tampered token")
+    parser.add_argument("--expired-rate", type=float, default=0.02, help="Share of scans with an expired token")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the scan mix")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded event after the run")
+    return parser.parse_args()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_local_server(sqlite_path: str) -> str:
+    """
+    Run the app with uvicorn in a background thread on a SQLite database
+    """
+    import uvicorn
+    from app.main import app
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(f"{base_url}/health", timeout=1)
+            return base_url
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    raise RuntimeError("Local server did not start")
+
+
+def seed_event(attendee_count: int):
+    """
+    Create the load-test club, scanner account and an event with attendees
+    Returns (event_id, {attendee_id: qr_token})
+    """
+    from sqlalchemy import insert, update
+    from app import models, utils, security
+    from app.database import SessionLocal
+    from app.event_stats import rebuild_event_stats
+
+    db = SessionLocal()
+    try:
+        club = db.query(models.Club).filter(models.Club.name == LOADTEST_CLUB).first()
+        if not club:
+            club = models.Club(name=LOADTEST_CLUB, description="Created by load_test_checkin.py")
+            db.add(club)
+            db.commit()
+
+        user = db.query(models.User).filter(models.User.username == LOADTEST_USER).first()
+        if not user:
+            user = models.User(
+                username=LOADTEST_USER,
+                email=f"{LOADTEST_USER}@loadtest.example.com",
+                password_hash=security.get_password_hash(LOADTEST_PASSWORD),
+                full_name="Load Test Scanner",
+                role="organizer",
+                club_id=club.id
+            )
+            db.add(user)
+            db.commit()
+
+        event = models.Event(
+            club_id=club.id,
+            created_by=user.id,
+            name=f"Load Test {datetime.now().strftime('%Y%m%d %H%M%S')}",
+            date=datetime.now(timezone.utc) + timedelta(days=1),
+            venue="Main Gate"
+        )
+        db.add(event)
+        db.commit()
+
+        branches = ["CSE", "ECE", "EEE", "MECH", "CIVIL", "IT"]
+        rows = [
+            {
+                "event_id": event.id,
+                "name": f"Load Attendee {i}",
+                "email": f"load{event.id}_{i}@loadtest.example.com",
+                "roll_number": f"LT{event.id}{i:06d}",
+                "branch": branches[i % len(branches)],
+                "year": 1 + i % 4,
+                "section": "ABCD"[i % 4],
+                "checked_in": False
+            }
+            for i in range(attendee_count)
+        ]
+        ids = []
+        for start in range(0, len(rows), 1000):
+            ids.extend(db.execute(
+                insert(models.Attendee).returning(models.Attendee.id), rows[start:start + 1000]
+            ).scalars())
+
+        expire = event.date + timedelta(days=1)
+        tokens = {
+            attendee_id: utils.generate_compact_qr_token(event.id, attendee_id, expire)
+            for attendee_id in ids
+        }
+        db.execute(update(models.Attendee), [
+            {"id": attendee_id, "qr_token": token, "qr_generated": True}
+            for attendee_id, token in tokens.items()
+        ])
+        # Bulk statements bypass the ORM hooks that keep event_stats counted
+        rebuild_event_stats(db, [event.id])
+        db.commit()
+        return event.id, tokens
+    finally:
+        db.close()
+
+
+def build_scan_plan(event_id: int, tokens: dict, args) -> list:
+    """
+    Scan list of (kind, token): every attendee once plus duplicates, invalid and expired scans
+    """
+    from app import utils
+
+    rng = random.Random(args.seed)
+    attendee_tokens = list(tokens.values())
+    plan = [("first", token) for token in attendee_tokens]
+
+    extra = lambda rate: int(len(attendee_tokens) * rate)
+    plan += [("duplicate", rng.choice(attendee_tokens)) for _ in range(extra(args.duplicate_rate))]
+
+    for _ in range(extra(args.invalid_rate)):
+        token = rng.choice(attendee_tokens)
+        index = rng.randrange(len(utils.COMPACT_QR_PREFIX), len(token))
+        plan.append(("invalid", token[:index] + ("B" if token[index] == "A" else "A") + token[index + 1:]))
+
+    expired = datetime.now(timezone.utc) - timedelta(hours=1)
+    attendee_ids = list(tokens.keys())
+    plan += [
+        ("expired", utils.generate_compact_qr_token(event_id, rng.choice(attendee_ids), expired))
+        for _ in range(extra(args.expired_rate))
+    ]
+
+    rng.shuffle(plan)
+    return plan
+
+
+def classify(status_code: int, body: dict) -> str:
+    if status_code != 200:
+        return f"http_{status_code}"
+    if body.get("success"):
+        return "checked_in"
+    message = body.get("message", "").lower()
+    if "already checked in" in message:
+        return "already_checked_in"
+    if "locked" in message:
+        return "lock_error"
+    if "database error" in message:
+        return "db_error"
+    if "expired" in message:
+        return "expired"
+    if "invalid" in message:
+        return "invalid"
+    return "other"
+
+
+class LockSampler:
+    """
+    Samples waiting locks from pg_locks while the test runs (PostgreSQL only)
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples = 0
+        self.samples_with_waits = 0
+        self.max_waiting = 0
+        self.deadlocks = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        from app.database import engine
+        if engine.dialect.name != "postgresql":
+            return False
+        self._deadlocks_before = self._deadlocks()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return True
+
+    def _deadlocks(self) -> int:
+        from sqlalchemy import text
+        from app.database import engine
+        with engine.connect() as conn:
+            return conn.execute(text(
+                "SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()"
+            )).scalar() or 0
+
+    def _run(self):
+        from sqlalchemy import text
+        from app.database import engine
+        with engine.connect() as conn:
+            while not self._stop.is_set():
+                waiting = conn.execute(text("SELECT count(*) FROM pg_locks WHERE NOT granted")).scalar()
+                conn.rollback()
+                self.samples += 1
+                if waiting:
+                    self.samples_with_waits += 1
+                    self.max_waiting = max(self.max_waiting, waiting)
+                self._stop.wait(self.interval)
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self.deadlocks = self._deadlocks() - self._deadlocks_before
+
+
+def login(base_url: str) -> dict:
+    response = requests.post(
+        f"{base_url}/api/auth/login",
+        data={"username": LOADTEST_USER, "password": LOADTEST_PASSWORD},
+        timeout=30
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def run_scanners(base_url: str, headers: dict, plan: list, scanners: int):
+    """
+    Split the plan across M scanner threads, each with its own HTTP session
+    Returns (results, elapsed_seconds); results are (kind, outcome, latency_ms)
+    """
+    chunks = [plan[i::scanners] for i in range(scanners)]
+    start_barrier = threading.Barrier(scanners)
+
+    def scanner(chunk):
+        session = requests.Session()
+        session.headers.update(headers)
+        results = []
+        start_barrier.wait()
+        for kind, token in chunk:
+            started = time.perf_counter()
+            try:
+                response = session.post(f"{base_url}/api/checkin/scan", json={"qr_token": token}, timeout=60)
+                body = response.json() if response.status_code == 200 else {}
+                outcome = classify(response.status_code, body)
+            except requests.RequestException:
+                outcome = "connection_error"
+            results.append((kind, outcome, (time.perf_counter() - started) * 1000))
+        return results
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=scanners) as pool:
+        results = [result for chunk_results in pool.map(scanner, chunks) for result in chunk_results]
+    return results, time.perf_counter() - started
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(results: list, elapsed: float, sampler: LockSampler, sampling: bool, event_id: int, tokens: dict):
+    from app import models
+    from app.database import SessionLocal
+
+    latencies = [latency for _, _, latency in results]
+    outcomes = {}
+    for kind, outcome, _ in results:
+        outcomes.setdefault(kind, {}).setdefault(outcome, 0)
+        outcomes[kind][outcome] += 1
+
+    print("\n📊 Results")
+    print("=" * 50)
+    print(f"Scans:       {len(results)} in {elapsed:.2f}s")
+    print(f"Throughput:  {len(results) / elapsed:.1f} scans/s")
+    print(f"Latency:     p50 {percentile(latencies, 50):.1f} ms | p95 {percentile(latencies, 95):.1f} ms | "
+          f"p99 {percentile(latencies, 99):.1f} ms | max {max(latencies):.1f} ms | mean {statistics.mean(latencies):.1f} ms")
+
+    print("\nOutcomes by scan kind:")
+    for kind in ("first", "duplicate", "invalid", "expired"):
+        if kind in outcomes:
+            summary = ", ".join(f"{outcome}={count}" for outcome, count in sorted(outcomes[kind].items()))
+            print(f"   {kind:<10} {summary}")
+
+    lock_errors = sum(1 for _, outcome, _ in results if outcome == "lock_error")
+    print("\n🔒 Lock waits:")
+    if sampling:
+        print(f"   pg_locks samples with waiters: {sampler.samples_with_waits}/{sampler.samples} "
+              f"(max {sampler.max_waiting} waiting)")
+        print(f"   Deadlocks: {sampler.deadlocks}")
+    print(f"   Scans failed on a locked database: {lock_errors}")
+
+    # Every attendee must be checked in exactly once
+    db = SessionLocal()
+    try:
+        checked_in = db.query(models.Attendee).filter(
+            models.Attendee.event_id == event_id,
+            models.Attendee.checked_in == True
+        ).count()
+    finally:
+        db.close()
+    successes = sum(1 for _, outcome, _ in results if outcome == "checked_in")
+    consistent = checked_in == successes
+    print(f"\n{'✅' if consistent else '❌'} Consistency: {successes} successful scans, "
+          f"{checked_in}/{len(tokens)} attendees checked in")
+    return consistent
+
+
+def cleanup(event_id: int):
+    from app import models
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        db.query(models.Attendee).filter(models.Attendee.event_id == event_id).delete(synchronize_session=False)
+        db.query(models.Event).filter(models.Event.id == event_id).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    args = parse_args()
+
+    if args.sqlite:
+        # Must be configured before the app modules are imported
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(args.sqlite)}"
+        os.environ["ENVIRONMENT"] = "testing"
+        from app import models
+        from app.database import engine
+        models.Base.metadata.create_all(bind=engine)
+        base_url = start_local_server(args.sqlite)
+    else:
+        base_url = args.url.rstrip("/")
+
+    print("🚦 Gate Load Test")
+    print("=" * 50)
+    print(f"Target:      {base_url}{' (in-process, SQLite)' if args.sqlite else ''}")
+    print(f"Attendees:   {args.attendees}")
+    print(f"Scanners:    {args.scanners}")
+
+    seed_started = time.perf_counter()
+    event_id, tokens = seed_event(args.attendees)
+    plan = build_scan_plan(event_id, tokens, args)
+    print(f"Seeded event {event_id} in {time.perf_counter() - seed_started:.1f}s, {len(plan)} scans planned")
+
+    headers = login(base_url)
+    sampler = LockSampler()
+    sampling = sampler.start()
+    try:
+        results, elapsed = run_scanners(base_url, headers, plan, args.scanners)
+    finally:
+        sampler.stop()
+
+    consistent = report(results, elapsed, sampler, sampling, event_id, tokens)
+
+    if not args.keep:
+        cleanup(event_id)
+        print(f"🧹 Removed load test event {event_id}")
+
+    sys.exit(0 if consistent else 1)
+
+
+if __name__ == "__main__":
+    main()
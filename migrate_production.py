@@ -209,6 +209,29 @@ class ProductionMigrator:
             self._log("Data integrity check passed", "SUCCESS")
             return True
     
+    def apply_schema_updates(self):
+        """Apply pending versioned schema migrations (app/migrations)"""
+        self._log("Applying schema updates...")
+        
+        from sqlalchemy import URL, create_engine
+        from app import migrations
+        
+        if self.dry_run:
+            self._log(f"DRY RUN: Would upgrade the schema to version {migrations.head_version()}", "DRY_RUN")
+            return
+        
+        cfg = self.db_config
+        engine = create_engine(URL.create(
+            "postgresql", username=cfg['user'], password=cfg['password'],
+            host=cfg['host'], port=int(cfg['port']), database=cfg['database']
+        ))
+        try:
+            version = migrations.upgrade(engine, log=self._log)
+        finally:
+            engine.dispose()
+        
+        self._log(f"Schema updates applied (version {version})")
+    
     def migrate_payment_attendee_links(self):
         """Link payments to attendees based on email and event"""
         self._log("Linking payments to attendees...")
@@ -423,6 +446,7 @@ class ProductionMigrator:
                 return False
             
             # Perform migrations
+            self.apply_schema_updates()
             self.migrate_payment_attendee_links()
             self.fix_attendee_details_from_payments()
             
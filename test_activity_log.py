@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script for the background activity log writer
+Uses a throwaway SQLite database, no running server needed
+"""
+
+import os
+
+os.environ.setdefault("ENVIRONMENT", "testing")
+
+from app import models
+from app.activity_log import ActivityLogWriter, activity_row
+from conftest import memory_session_factory
+
+
+def count_rows(session_factory):
+    db = session_factory()
+    try:
+        return db.query(models.ActivityLog).count()
+    finally:
+        db.close()
+
+
+def test_writer_not_running_requests_sync_write(session_factory):
+    """Without a running writer thread the caller must write itself"""
+    print("🧪 Testing synchronous fallback...")
+    writer = ActivityLogWriter(session_factory, max_queue=10, flush_interval=60, batch_size=5)
+    assert writer.enqueue([activity_row(1, "login", "user", 1, "User logged in")]) is False
+    print("✅ enqueue() refused while stopped")
+
+
+def test_stop_flushes_pending_rows(session_factory):
+    """Rows queued before shutdown are written by stop()"""
+    print("🧪 Testing flush on shutdown...")
+    writer = ActivityLogWriter(session_factory, max_queue=100, flush_interval=60, batch_size=50)
+    writer.start()
+
+    for i in range(7):
+        assert writer.enqueue([activity_row(1, "checkin_scan", "attendee", i, f"Checked in #{i}")])
+    writer.stop()
+
+    assert count_rows(session_factory) == 7
+    stats = writer.stats()
+    assert stats["written"] == 7 and stats["queued"] == 0 and not stats["running"]
+    print(f"✅ {stats}")
+
+
+def test_full_queue_hands_back_remaining_rows(session_factory):
+    """A full queue keeps what it took and returns the rest to the caller"""
+    print("🧪 Testing bounded queue...")
+    writer = ActivityLogWriter(session_factory, max_queue=3, flush_interval=60, batch_size=50)
+    writer.start()
+
+    rows = [activity_row(1, "checkin_batch", "attendee", i, f"Checked in #{i}") for i in range(5)]
+    assert writer.enqueue(rows) is False
+    assert len(rows) == 2, "Only the rows that did not fit are handed back"
+    writer.stop()
+
+    assert count_rows(session_factory) == 3
+    assert writer.stats()["overflows"] == 1
+    print("✅ Overflow handled without losing rows")
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Activity Log Writer Tests")
+    print("=" * 50)
+    test_writer_not_running_requests_sync_write(memory_session_factory())
+    test_stop_flushes_pending_rows(memory_session_factory())
+    test_full_queue_hands_back_remaining_rows(memory_session_factory())
+    print("\n🎉 All activity log writer tests passed!")
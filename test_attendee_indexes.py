@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for the event-scoped attendee indexes
+Runs EXPLAIN QUERY PLAN for the hot attendee queries on a throwaway SQLite
+database and checks each one is answered from the intended index
+"""
+
+import os
+
+os.environ.setdefault("ENVIRONMENT", "testing")
+
+from sqlalchemy import func, insert, select
+
+from app import models
+from conftest import memory_engine
+
+Attendee = models.Attendee
+
+
+def make_engine():
+    """
+    Ten events of 300 attendees, mostly with QR codes and emails sent
+    """
+    engine = memory_engine()
+    with engine.begin() as conn:
+        conn.execute(insert(Attendee), [
+            {
+                "event_id": event_id, "name": f"Attendee {i}", "email": f"a{i}@example.com",
+                "roll_number": f"R{i:05d}", "branch": "CSE", "year": 1 + i % 4, "section": "A",
+                "qr_token": f"token-{event_id}-{i}" if i % 50 else None,
+                "email_sent": bool(i % 40), "checked_in": bool(i % 3)
+            }
+            for event_id in range(1, 11)
+            for i in range(300)
+        ])
+        conn.exec_driver_sql("ANALYZE")
+    return engine
+
+
+def query_plan(engine, statement) -> str:
+    compiled = statement.compile(engine)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+
+def assert_uses_index(engine, statement, index_name: str):
+    plan = query_plan(engine, statement)
+    assert f"INDEX {index_name} " in plan, f"expected {index_name}, got: {plan}"
+
+
+def test_dedupe_lookups_use_composite_indexes():
+    """Roll number and email lookups within an event"""
+    print("🧪 Testing dedupe lookups...")
+    engine = make_engine()
+    assert_uses_index(
+        engine,
+        select(Attendee.id).where(Attendee.event_id == 3, Attendee.roll_number == "R00042"),
+        "ix_attendees_event_roll_number"
+    )
+    assert_uses_index(
+        engine,
+        select(Attendee.id).where(Attendee.event_id == 3, Attendee.email == "a42@example.com"),
+        "ix_attendees_event_email"
+    )
+    print("✅ Dedupe lookups use (event_id, ...) indexes")
+
+
+def test_checkin_counts_use_composite_index():
+    """Checked-in counts per event"""
+    print("🧪 Testing check-in counts...")
+    engine = make_engine()
+    assert_uses_index(
+        engine,
+        select(func.count(Attendee.id)).where(Attendee.event_id == 3, Attendee.checked_in == True),
+        "ix_attendees_event_checked_in"
+    )
+    assert_uses_index(
+        engine,
+        select(Attendee.id).where(Attendee.event_id == 3, Attendee.checked_in == False),
+        "ix_attendees_event_checked_in"
+    )
+    print("✅ Check-in counts use (event_id, checked_in)")
+
+
+def test_work_queues_use_partial_indexes():
+    """Pending QR generation and pending emails"""
+    print("🧪 Testing work queues...")
+    engine = make_engine()
+    assert_uses_index(
+        engine,
+        select(Attendee).where(Attendee.event_id == 3, Attendee.qr_token.is_(None)),
+        "ix_attendees_event_pending_qr"
+    )
+    assert_uses_index(
+        engine,
+        select(Attendee).where(
+            Attendee.event_id == 3,
+            Attendee.qr_token.isnot(None),
+            Attendee.email_sent == False
+        ),
+        "ix_attendees_event_pending_email"
+    )
+    print("✅ Work queues use partial indexes")
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Attendee Index Tests")
+    print("=" * 50)
+    test_dedupe_lookups_use_composite_indexes()
+    test_checkin_counts_use_composite_index()
+    test_work_queues_use_partial_indexes()
+    print("\n🎉 All attendee index tests passed!")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script for the authenticated-user cache
+Calls the app through a TestClient on a throwaway SQLite database
+"""
+
+from conftest import api_session, auth_headers  # before app: points it at a throwaway database
+
+from app import models, security
+
+
+def add_organizer(db, club) -> models.User:
+    organizer = models.User(username="gate", email="gate@example.com", password_hash="x",
+                            role="organizer", club_id=club.id)
+    db.add(organizer)
+    db.commit()
+    return organizer
+
+
+def test_disabled_user_rejected_at_once(api):
+    """Disabling a user drops the cached principal: the next request is refused"""
+    print("🧪 Testing disabled user...")
+    client, db, admin, club, event = api
+    organizer = add_organizer(db, club)
+    headers = auth_headers(organizer)
+
+    assert client.get("/api/events", headers=headers).status_code == 200
+    assert security.auth_cache.get_principal("gate") is not None
+
+    response = client.delete(f"/api/admin/users/{organizer.id}", headers=auth_headers(admin))
+    assert response.status_code == 200, response.text
+    assert security.auth_cache.get_principal("gate") is None
+
+    response = client.get("/api/events", headers=headers)
+    assert response.status_code == 403 and response.json()["detail"] == "User account is disabled"
+    print("✅ Disabled user refused without waiting for the cache TTL")
+
+
+def test_reenabled_user_accepted_at_once(api):
+    """Re-enabling a user is seen on the next request as well"""
+    print("🧪 Testing re-enabled user...")
+    client, db, admin, club, event = api
+    organizer = add_organizer(db, club)
+    organizer.disabled = True
+    db.commit()
+    headers = auth_headers(organizer)
+
+    assert client.get("/api/events", headers=headers).status_code == 403
+    response = client.post(f"/api/admin/users/{organizer.id}/enable", headers=auth_headers(admin))
+    assert response.status_code == 200, response.text
+    assert client.get("/api/events", headers=headers).status_code == 200
+    print("✅ Re-enabled user accepted")
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Auth Cache Tests")
+    print("=" * 50)
+    test_disabled_user_rejected_at_once(api_session())
+    test_reenabled_user_accepted_at_once(api_session())
+    print("\n🎉 All auth cache tests passed!")
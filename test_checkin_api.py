@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Test script for the check-in endpoints
+Calls the app through a TestClient on a throwaway SQLite database
+"""
+
+from conftest import api_session, auth_headers  # before app: points it at a throwaway database
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import models, schemas, utils
+from app.checkin import atomic_checkin, scan_debouncer
+from app.database import SessionLocal
+from app.live import checkin_stream
+from app.roster import roster_cache
+
+
+def qr_token(attendee, event) -> str:
+    return utils.generate_qr_token(event.id, attendee.id, attendee.email, attendee.roll_number, event.date)
+
+
+def test_batch_results_carry_roster_attendee(api):
+    """Resolved batch results serialize the compact roster attendee"""
+    print("🧪 Testing batch result attendees...")
+    client, db, admin, club, event = api
+    attendee = db.query(models.Attendee).filter_by(event_id=event.id).first()
+
+    response = client.post("/api/checkin/batch", headers=auth_headers(admin),
+                           json={"scans": [{"qr_token": qr_token(attendee, event)}]})
+    assert response.status_code == 200, response.text
+    result = response.json()["results"][0]
+    assert result["status"] == "checked_in"
+    assert result["attendee"]["id"] == attendee.id and result["attendee"]["checked_in"]
+    print("✅ Batch results serialize")
+
+
+def test_batch_mixes_valid_duplicate_invalid_and_expired(api):
+    """Each scan gets its own status; only the first scan of a badge checks in"""
+    print("🧪 Testing mixed batch...")
+    client, db, admin, club, event = api
+    first, second, third = db.query(models.Attendee).filter_by(event_id=event.id).order_by(models.Attendee.id).all()
+    second.checked_in = True
+    second.checked_by = admin.id
+    second.checkin_time = datetime.now(timezone.utc)
+    db.commit()
+
+    expired = utils.generate_compact_qr_token(event.id, third.id, datetime.now(timezone.utc) - timedelta(minutes=1))
+    missing = utils.generate_compact_qr_token(event.id, 99999, datetime.now(timezone.utc) + timedelta(days=1))
+    now = datetime.now(timezone.utc)
+    scans = [
+        {"qr_token": qr_token(first, event), "scanned_at": (now - timedelta(minutes=5)).isoformat(), "device_id": "gate-1"},
+        {"qr_token": qr_token(first, event), "scanned_at": now.isoformat(), "device_id": "gate-2"},
+        {"qr_token": qr_token(second, event)},
+        {"qr_token": "not-a-token"},
+        {"qr_token": expired},
+        {"qr_token": missing},
+    ]
+    response = client.post("/api/checkin/batch", headers=auth_headers(admin), json={"scans": scans})
+    assert response.status_code == 200, response.text
+    body = response.json()
+
+    assert [result["status"] for result in body["results"]] == [
+        "checked_in", "duplicate", "already_checked_in", "invalid", "expired", "not_found"
+    ]
+    assert [result["index"] for result in body["results"]] == list(range(6))
+    assert body["results"][1]["device_id"] == "gate-2"
+    assert (body["total"], body["checked_in"], body["already_checked_in"], body["failed"]) == (6, 1, 2, 3)
+
+    db.expire_all()
+    assert db.get(models.Attendee, first.id).checked_in
+    assert not db.get(models.Attendee, third.id).checked_in
+    print("✅ Mixed batch answered per scan")
+
+
+def test_batch_saves_nothing_when_response_fails(api, monkeypatch):
+    """A response that can't be built rolls the check-ins back"""
+    print("🧪 Testing batch rollback...")
+    client, db, admin, club, event = api
+    attendee = db.query(models.Attendee).filter_by(event_id=event.id).first()
+
+    def broken_response(**fields):
+        raise ValueError("response does not validate")
+    monkeypatch.setattr(schemas, "BatchCheckInResponse", broken_response)
+
+    response = client.post("/api/checkin/batch", headers=auth_headers(admin),
+                           json={"scans": [{"qr_token": qr_token(attendee, event)}]})
+    assert response.status_code == 500
+    db.expire_all()
+    assert not db.get(models.Attendee, attendee.id).checked_in
+    assert db.get(models.EventStats, event.id).checked_in == 0
+    print("✅ Failed batch left no check-ins behind")
+
+
+
+def test_payment_fix_refreshes_cached_roster(api):
+    """Attendee details fixed from payments show up in scans of a warm roster"""
+    print("🧪 Testing roster cache after a payment fix...")
+    client, db, admin, club, event = api
+    attendee = db.query(models.Attendee).filter_by(event_id=event.id).order_by(models.Attendee.id).first()
+    headers = auth_headers(admin)
+
+    assert client.post(f"/api/events/{event.id}/roster/warm", headers=headers).status_code == 200
+    assert roster_cache.get(db, event.id).entries[attendee.id].section == "A"
+
+    db.add(models.Payment(
+        event_id=event.id, razorpay_payment_id="pay_fix_1", amount=10000, status="captured",
+        customer_name=attendee.name, customer_email=attendee.email,
+        form_data=json.dumps({"original_notes": {"email": attendee.email, "year_of_study": "2nd", "section": "B"}})
+    ))
+    db.commit()
+    response = client.post("/api/payments/fix-attendee-details", headers=headers)
+    assert response.status_code == 200 and response.json()["updated_count"] == 1, response.text
+
+    # Read the cached entry itself: a successful check-in would overwrite it with the stored row
+    entry = roster_cache.get(db, event.id).entries[attendee.id]
+    assert (entry.year, entry.section) == (2, "B")
+    print("✅ Scans see the fixed details")
+
+def test_live_stream_sends_snapshot_then_checkins(api):
+    """Dashboards get the counters first, then one delta per check-in"""
+    print("🧪 Testing live check-in stream...")
+    client, db, admin, club, event = api
+    attendee = db.query(models.Attendee).filter_by(event_id=event.id).order_by(models.Attendee.id).first()
+    token = auth_headers(admin)["Authorization"].split()[1]
+
+    with client.websocket_connect(f"/api/events/{event.id}/live/ws?token={token}") as websocket:
+        snapshot = websocket.receive_json()
+        assert snapshot["type"] == "snapshot"
+        assert snapshot["counters"][""] == {"total": 3, "checked_in": 0}
+
+        response = client.post("/api/checkin/scan", json={"qr_token": qr_token(attendee, event)},
+                               headers=auth_headers(admin))
+        assert response.json()["success"], response.text
+
+        message = websocket.receive_json()
+        assert message["type"] == "checkin" and message["attendee_id"] == attendee.id
+        assert message["source"] == "scan" and message["section_path"] == ["CSE", "1", "A"]
+        assert message["counters"]["event"] == {"total": 3, "checked_in": 1}
+    assert not checkin_stream.has_subscribers(event.id)
+    print("✅ Live stream delivered the check-in")
+
+def test_repeat_scans_debounced_within_window(api):
+    """Repeats inside the event's debounce window reuse the first answer, later ones are processed"""
+    print("🧪 Testing scan debounce window...")
+    client, db, admin, club, event = api
+    event.scan_debounce_seconds = 1
+    db.commit()
+    attendee = db.query(models.Attendee).filter_by(event_id=event.id).first()
+    token, headers = qr_token(attendee, event), auth_headers(admin)
+
+    def scan():
+        return client.post("/api/checkin/scan", json={"qr_token": token}, headers=headers).json()
+
+    assert scan()["success"]
+    absorbed = scan_debouncer.stats()["absorbed"]
+
+    repeat = scan()
+    assert not repeat["success"] and "already checked in" in repeat["message"]
+    assert scan_debouncer.stats()["absorbed"] == absorbed + 1
+
+    time.sleep(1.2)
+    late = scan()
+    assert not late["success"] and "already checked in" in late["message"]
+    assert scan_debouncer.stats()["absorbed"] == absorbed + 1, "Scans after the window must be processed"
+    print("✅ Debounce window respected")
+
+def test_racing_checkins_succeed_once(api):
+    """A second check-in that starts before the first commits must lose"""
+    print("🧪 Testing racing check-ins...")
+    client, db, admin, club, event = api
+    attendee_id = db.query(models.Attendee.id).filter_by(event_id=event.id).first()[0]
+    admin_id, event_id = admin.id, event.id
+    first_written = threading.Event()
+    results = {}
+
+    def scan(name, before=None, after=None):
+        session = SessionLocal()
+        try:
+            if before:
+                before.wait(5)
+            results[name] = atomic_checkin(session, attendee_id, admin_id, datetime.now(timezone.utc), event_id)
+            if after:
+                after.set()
+                # Keep the transaction open while the other scan runs into it
+                threading.Event().wait(0.2)
+            session.commit()
+        finally:
+            session.close()
+
+    threads = [
+        threading.Thread(target=scan, args=("first",), kwargs={"after": first_written}),
+        threading.Thread(target=scan, args=("second",), kwargs={"before": first_written}),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results["first"].checked_in_now and not results["second"].checked_in_now
+    assert results["second"].found and results["second"].attendee.checked_in
+    db.expire_all()
+    assert db.get(models.EventStats, event_id).checked_in == 1
+    print("✅ Exactly one check-in won")
+
+
+def test_simultaneous_scans_succeed_once(api):
+    """Two gates scanning the same badge at once: one success, one already checked in"""
+    print("🧪 Testing simultaneous scans...")
+    client, db, admin, club, event = api
+    attendee = db.query(models.Attendee).filter_by(event_id=event.id).first()
+    token, headers = qr_token(attendee, event), auth_headers(admin)
+    start = threading.Barrier(2)
+    bodies = []
+
+    def scan():
+        start.wait(5)
+        bodies.append(client.post("/api/checkin/scan", json={"qr_token": token}, headers=headers).json())
+
+    threads = [threading.Thread(target=scan) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(body["success"] for body in bodies) == [False, True], bodies
+    assert "already checked in" in next(body for body in bodies if not body["success"])["message"]
+    db.expire_all()
+    assert db.get(models.EventStats, event.id).checked_in == 1
+    print("✅ Exactly one scan checked in")
+
+if __name__ == "__main__":
+    print("🚀 Starting Check-in API Tests")
+    print("=" * 50)
+    test_batch_results_carry_roster_attendee(api_session())
+    test_batch_mixes_valid_duplicate_invalid_and_expired(api_session())
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_batch_saves_nothing_when_response_fails(api_session(), monkeypatch)
+    test_payment_fix_refreshes_cached_roster(api_session())
+    test_live_stream_sends_snapshot_then_checkins(api_session())
+    test_repeat_scans_debounced_within_window(api_session())
+    test_racing_checkins_succeed_once(api_session())
+    test_simultaneous_scans_succeed_once(api_session())
+    print("\n🎉 All check-in API tests passed!")
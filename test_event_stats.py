@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Test script for the precomputed event_stats counters
+Writes attendees through the ORM and the Core check-in primitives on a
+throwaway SQLite database and compares the counters with a fresh recount
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("ENVIRONMENT", "testing")
+
+from sqlalchemy import event as sa_event
+
+from app import models
+from app.checkin import atomic_checkin, batch_checkin
+from app.event_stats import COUNTERS, rebuild_event_stats, recount_statement
+from conftest import seeded_session
+
+
+def add_attendees(db, event, count: int) -> list:
+    attendees = [
+        models.Attendee(event_id=event.id, name=f"Attendee {i}", email=f"a{i}@example.com",
+                        roll_number=f"R{i}", branch="CSE", year=1, section="A")
+        for i in range(count)
+    ]
+    db.add_all(attendees)
+    db.commit()
+    return attendees
+
+
+def assert_counters_match(db, event_id: int) -> dict:
+    db.expire_all()
+    stats = db.get(models.EventStats, event_id)
+    recount = db.execute(recount_statement([event_id])).first()
+    stored = {name: getattr(stats, name) for name in COUNTERS}
+    expected = {name: getattr(recount, name) if recount else 0 for name in COUNTERS}
+    assert stored == expected, f"stored {stored} != recount {expected}"
+    return stored
+
+
+def test_orm_writes_update_counters(seeded):
+    """Inserts, attribute changes (also on expired instances) and deletes"""
+    print("🧪 Testing ORM writes...")
+    db, user, club, event = seeded
+    assert assert_counters_match(db, event.id)["total"] == 0
+
+    attendees = add_attendees(db, event, 5)
+    assert assert_counters_match(db, event.id)["total"] == 5
+
+    # Instances are expired after commit: old values must still be seen
+    attendees[0].qr_generated = True
+    attendees[1].qr_generated = True
+    attendees[1].email_error = "SMTP timeout"
+    db.commit()
+    attendees[1].email_error = None
+    attendees[1].email_sent = True
+    attendees[0].qr_generated = True  # unchanged value
+    db.commit()
+    counts = assert_counters_match(db, event.id)
+    assert counts["qr_generated"] == 2 and counts["email_sent"] == 1 and counts["email_failed"] == 0
+
+    db.delete(attendees[1])
+    db.commit()
+    counts = assert_counters_match(db, event.id)
+    assert counts["total"] == 4 and counts["email_sent"] == 0
+    print("✅ ORM writes keep counters in step")
+
+
+def test_checkin_primitives_update_counters(seeded):
+    """Core check-in UPDATEs bump checked_in only for real transitions"""
+    print("🧪 Testing check-in primitives...")
+    db, user, club, event = seeded
+    attendees = add_attendees(db, event, 6)
+    now = datetime.now(timezone.utc)
+
+    assert atomic_checkin(db, attendees[0].id, user.id, now).checked_in_now
+    assert not atomic_checkin(db, attendees[0].id, user.id, now).checked_in_now
+    db.commit()
+    assert assert_counters_match(db, event.id)["checked_in"] == 1
+
+    rows = batch_checkin(db, {attendee.id: now for attendee in attendees[:4]}, user.id, event.id)
+    db.commit()
+    assert len(rows) == 3
+    assert assert_counters_match(db, event.id)["checked_in"] == 4
+
+    # A rolled back check-in leaves the counters alone
+    atomic_checkin(db, attendees[5].id, user.id, now)
+    db.rollback()
+    assert assert_counters_match(db, event.id)["checked_in"] == 4
+    print("✅ Check-ins counted once")
+
+
+def test_changed_attendees_stamped_with_version(seeded):
+    """ORM writes and check-ins record the event version on the rows they change"""
+    print("🧪 Testing roster versions...")
+    db, user, club, event = seeded
+    attendees = add_attendees(db, event, 3)
+    first = db.get(models.EventStats, event.id).version
+    assert all(attendee.roster_version == first for attendee in attendees)
+
+    attendees[1].name = "Renamed"
+    db.commit()
+    atomic_checkin(db, attendees[2].id, user.id, datetime.now(timezone.utc))
+    db.commit()
+    db.expire_all()
+    versions = [attendee.roster_version for attendee in attendees]
+    assert versions[0] == first < versions[1] < versions[2] == db.get(models.EventStats, event.id).version
+    print("✅ Changed rows carry the event version")
+
+
+def test_checkin_bumps_stats_before_writing_attendee(seeded):
+    """One stats UPDATE, then one attendee UPDATE that carries the version"""
+    print("🧪 Testing check-in statement order...")
+    db, user, club, event = seeded
+    attendee = add_attendees(db, event, 1)[0]
+
+    attendee_id, user_id, event_id = attendee.id, user.id, event.id
+
+    statements = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[1])
+    engine = db.get_bind()
+    sa_event.listen(engine, "before_cursor_execute", capture)
+    try:
+        assert atomic_checkin(db, attendee_id, user_id, datetime.now(timezone.utc), event_id).checked_in_now
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", capture)
+    db.commit()
+
+    assert statements == ["event_stats", "attendees"], statements
+    db.expire_all()
+    assert attendee.roster_version == db.get(models.EventStats, event.id).version
+    print("✅ Stats row locked first, attendee written once")
+
+
+def test_attendees_flushed_with_new_event(seeded):
+    """Attendees of an event created in the same flush are counted too"""
+    print("🧪 Testing attendees of a new event...")
+    db, user, club, event = seeded
+    new_event = models.Event(club_id=club.id, created_by=user.id, name="Second Event",
+                             date=datetime.now(timezone.utc) + timedelta(days=2))
+    new_event.attendees = [
+        models.Attendee(name=f"Attendee {i}", email=f"n{i}@example.com", roll_number=f"N{i}",
+                        branch="CSE", year=1, section="A", qr_generated=bool(i))
+        for i in range(2)
+    ]
+    db.add(new_event)
+    db.commit()
+    counts = assert_counters_match(db, new_event.id)
+    assert counts["total"] == 2 and counts["qr_generated"] == 1
+    print("✅ New event counted with its attendees")
+
+
+def test_event_lifecycle_and_rebuild(seeded):
+    """Stats rows follow events; rebuild repairs drifted counters"""
+    print("🧪 Testing event lifecycle...")
+    db, user, club, event = seeded
+    add_attendees(db, event, 3)
+
+    db.get(models.EventStats, event.id).total = 99
+    db.commit()
+    version = db.get(models.EventStats, event.id).version
+    assert rebuild_event_stats(db) == 1
+    db.commit()
+    assert assert_counters_match(db, event.id)["total"] == 3
+    assert db.get(models.EventStats, event.id).version > version, "Rebuild must not reuse versions"
+
+    event_id = event.id
+    db.delete(event)
+    db.commit()
+    assert db.get(models.EventStats, event_id) is None
+    print("✅ Stats rows created, repaired and removed with events")
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Event Stats Tests")
+    print("=" * 50)
+    test_orm_writes_update_counters(seeded_session())
+    test_checkin_primitives_update_counters(seeded_session())
+    test_changed_attendees_stamped_with_version(seeded_session())
+    test_checkin_bumps_stats_before_writing_attendee(seeded_session())
+    test_attendees_flushed_with_new_event(seeded_session())
+    test_event_lifecycle_and_rebuild(seeded_session())
+    print("\n🎉 All event stats tests passed!")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script for the streamed attendee exports (app/exports.py)
+Runs the export query on a throwaway SQLite database
+"""
+
+import os
+from datetime import datetime
+
+os.environ.setdefault("ENVIRONMENT", "testing")
+
+from openpyxl import Workbook
+
+from app import models
+from app.exports import EXPORT_COLUMNS, export_query, export_row, sheet_title, xlsx_row
+from conftest import seeded_session
+
+
+def test_export_rows_sorted_and_formatted(seeded):
+    """Rows come back in branch/year/section/name order with display values"""
+    print("🧪 Testing export rows...")
+    db, user, club, event = seeded
+    people = [
+        ("Zed", "ECE", 1, "A"), ("Amy", "CSE", 2, "B"), ("Bob", "CSE", 1, "B"), ("Ann", "CSE", 1, "B")
+    ]
+    for i, (name, branch, year, section) in enumerate(people):
+        db.add(models.Attendee(event_id=event.id, name=name, email=f"{name.lower()}@example.com",
+                               roll_number=f"R{i}", branch=branch, year=year, section=section))
+    db.commit()
+    ann = db.query(models.Attendee).filter_by(name="Ann").one()
+    ann.checked_in = True
+    ann.checked_by = user.id
+    ann.checkin_time = datetime(2026, 3, 1, 14, 5)
+    ann.email_error = "Mailbox full"
+    db.commit()
+
+    rows = [export_row(row) for row in db.execute(export_query(event.id))]
+    assert [row[0] for row in rows] == ["Ann", "Bob", "Amy", "Zed"]
+    assert all(len(row) == len(EXPORT_COLUMNS) for row in rows)
+    assert rows[0][8:] == ["Yes", "2026-03-01 02:05 PM", user.username, "No", "No", "Mailbox full"]
+    assert rows[1][6] == "" and rows[1][8:] == ["No", "", "", "No", "No", ""]
+    print("✅ Export rows sorted and formatted")
+
+
+def test_xlsx_sheet_titles_and_cells():
+    """Sheet titles are Excel-safe and unique; "=" text is not a formula"""
+    print("🧪 Testing XLSX helpers...")
+    used = set()
+    titles = [sheet_title(name, used) for name in ["CSE 1/A", "cse 1-a", "x" * 40, "x" * 40]]
+    assert titles == ["CSE 1-A", "cse 1-a (2)", "x" * 31, "x" * 27 + " (2)"]
+
+    worksheet = Workbook(write_only=True).create_sheet("Attendees")
+    cells = xlsx_row(worksheet, ["=1+1", "Ann", 2])
+    assert cells[0].data_type == "s" and cells[0].value == "=1+1"
+    assert cells[1:] == ["Ann", 2]
+    print("✅ XLSX helpers behave")
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Export Tests")
+    print("=" * 50)
+    test_export_rows_sorted_and_formatted(seeded_session())
+    test_xlsx_sheet_titles_and_cells()
+    print("\n🎉 All export tests passed!")
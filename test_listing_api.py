@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the event and attendee list endpoints
+Calls the app through a TestClient on a throwaway SQLite database
+"""
+
+from conftest import api_session, auth_headers  # before app: points it at a throwaway database
+
+from datetime import datetime, timedelta, timezone
+
+from app import models
+
+
+def test_attendee_list_pages_only_on_request(api):
+    """Without limit/cursor every attendee comes back; with them, pages and X-Next-Cursor"""
+    print("🧪 Testing attendee list paging...")
+    client, db, admin, club, event = api
+    db.add_all([
+        models.Attendee(event_id=event.id, name=f"Extra {i}", email=f"extra{i}@example.com",
+                        roll_number=f"X{i}", branch="ECE", year=2, section="B")
+        for i in range(600)
+    ])
+    db.commit()
+    url = f"/api/events/{event.id}/attendees"
+
+    response = client.get(url, headers=auth_headers(admin))
+    assert response.status_code == 200
+    ids = [attendee["id"] for attendee in response.json()]
+    assert len(ids) == 603 and ids == sorted(ids)
+    assert "X-Next-Cursor" not in response.headers
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 250} if cursor is None else {"limit": 250, "cursor": cursor}
+        response = client.get(url, headers=auth_headers(admin), params=params)
+        pages.append([attendee["id"] for attendee in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert [len(page) for page in pages] == [250, 250, 103]
+    assert sum(pages, []) == ids
+    print("✅ Attendee list pages only when asked")
+
+
+def test_event_list_pages_only_on_request(api):
+    """Without limit/cursor every event comes back in creation order"""
+    print("🧪 Testing event list paging...")
+    client, db, admin, club, event = api
+    admin.club_id = club.id
+    now = datetime.now(timezone.utc)
+    db.add_all([
+        models.Event(club_id=club.id, created_by=admin.id, name=f"Event {i}", date=now + timedelta(days=(i * 7) % 150))
+        for i in range(150)
+    ])
+    db.commit()
+
+    for url in ("/api/events", "/api/club/events"):
+        response = client.get(url, headers=auth_headers(admin))
+        assert response.status_code == 200, response.text
+        ids = [item["id"] for item in response.json()]
+        assert len(ids) == 151 and ids == sorted(ids)
+        assert "X-Next-Cursor" not in response.headers
+
+    response = client.get("/api/events", headers=auth_headers(admin), params={"limit": 100})
+    dates = [item["date"] for item in response.json()]
+    assert len(dates) == 100 and dates == sorted(dates, reverse=True)
+    response = client.get("/api/events", headers=auth_headers(admin), params={"cursor": response.headers["X-Next-Cursor"]})
+    assert len(response.json()) == 51 and "X-Next-Cursor" not in response.headers
+    print("✅ Event list pages only when asked")
+
+
+def test_dashboard_section_year_is_int(api):
+    """The section endpoint echoes year as the integer it filters on"""
+    print("🧪 Testing dashboard section...")
+    client, db, admin, club, event = api
+    response = client.get(f"/api/events/{event.id}/dashboard/section", headers=auth_headers(admin),
+                          params={"branch": "CSE", "year": 1, "section": "A"})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["year"] == 1 and body["total"] == 3
+    print("✅ Section year is an int")
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Listing API Tests")
+    print("=" * 50)
+    test_attendee_list_pages_only_on_request(api_session())
+    test_event_list_pages_only_on_request(api_session())
+    test_dashboard_section_year_is_int(api_session())
+    print("\n🎉 All listing API tests passed!")
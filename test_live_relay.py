@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test script for relaying live check-ins between workers
+The Redis relay is exercised with an in-memory stand-in for pub/sub
+"""
+
+import os
+import asyncio
+
+os.environ.setdefault("ENVIRONMENT", "testing")
+
+from app.live import RedisCheckInRelay
+
+
+class FakePubSub:
+    """Pattern subscription fed by FakeRedis.publish"""
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.queue = asyncio.Queue()
+        self.pattern = None
+
+    async def psubscribe(self, pattern):
+        if not self.broker.available:
+            raise ConnectionError("Redis unavailable")
+        self.pattern = pattern
+        self.broker.subscribers.append(self)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self):
+        if self in self.broker.subscribers:
+            self.broker.subscribers.remove(self)
+
+
+class FakeRedis:
+    """Implements the pub/sub calls the relay uses"""
+
+    def __init__(self):
+        self.subscribers = []
+        self.available = True
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    async def publish(self, channel, data):
+        if not self.available:
+            raise ConnectionError("Redis unavailable")
+        for subscriber in self.subscribers:
+            if channel.startswith(subscriber.pattern.rstrip("*")):
+                subscriber.queue.put_nowait({"type": "pmessage", "channel": channel.encode("utf-8"), "data": data})
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_check_ins_reach_every_worker():
+    """A check-in sent on one worker is delivered on all of them, once"""
+    print("🧪 Testing relayed check-ins...")
+
+    async def run():
+        client = FakeRedis()
+        delivered = {"a": [], "b": []}
+        worker_a = RedisCheckInRelay(client, lambda event_id, message: delivered["a"].append((event_id, message)))
+        worker_b = RedisCheckInRelay(client, lambda event_id, message: delivered["b"].append((event_id, message)))
+        worker_a.start()
+        worker_b.start()
+        await settle()
+        assert worker_a.connected and worker_b.connected
+
+        worker_a.send(7, {"type": "checkin", "attendee_id": 1})
+        await settle()
+        await worker_a.stop()
+        await worker_b.stop()
+        return delivered, worker_a.stats()
+
+    delivered, stats = asyncio.run(run())
+    assert delivered["a"] == delivered["b"] == [(7, {"type": "checkin", "attendee_id": 1})]
+    assert stats["relayed"] == 1 and stats["received"] == 1
+    print("✅ Check-in delivered on both workers")
+
+
+def test_redis_outage_delivers_locally():
+    """Without Redis a worker's own dashboards still get its check-ins"""
+    print("🧪 Testing Redis outage...")
+
+    async def run():
+        client = FakeRedis()
+        client.available = False
+        delivered = []
+        relay = RedisCheckInRelay(client, lambda event_id, message: delivered.append(event_id), retry_seconds=60)
+        relay.start()
+        await settle()
+        relay.send(7, {"type": "checkin", "attendee_id": 1})
+        await relay.stop()
+        return delivered, relay.stats()
+
+    delivered, stats = asyncio.run(run())
+    assert delivered == [7]
+    assert not stats["connected"] and stats["errors"] == 1
+    print("✅ Check-in delivered locally")
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Live Relay Tests")
+    print("=" * 50)
+    test_check_ins_reach_every_worker()
+    test_redis_outage_delivers_locally()
+    print("\n🎉 All live relay tests passed!")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for QR token formats
+Checks that compact tokens round-trip, that legacy JWT tokens are still
+accepted, and that tampered or expired tokens are rejected
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from app import utils
+from app.config import settings
+
+
+def test_compact_token_roundtrip():
+    """Compact tokens decode to the same ids"""
+    print("🧪 Testing compact token round trip...")
+    expire = datetime.now(timezone.utc) + timedelta(days=2)
+    token = utils.generate_compact_qr_token(event_id=7, attendee_id=4242, expire=expire)
+
+    payload = utils.verify_qr_token(token)
+    assert payload["event_id"] == 7
+    assert payload["attendee_id"] == 4242
+    assert token.isalnum() and token.isupper(), "Compact token must stay in the QR alphanumeric charset"
+    print(f"✅ {token} ({len(token)} chars)")
+
+
+def test_legacy_jwt_token_still_accepted():
+    """Tokens issued before the compact format keep working"""
+    print("🧪 Testing legacy JWT token...")
+    original_format = settings.QR_TOKEN_FORMAT
+    try:
+        settings.QR_TOKEN_FORMAT = "jwt"
+        token = utils.generate_qr_token(
+            event_id=3, attendee_id=99, email="student@college.edu",
+            roll_number="21BCE001", event_date=datetime.now(timezone.utc) + timedelta(days=1)
+        )
+    finally:
+        settings.QR_TOKEN_FORMAT = original_format
+
+    payload = utils.verify_qr_token(token)
+    assert payload["event_id"] == 3
+    assert payload["attendee_id"] == 99
+    print("✅ Legacy JWT token accepted")
+
+
+def test_tampered_compact_token_rejected():
+    """Changing any character invalidates the MAC"""
+    print("🧪 Testing tampered compact token...")
+    expire = datetime.now(timezone.utc) + timedelta(days=2)
+    token = utils.generate_compact_qr_token(event_id=7, attendee_id=4242, expire=expire)
+    index = len(utils.COMPACT_QR_PREFIX) + 5
+    tampered = token[:index] + ("B" if token[index] == "A" else "A") + token[index + 1:]
+
+    try:
+        utils.verify_qr_token(tampered)
+    except ValueError as e:
+        assert "invalid" in str(e).lower()
+        print(f"✅ Rejected: {e}")
+        return
+    raise AssertionError("Tampered token was accepted")
+
+
+def test_expired_compact_token_rejected():
+    """Expired compact tokens report 'expired' like expired JWTs do"""
+    print("🧪 Testing expired compact token...")
+    expire = datetime.now(timezone.utc) - timedelta(hours=1)
+    token = utils.generate_compact_qr_token(event_id=7, attendee_id=4242, expire=expire)
+
+    try:
+        utils.verify_qr_token(token)
+    except ValueError as e:
+        assert "expired" in str(e).lower()
+        print(f"✅ Rejected: {e}")
+        return
+    raise AssertionError("Expired token was accepted")
+
+
+def test_verified_token_cache():
+    """Repeat verifications hit the cache, expired entries are never served"""
+    print("🧪 Testing verified token cache...")
+    cache = utils.VerifiedTokenCache(maxsize=2)
+    now = datetime.now(timezone.utc).timestamp()
+
+    cache.put("live", {"attendee_id": 1, "exp": now + 60})
+    cache.put("stale", {"attendee_id": 2, "exp": now - 1})
+    assert cache.get("live")["attendee_id"] == 1
+    assert cache.get("stale") is None
+
+    cache.put("a", {"attendee_id": 3, "exp": now + 60})
+    cache.put("b", {"attendee_id": 4, "exp": now + 60})
+    assert cache.get("live") is None, "Least recently used entry should be evicted"
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["expired"] == 1
+    print(f"✅ Cache stats: {stats}")
+
+
+if __name__ == "__main__":
+    print("🚀 Starting QR Token Tests")
+    print("=" * 50)
+    test_compact_token_roundtrip()
+    test_legacy_jwt_token_still_accepted()
+    test_tampered_compact_token_rejected()
+    test_expired_compact_token_rejected()
+    test_verified_token_cache()
+    print("\n🎉 All QR token tests passed!")
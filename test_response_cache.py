@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for the versioned response cache
+Checks that writes bump event_stats.version on a throwaway SQLite database,
+and the cache / ETag helpers in app/response_cache.py
+"""
+
+import os
+from datetime import datetime, timezone
+
+os.environ.setdefault("ENVIRONMENT", "testing")
+
+from app import models
+from app.checkin import atomic_checkin
+from app.response_cache import ResponseCache, etag_matches, make_etag
+from conftest import seeded_session
+
+
+def add_attendee(db, event):
+    attendee = models.Attendee(event_id=event.id, name="Attendee", email="a@example.com",
+                               roll_number="R1", branch="CSE", year=1, section="A")
+    db.add(attendee)
+    db.commit()
+    return attendee
+
+
+def version(db, event_id: int) -> int:
+    db.expire_all()
+    return db.get(models.EventStats, event_id).version
+
+
+def test_writes_bump_event_version(seeded):
+    """Attendee, check-in, event, payment and name changes move the version"""
+    print("🧪 Testing version bumps...")
+    db, user, club, event = seeded
+    attendee = add_attendee(db, event)
+    seen = [version(db, event.id)]
+
+    def assert_bumped(what: str):
+        current = version(db, event.id)
+        assert current > seen[-1], f"{what} did not bump the version"
+        seen.append(current)
+
+    attendee.phone = "9000000000"
+    db.commit()
+    assert_bumped("attendee edit")
+
+    atomic_checkin(db, attendee.id, user.id, datetime.now(timezone.utc))
+    db.commit()
+    assert_bumped("check-in")
+
+    event.venue = "Main Hall"
+    db.commit()
+    assert_bumped("event edit")
+
+    db.add(models.Payment(event_id=event.id, razorpay_payment_id="pay_1", amount=100,
+                          status="captured", customer_name="Attendee", customer_email="a@example.com"))
+    db.commit()
+    assert_bumped("payment")
+
+    club.name = "Renamed Club"
+    db.commit()
+    assert_bumped("club rename")
+
+    user.last_login = datetime.now(timezone.utc)
+    db.commit()
+    assert_bumped("creator change")
+
+    # Reads leave it alone
+    db.query(models.Attendee).all()
+    db.commit()
+    assert version(db, event.id) == seen[-1]
+    print("✅ Version follows every response-visible write")
+
+
+def test_cache_and_etags():
+    """Entries are served only at their version and evicted by size"""
+    print("🧪 Testing cache entries and ETags...")
+    cache = ResponseCache(maxsize=2, max_bytes=10)
+    key = ("/api/events/1/dashboard", ())
+
+    cache.put(key, 1, b"12345", {})
+    assert cache.get(key, 1) == (b"12345", {})
+    assert cache.get(key, 2) is None
+
+    cache.put(("other", ()), 1, b"123456", {})
+    assert cache.get(key, 1) is None  # evicted: over max_bytes
+    cache.put(("huge", ()), 1, b"x" * 11, {})
+    assert cache.stats()["entries"] == 1
+
+    etag = make_etag(key, 3)
+    assert etag == make_etag(key, 3) and etag != make_etag(key, 4)
+    assert etag_matches(f'W/{etag}, "other"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(make_etag(key, 2), etag)
+    assert not etag_matches(None, etag)
+    print("✅ Cache and ETags behave")
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Response Cache Tests")
+    print("=" * 50)
+    test_writes_bump_event_version(seeded_session())
+    test_cache_and_etags()
+    print("\n🎉 All response cache tests passed!")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline roster snapshot and delta endpoints
+Runs against the app on a throwaway SQLite database
+"""
+
+import pytest
+
+from conftest import api_session, auth_headers  # before app: points it at a test database
+from app.config import settings
+
+
+def test_roster_refused_without_signing_key(api, monkeypatch):
+    """Unsigned rosters are never served"""
+    print("🧪 Testing roster without a signing key...")
+    client, db, admin, club, event = api
+    monkeypatch.setattr(settings, "ROSTER_SNAPSHOT_SECRET", "")
+
+    response = client.get(f"/api/events/{event.id}/roster/snapshot", headers=auth_headers(admin))
+    assert response.status_code == 503, response.text
+    print("✅ Roster refused while ROSTER_SNAPSHOT_SECRET is unset")
+
+
+def test_delta_lists_removed_attendees(api, monkeypatch):
+    """Attendees deleted after the snapshot come back as tombstones"""
+    print("🧪 Testing roster delta tombstones...")
+    client, db, admin, club, event = api
+    monkeypatch.setattr(settings, "ROSTER_SNAPSHOT_SECRET", "test-key")
+    headers = auth_headers(admin)
+
+    snapshot = client.get(f"/api/events/{event.id}/roster/snapshot", headers=headers).json()
+    assert snapshot["count"] == 3 and snapshot["signature"]
+
+    removed, renamed = event.attendees[0], event.attendees[1]
+    removed_id, renamed_id = removed.id, renamed.id
+    db.delete(removed)
+    renamed.name = "Renamed"
+    db.commit()
+
+    delta = client.get(
+        f"/api/events/{event.id}/roster/delta", params={"since": snapshot["version"]}, headers=headers
+    ).json()
+    assert delta["deleted"] == [removed_id], delta
+    assert [row[1] for row in delta["rows"]] == [renamed_id], delta
+    assert delta["count"] == 2 and delta["signature"]
+
+    # Nothing changed after the delta's own cursor
+    delta = client.get(
+        f"/api/events/{event.id}/roster/delta", params={"since": delta["version"]}, headers=headers
+    ).json()
+    assert delta["deleted"] == [] and delta["rows"] == []
+    print("✅ Deleted attendees reach devices through deltas")
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Roster Delta Tests")
+    print("=" * 50)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_roster_refused_without_signing_key(api_session(), monkeypatch)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_delta_lists_removed_attendees(api_session(), monkeypatch)
+    print("\n🎉 All roster delta tests passed!")
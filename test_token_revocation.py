@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for access token revocation stores
+The Redis store is exercised with an in-memory stand-in for the client
+"""
+
+import os
+import time
+import asyncio
+
+os.environ.setdefault("ENVIRONMENT", "testing")
+
+from app import security
+from app.revocation import MemoryRevocationStore, RedisRevocationStore, revocation_key
+
+
+class FakeRedis:
+    """Implements the two Redis commands the store uses, honouring TTLs"""
+
+    def __init__(self):
+        self.values = {}
+        self.available = True
+        self.calls = 0
+
+    async def set(self, name, value, ex=None):
+        if not self.available:
+            raise ConnectionError("Redis unavailable")
+        self.values[name] = (value, time.time() + ex if ex else None)
+
+    async def exists(self, name):
+        self.calls += 1
+        if not self.available:
+            raise ConnectionError("Redis unavailable")
+        value = self.values.get(name)
+        return int(value is not None and (value[1] is None or value[1] > time.time()))
+
+
+def test_access_tokens_carry_jti():
+    """Every access token gets its own jti, used as the revocation key"""
+    print("🧪 Testing jti claims...")
+    token = security.create_access_token({"sub": "scanner"})
+    payload = security.jwt.decode(token, security.settings.SECRET_KEY, algorithms=[security.settings.ALGORITHM])
+    assert revocation_key(token, payload) == f"jti:{payload['jti']}"
+    assert revocation_key("legacy-token", {"sub": "scanner"}).startswith("sha256:")
+    print("✅ Tokens are keyed by jti (hash for legacy tokens)")
+
+
+def test_memory_store_expires_entries():
+    """Revocations disappear once the token would have expired"""
+    print("🧪 Testing memory store expiry...")
+    store = MemoryRevocationStore()
+    asyncio.run(store.revoke("jti:short", time.time() + 0.05))
+    asyncio.run(store.revoke("jti:long", time.time() + 60))
+    asyncio.run(store.revoke("jti:expired", time.time() - 1))
+    assert asyncio.run(store.is_revoked("jti:short")) and asyncio.run(store.is_revoked("jti:long"))
+    assert not asyncio.run(store.is_revoked("jti:expired"))
+
+    time.sleep(0.1)
+    assert not asyncio.run(store.is_revoked("jti:short"))
+    assert store.stats()["revoked_tokens"] == 1, "Expired entries must be pruned"
+    print("✅ Expired revocations pruned")
+
+
+def test_redis_store_shared_between_workers():
+    """A token revoked on one worker is rejected on another"""
+    print("🧪 Testing shared Redis store...")
+    client = FakeRedis()
+    worker_a = RedisRevocationStore(client)
+    worker_b = RedisRevocationStore(client, cache_seconds=0)
+
+    asyncio.run(worker_a.revoke("jti:abc", time.time() + 60))
+    assert asyncio.run(worker_b.is_revoked("jti:abc"))
+    assert not asyncio.run(worker_b.is_revoked("jti:other"))
+    print("✅ Revocation visible to other workers")
+
+
+def test_redis_store_caches_misses():
+    """Repeat lookups of a valid token skip Redis until the cache entry expires"""
+    print("🧪 Testing negative cache...")
+    client = FakeRedis()
+    store = RedisRevocationStore(client, cache_seconds=0.05)
+
+    for _ in range(5):
+        assert not asyncio.run(store.is_revoked("jti:abc"))
+    assert client.calls == 1 and store.stats()["cache_hits"] == 4
+
+    # Revoking on this worker takes effect at once
+    asyncio.run(store.revoke("jti:abc", time.time() + 60))
+    assert asyncio.run(store.is_revoked("jti:abc"))
+
+    # Revoked elsewhere: seen once the cached answer expires
+    assert not asyncio.run(store.is_revoked("jti:def"))
+    asyncio.run(RedisRevocationStore(client).revoke("jti:def", time.time() + 60))
+    time.sleep(0.1)
+    assert asyncio.run(store.is_revoked("jti:def"))
+    print("✅ Misses cached briefly")
+
+
+def test_redis_outage_keeps_local_revocations():
+    """While Redis is down a worker still rejects tokens it revoked itself"""
+    print("🧪 Testing Redis outage...")
+    client = FakeRedis()
+    store = RedisRevocationStore(client, retry_seconds=60)
+    client.available = False
+
+    asyncio.run(store.revoke("jti:abc", time.time() + 60))
+    assert asyncio.run(store.is_revoked("jti:abc"))
+    for _ in range(3):
+        assert not asyncio.run(store.is_revoked("jti:other"))
+    # After the failed write, lookups don't wait on Redis again until the retry time
+    assert store.stats()["errors"] == 1 and client.calls == 0
+    print("✅ Local revocations survive a Redis outage")
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Token Revocation Tests")
+    print("=" * 50)
+    test_access_tokens_carry_jti()
+    test_memory_store_expires_entries()
+    test_redis_store_shared_between_workers()
+    test_redis_store_caches_misses()
+    test_redis_outage_keeps_local_revocations()
+    print("\n🎉 All token revocation tests passed!")